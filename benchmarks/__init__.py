@@ -0,0 +1,4 @@
+"""Benchmarks for kst commands run against an in-process fake Kandji API.
+
+Run with ``python -m benchmarks --help`` from the root of the project.
+"""
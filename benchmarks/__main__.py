@@ -0,0 +1,92 @@
+"""Benchmark kst commands against an in-process fake Kandji API.
+
+Usage:
+    python -m benchmarks --members 500 --latency 0.05 --page-size 100
+"""
+
+import argparse
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+import platformdirs
+
+
+def isolate_user_dirs(root: Path) -> None:
+    """Point kst's config, cache and log directories at root so a benchmark never touches the real ones.
+
+    This must run before kst is imported since some default paths are resolved at import time.
+    """
+    for name in ("config", "cache", "log", "data", "state"):
+        path = root / name
+        setattr(platformdirs, f"user_{name}_path", lambda *_args, _path=path, **_kwargs: _path)
+        setattr(platformdirs, f"user_{name}_dir", lambda *_args, _path=path, **_kwargs: str(_path))
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description=__doc__.splitlines()[0])
+    parser.add_argument("--members", type=int, default=200, help="number of members per repository (default: 200)")
+    parser.add_argument("--iterations", type=int, default=3, help="number of timed runs per operation (default: 3)")
+    parser.add_argument(
+        "--kind", dest="kinds", action="append", choices=("profiles", "scripts"), help="library item type to run"
+    )
+    parser.add_argument(
+        "--operation",
+        dest="operations",
+        action="append",
+        choices=("list", "pull", "push", "sync"),
+        help="operation to run (may be repeated, default: all)",
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds of latency per API request")
+    parser.add_argument("--page-size", type=int, default=300, help="results per page from list endpoints")
+    parser.add_argument("--rate-limit", type=float, default=None, help="sustained requests per second before 429s")
+    parser.add_argument("--burst", type=int, default=10, help="requests allowed in a burst when rate limited")
+    parser.add_argument("--json", dest="json_path", metavar="PATH", help="also write the results as JSON to PATH")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="kst-bench-") as temp_dir:
+        root = Path(temp_dir)
+        isolate_user_dirs(root / "user")
+
+        from rich.console import Console
+        from rich.table import Table
+
+        from .runner import KINDS, OPERATIONS, BenchmarkRunner
+        from .server import ServerOptions
+
+        options = ServerOptions(
+            latency=args.latency, page_size=args.page_size, rate_limit=args.rate_limit, burst=args.burst
+        )
+        runner = BenchmarkRunner(work_dir=root / "work", members=args.members, options=options)
+        results = runner.run_all(
+            kinds=args.kinds or KINDS, operations=args.operations or OPERATIONS, iterations=args.iterations
+        )
+
+    table = Table(title=f"kst benchmarks ({args.members} members, {args.latency * 1000:.0f} ms latency)")
+    for column in ("Kind", "Operation", "Median s", "Ops/s", "Requests", "Req/s", "429s"):
+        table.add_column(column, justify="left" if column in ("Kind", "Operation") else "right")
+    for result in results:
+        table.add_row(
+            result.kind,
+            result.operation,
+            f"{result.median:.3f}",
+            f"{result.ops_per_sec:.1f}",
+            str(result.requests),
+            f"{result.requests_per_sec:.1f}",
+            str(result.throttled),
+        )
+    Console().print(table)
+
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps([result.to_dict() for result in results], indent=2))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
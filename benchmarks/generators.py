@@ -0,0 +1,104 @@
+"""Generators for remote library items and local kst repositories of any size."""
+
+import contextlib
+import io
+import plistlib
+from pathlib import Path
+from uuid import uuid4
+
+from kst import git
+from kst.api import CustomProfilePayload, CustomScriptPayload
+from kst.cli.new import new_repo
+from kst.repository import CustomProfile, CustomScript, RepositoryWriter
+
+from .server import FakeKandjiServer
+
+CATEGORY_NAME = "Utilities"
+
+
+def profile_content(name: str, payload_count: int = 3) -> str:
+    """Generate the content of a mobileconfig with a few payloads."""
+    profile_id = str(uuid4())
+    return plistlib.dumps(
+        {
+            "PayloadDisplayName": name,
+            "PayloadIdentifier": f"com.kandji.profile.custom.{profile_id}",
+            "PayloadType": "Configuration",
+            "PayloadUUID": profile_id,
+            "PayloadVersion": 1,
+            "PayloadContent": [
+                {
+                    "PayloadIdentifier": f"com.example.benchmark.{profile_id}.{index}",
+                    "PayloadType": "com.apple.ManagedClient.preferences",
+                    "PayloadUUID": str(uuid4()),
+                    "PayloadVersion": 1,
+                    "Settings": {f"Key{key}": f"Value {key}" for key in range(20)},
+                }
+                for index in range(payload_count)
+            ],
+        },
+        sort_keys=False,
+    ).decode()
+
+
+def script_content(name: str, lines: int = 50) -> str:
+    """Generate the content of a zsh script."""
+    body = "\n".join(f'echo "{name} line {line}"' for line in range(lines))
+    return f"#!/bin/zsh -f\n{body}\nexit 0\n"
+
+
+def populate_server(server: FakeKandjiServer, kind: str, count: int) -> None:
+    """Add count library items of kind to the fake server."""
+    if not server.categories:
+        server.add_category(CATEGORY_NAME)
+    for index in range(count):
+        name = f"Benchmark {kind[:-1].capitalize()} {index:05d}"
+        if kind == "profiles":
+            server.add_profile(name=name, profile=profile_content(name))
+        else:
+            server.add_script(name=name, script=script_content(name), remediation_script=script_content(name, 10))
+
+
+def create_repo(path: Path, kind: str = "profiles", count: int = 0) -> Path:
+    """Create a new kst repository with count new members of kind which do not exist in Kandji yet.
+
+    Returns:
+        Path: The path to the root of the new repository
+
+    """
+    with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+        new_repo(str(path))
+    member_dir = path / kind
+    with RepositoryWriter() as writer:
+        for index in range(count):
+            name = f"Local {kind[:-1].capitalize()} {index:05d}"
+            if kind == "profiles":
+                payload = CustomProfilePayload(
+                    id=str(uuid4()),
+                    name=name,
+                    active=False,
+                    profile=profile_content(name),
+                    mdm_identifier="",
+                    created_at="",
+                    updated_at="",
+                    runs_on_mac=True,
+                )
+                member = CustomProfile.from_api_payload(payload)
+            else:
+                payload = CustomScriptPayload(
+                    id=str(uuid4()),
+                    name=name,
+                    active=False,
+                    execution_frequency="once",
+                    restart=False,
+                    script=script_content(name),
+                    remediation_script=script_content(name, 10),
+                    created_at="",
+                    updated_at="",
+                    show_in_self_service=False,
+                )
+                member = CustomScript.from_api_payload(payload)
+            member.ensure_paths(member_dir)
+            member.write(writer=writer)
+    git.commit_all_changes(cd_path=path, message="Add benchmark members")
+    return path
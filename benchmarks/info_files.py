@@ -0,0 +1,89 @@
+"""Measure how many info files per second can be loaded in each supported format.
+
+Usage:
+    python -m benchmarks.info_files --files 2000
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from pathlib import Path
+from uuid import uuid4
+
+from rich.console import Console
+from rich.table import Table
+
+from kst.repository import ProfileInfoFile, RepositoryWriter
+from kst.utils import yaml
+
+
+def create_info_files(directory: Path, suffix: str, count: int) -> list[Path]:
+    """Write count profile info files with the given suffix to directory."""
+    paths = []
+    with RepositoryWriter() as writer:
+        for index in range(count):
+            info = ProfileInfoFile(
+                id=str(uuid4()),
+                name=f"Profile: {index:05d}",
+                active=index % 2 == 0,
+                runs_on_mac=True,
+                path=directory / f"{index:05d}" / f"info{suffix}",
+                sync_hash=uuid4().hex * 2,
+            )
+            info.write(writer=writer)
+            paths.append(info.path)
+    return paths
+
+
+def round_trip_load(path: Path) -> ProfileInfoFile:
+    """Load an info file the way yaml info files were loaded before the fast path."""
+    info_data = dict(yaml.load(path))
+    info_data["path"] = path
+    info_data["format"] = "yaml"
+    return ProfileInfoFile.model_validate(info_data)
+
+
+def measure(load: Callable[[Path], object], paths: list[Path], iterations: int) -> float:
+    """Return the median number of files loaded per second."""
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        for path in paths:
+            load(path)
+        timings.append(time.perf_counter() - start)
+    return len(paths) / statistics.median(timings)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.info_files", description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=1000, help="number of info files per format (default: 1000)")
+    parser.add_argument("--iterations", type=int, default=3, help="number of timed runs per format (default: 3)")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="kst-bench-") as temp_dir:
+        root = Path(temp_dir)
+        rows = []
+        for suffix in (".plist", ".json", ".yaml"):
+            paths = create_info_files(root / suffix[1:], suffix, args.files)
+            rows.append((suffix[1:], measure(ProfileInfoFile.load, paths, args.iterations)))
+            if suffix == ".yaml":
+                rows.append(("yaml (round-trip)", measure(round_trip_load, paths, args.iterations)))
+
+    table = Table(title=f"Info file loading ({args.files} files)")
+    table.add_column("Format")
+    table.add_column("Files/s", justify="right")
+    for name, files_per_sec in rows:
+        table.add_row(name, f"{files_per_sec:,.0f}")
+    Console().print(table)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""Run kst commands against the fake Kandji server and measure their throughput."""
+
+import os
+import shutil
+import statistics
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from unittest import mock
+
+from typer.testing import CliRunner
+
+from kst.cli import app
+
+from .generators import create_repo, populate_server
+from .server import API_TOKEN, TENANT_URL, FakeKandjiServer, ServerOptions
+
+OPERATIONS = ("list", "pull", "push", "sync")
+KINDS = ("profiles", "scripts")
+
+GIT_IDENTITY = {
+    "GIT_AUTHOR_NAME": "kst benchmark",
+    "GIT_AUTHOR_EMAIL": "benchmark@example.com",
+    "GIT_COMMITTER_NAME": "kst benchmark",
+    "GIT_COMMITTER_EMAIL": "benchmark@example.com",
+}
+
+
+@dataclass
+class BenchmarkResult:
+    """The timings for one operation on one kind of library item."""
+
+    kind: str
+    operation: str
+    members: int
+    timings: list[float] = field(default_factory=list)
+    requests: int = 0
+    throttled: int = 0
+
+    @property
+    def median(self) -> float:
+        return statistics.median(self.timings)
+
+    @property
+    def ops_per_sec(self) -> float:
+        """Members processed per second by the median run."""
+        return self.members / self.median if self.median else float("inf")
+
+    @property
+    def requests_per_sec(self) -> float:
+        """API requests made per second by the median run."""
+        return self.requests / self.median if self.median else float("inf")
+
+    def to_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "operation": self.operation,
+            "members": self.members,
+            "timings": self.timings,
+            "median": self.median,
+            "ops_per_sec": self.ops_per_sec,
+            "requests": self.requests,
+            "requests_per_sec": self.requests_per_sec,
+            "throttled": self.throttled,
+        }
+
+
+class BenchmarkRunner:
+    """Prepare repositories, run kst commands against a fake server and record the timings.
+
+    Each run starts from a freshly generated repository and server state. Only the kst command itself is
+    timed, setup work like generating members and pulling a baseline is excluded.
+    """
+
+    def __init__(self, work_dir: Path, members: int, options: ServerOptions | None = None) -> None:
+        self.work_dir = work_dir
+        self.members = members
+        self.server = FakeKandjiServer(options)
+        self.cli = CliRunner(mix_stderr=False)
+        self._run_count = 0
+
+    def invoke(self, *args: str) -> None:
+        result = self.cli.invoke(
+            app,
+            ["--log", str(self.work_dir / "kst.log"), *args],
+            env={"KST_TENANT": TENANT_URL, "KST_TOKEN": API_TOKEN},
+            catch_exceptions=False,
+        )
+        if result.exit_code != 0:
+            raise RuntimeError(f"kst {' '.join(args)} failed with exit code {result.exit_code}\n{result.stderr}")
+
+    def _new_repo(self, kind: str, count: int = 0) -> Path:
+        self._run_count += 1
+        return create_repo(self.work_dir / f"repo-{self._run_count:03d}", kind=kind, count=count)
+
+    def _setup_list(self, kind: str) -> list[str]:
+        populate_server(self.server, kind, self.members)
+        repo = self._new_repo(kind)
+        self.invoke(kind[:-1], "pull", "--all", "--repo", str(repo))
+        return [kind[:-1], "list", "--repo", str(repo)]
+
+    def _setup_pull(self, kind: str) -> list[str]:
+        populate_server(self.server, kind, self.members)
+        repo = self._new_repo(kind)
+        return [kind[:-1], "pull", "--all", "--repo", str(repo)]
+
+    def _setup_push(self, kind: str) -> list[str]:
+        repo = self._new_repo(kind, count=self.members)
+        return [kind[:-1], "push", "--all", "--repo", str(repo)]
+
+    def _setup_sync(self, kind: str) -> list[str]:
+        """Prepare a repository where half of the members changed locally and the other half changed in Kandji."""
+        populate_server(self.server, kind, self.members)
+        repo = self._new_repo(kind)
+        self.invoke(kind[:-1], "pull", "--all", "--repo", str(repo))
+
+        for index, member_dir in enumerate(sorted((repo / kind).iterdir())):
+            if index % 2 == 0:
+                content_path = next(member_dir.glob("profile.mobileconfig" if kind == "profiles" else "audit*"))
+                content = content_path.read_text()
+                if kind == "profiles":
+                    content = content.replace("Value 0", "Value 0 (local)", 1)
+                else:
+                    content += "# local change\n"
+                content_path.write_text(content)
+
+        store = self.server.profiles if kind == "profiles" else self.server.scripts
+        for item in list(store.values())[1::2]:
+            if kind == "profiles":
+                item["profile"] = item["profile"].replace("Value 0", "Value 0 (remote)", 1)
+            else:
+                item["script"] += "# remote change\n"
+            item["updated_at"] = time.strftime("%Y-%m-%dT%H:%M:%S.000000Z", time.gmtime())
+        return [kind[:-1], "sync", "--all", "--repo", str(repo)]
+
+    def run(self, kind: str, operation: str, iterations: int = 3) -> BenchmarkResult:
+        setup = getattr(self, f"_setup_{operation}")
+        result = BenchmarkResult(kind=kind, operation=operation, members=self.members)
+        for _ in range(iterations):
+            self.server.reset()
+            args = setup(kind)
+            self.server.requests.clear()
+
+            start = time.perf_counter()
+            self.invoke(*args)
+            result.timings.append(time.perf_counter() - start)
+
+            result.requests = self.server.requests.total()
+            result.throttled = self.server.throttled
+        return result
+
+    def run_all(self, kinds=KINDS, operations=OPERATIONS, iterations: int = 3) -> list[BenchmarkResult]:
+        results = []
+        with self.server, self.server.redirect(), mock.patch.dict(os.environ, GIT_IDENTITY):
+            for kind in kinds:
+                for operation in operations:
+                    results.append(self.run(kind, operation, iterations))
+                    shutil.rmtree(self.work_dir, ignore_errors=True)
+                    self.work_dir.mkdir(parents=True, exist_ok=True)
+        return results
@@ -0,0 +1,337 @@
+"""An in-process fake of the Kandji API endpoints used by kst."""
+
+import contextlib
+import email.parser
+import email.policy
+import json
+import os
+import re
+import threading
+import time
+from collections import Counter
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Self
+from unittest import mock
+from urllib.parse import parse_qs, urlsplit
+from uuid import uuid4
+
+import requests.adapters
+
+PROFILES_PATH = "/api/v1/library/custom-profiles"
+SCRIPTS_PATH = "/api/v1/library/custom-scripts"
+CATEGORIES_PATH = "/api/v1/self-service/categories"
+PING_PATH = "/app/v1/ping"
+
+TENANT_URL = "https://benchmark.api.kandji.io"
+API_TOKEN = "00000000-0000-4000-8000-000000000000"
+
+_ITEM_PATH = re.compile(rf"({re.escape(PROFILES_PATH)}|{re.escape(SCRIPTS_PATH)})/([0-9a-fA-F-]+)")
+
+
+def _timestamp() -> str:
+    return datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+@dataclass
+class ServerOptions:
+    """Behavior of the fake server.
+
+    Attributes:
+        latency (float): Seconds to wait before responding to each request
+        page_size (int): The number of results returned by each page of a list endpoint
+        rate_limit (float | None): The sustained number of requests per second allowed before responding with 429
+        burst (int): The number of requests allowed in a burst when rate limiting is enabled
+
+    """
+
+    latency: float = 0.0
+    page_size: int = 300
+    rate_limit: float | None = None
+    burst: int = 10
+
+
+class _TokenBucket:
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> bool:
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens < 1:
+                return False
+            self.tokens -= 1
+            return True
+
+
+class FakeKandjiServer:
+    """A threaded HTTP server which implements the subset of the Kandji API used by kst.
+
+    The server keeps all library items in memory. Use redirect() to route requests made by kst to the
+    benchmark tenant URL to the server instead.
+    """
+
+    def __init__(self, options: ServerOptions | None = None) -> None:
+        self.options = options or ServerOptions()
+        self.profiles: dict[str, dict] = {}
+        self.scripts: dict[str, dict] = {}
+        self.categories: list[dict] = []
+        self.requests = Counter[str]()
+        self.throttled = 0
+        self._lock = threading.Lock()
+        self._bucket = (
+            _TokenBucket(self.options.rate_limit, self.options.burst) if self.options.rate_limit is not None else None
+        )
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), _handler_for(self))
+        self._httpd.daemon_threads = True
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-kandji", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> Self:
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def reset(self) -> None:
+        """Remove all library items and clear the request statistics."""
+        with self._lock:
+            self.profiles.clear()
+            self.scripts.clear()
+            self.requests.clear()
+            self.throttled = 0
+
+    @contextlib.contextmanager
+    def redirect(self) -> Iterator[None]:
+        """Route every request made through requests to the benchmark tenant to this server."""
+        original_send = requests.adapters.HTTPAdapter.send
+
+        def send(adapter, request, *args, **kwargs):
+            if request.url.startswith(TENANT_URL):
+                request.url = self.base_url + request.url.removeprefix(TENANT_URL)
+            return original_send(adapter, request, *args, **kwargs)
+
+        with (
+            mock.patch.object(requests.adapters.HTTPAdapter, "send", send),
+            mock.patch.dict(os.environ, {"NO_PROXY": "*"}),
+        ):
+            yield
+
+    # --- Library item helpers ---
+    def add_profile(self, name: str, profile: str, **fields) -> dict:
+        now = _timestamp()
+        profile_id = str(uuid4())
+        item = {
+            "id": profile_id,
+            "name": name,
+            "active": False,
+            "profile": profile,
+            "mdm_identifier": f"com.kandji.profile.custom.{profile_id}",
+            "created_at": now,
+            "updated_at": now,
+            "runs_on_mac": True,
+            "runs_on_iphone": False,
+            "runs_on_ipad": False,
+            "runs_on_tv": False,
+            "runs_on_vision": False,
+        } | fields
+        with self._lock:
+            self.profiles[profile_id] = item
+        return item
+
+    def add_script(self, name: str, script: str, **fields) -> dict:
+        now = _timestamp()
+        script_id = str(uuid4())
+        item = {
+            "id": script_id,
+            "name": name,
+            "active": False,
+            "execution_frequency": "once",
+            "restart": False,
+            "script": script,
+            "remediation_script": "",
+            "created_at": now,
+            "updated_at": now,
+            "show_in_self_service": False,
+            "self_service_category_id": None,
+            "self_service_recommended": None,
+        } | fields
+        with self._lock:
+            self.scripts[script_id] = item
+        return item
+
+    def add_category(self, name: str) -> dict:
+        item = {"id": str(uuid4()), "name": name}
+        with self._lock:
+            self.categories.append(item)
+        return item
+
+    def _store(self, path: str) -> dict[str, dict]:
+        return self.profiles if path == PROFILES_PATH else self.scripts
+
+    def _throttle(self) -> bool:
+        if self._bucket is not None and not self._bucket.acquire():
+            with self._lock:
+                self.throttled += 1
+            return True
+        return False
+
+    def _record(self, method: str, path: str) -> None:
+        route = _ITEM_PATH.sub(r"\1/{id}", path)
+        with self._lock:
+            self.requests[f"{method} {route}"] += 1
+
+
+def _parse_multipart(content_type: str, body: bytes) -> dict[str, str]:
+    message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode() + body
+    )
+    fields = {}
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        fields[name] = part.get_payload(decode=True).decode()
+    return fields
+
+
+def _coerce(value: str | bool | None) -> str | bool | None:
+    """Convert form values to the JSON types returned by the API."""
+    if value in ("True", "true"):
+        return True
+    if value in ("False", "false"):
+        return False
+    return value
+
+
+def _handler_for(server: FakeKandjiServer) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args) -> None:
+            pass
+
+        def _send_json(self, status: HTTPStatus, payload: object = None, headers: dict[str, str] | None = None) -> None:
+            body = b"" if payload is None else json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for key, value in (headers or {}).items():
+                self.send_header(key, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _read_body(self) -> dict:
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length)
+            content_type = self.headers.get("Content-Type", "")
+            if content_type.startswith("multipart/form-data"):
+                fields = _parse_multipart(content_type, body)
+                if "file" in fields:
+                    fields["profile"] = fields.pop("file")
+                return {key: _coerce(value) for key, value in fields.items()}
+            return json.loads(body or b"{}")
+
+        def _handle(self, method: str) -> None:
+            url = urlsplit(self.path)
+            server._record(method, url.path)
+            if server.options.latency:
+                time.sleep(server.options.latency)
+            if server._throttle():
+                self._read_body()
+                self._send_json(
+                    HTTPStatus.TOO_MANY_REQUESTS, {"detail": "Request was throttled."}, {"Retry-After": "1"}
+                )
+                return
+
+            if url.path == PING_PATH and method == "GET":
+                self._send_json(HTTPStatus.OK, "pong")
+            elif self.headers.get("Authorization") != f"Bearer {API_TOKEN}":
+                self._read_body()
+                self._send_json(HTTPStatus.UNAUTHORIZED, {"detail": "Invalid token."})
+            elif url.path == CATEGORIES_PATH and method == "GET":
+                self._send_json(HTTPStatus.OK, server.categories)
+            elif url.path in (PROFILES_PATH, SCRIPTS_PATH) and method == "GET":
+                self._list(url.path, int(parse_qs(url.query).get("offset", ["0"])[0]))
+            elif url.path in (PROFILES_PATH, SCRIPTS_PATH) and method == "POST":
+                fields = self._read_body()
+                if url.path == PROFILES_PATH:
+                    item = server.add_profile(**fields)
+                else:
+                    item = server.add_script(**fields)
+                self._send_json(HTTPStatus.CREATED, item)
+            elif match := _ITEM_PATH.fullmatch(url.path):
+                self._item(method, match.group(1), match.group(2))
+            else:
+                self._send_json(HTTPStatus.NOT_FOUND, {"detail": "Not found."})
+
+        def _list(self, path: str, offset: int) -> None:
+            items = list(server._store(path).values())
+            page_size = server.options.page_size
+            next_offset = offset + page_size
+            self._send_json(
+                HTTPStatus.OK,
+                {
+                    "count": len(items),
+                    "next": f"{TENANT_URL}{path}?offset={next_offset}" if next_offset < len(items) else None,
+                    "previous": f"{TENANT_URL}{path}?offset={max(offset - page_size, 0)}" if offset else None,
+                    "results": items[offset:next_offset],
+                },
+            )
+
+        def _item(self, method: str, path: str, item_id: str) -> None:
+            store = server._store(path)
+            if item_id not in store:
+                self._read_body()
+                self._send_json(HTTPStatus.NOT_FOUND, {"detail": "Not found."})
+                return
+            match method:
+                case "GET":
+                    self._send_json(HTTPStatus.OK, store[item_id])
+                case "PATCH":
+                    fields = self._read_body()
+                    with server._lock:
+                        store[item_id] |= fields | {"updated_at": _timestamp()}
+                    self._send_json(HTTPStatus.OK, store[item_id])
+                case "DELETE":
+                    with server._lock:
+                        del store[item_id]
+                    self._send_json(HTTPStatus.NO_CONTENT)
+                case _:
+                    self._send_json(HTTPStatus.METHOD_NOT_ALLOWED, {"detail": "Method not allowed."})
+
+        def do_GET(self) -> None:
+            self._handle("GET")
+
+        def do_POST(self) -> None:
+            self._handle("POST")
+
+        def do_PATCH(self) -> None:
+            self._handle("PATCH")
+
+        def do_DELETE(self) -> None:
+            self._handle("DELETE")
+
+    return Handler
@@ -1,4 +1,7 @@
-from .cli import app
+def __getattr__(name: str):
+    # The CLI is imported on first use so the daemon client can forward commands without loading it
+    if name == "app":
+        from .cli import app
 
-if __name__ == "__main__":
-    app()
+        return app
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
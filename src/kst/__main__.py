@@ -0,0 +1,17 @@
+import sys
+
+
+def main() -> None:
+    """Run kst, forwarding the command to the kst daemon when one is running."""
+    from kst.daemon import forward
+
+    if (exit_code := forward(sys.argv[1:])) is not None:
+        sys.exit(exit_code)
+
+    from kst.cli import app
+
+    app(prog_name="kst")
+
+
+if __name__ == "__main__":
+    main()
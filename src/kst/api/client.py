@@ -1,17 +1,54 @@
+import atexit
+import functools
+import hashlib
 import io
 import json
 import logging
+import os
 import re
+import threading
 from urllib.parse import urljoin, urlparse
 
+import platformdirs
 import requests
 from pydantic import BaseModel, ConfigDict, Field, field_validator
 
+from kst.__about__ import APP_NAME
+from kst.cache import TtlCache
 from kst.console import OutputConsole
 from kst.exceptions import ApiClientError
+from kst.tracing import tracer
+
+from .multipart import MultipartEncoder
 
 console = OutputConsole(logging.getLogger(__name__))
 
+PING_PATH = "/app/v1/ping"
+VALIDATION_TTL_ENV_VAR = "KST_VALIDATION_TTL"
+DEFER_VALIDATION_ENV_VAR = "KST_DEFER_VALIDATION"
+DEFAULT_VALIDATION_TTL = 24 * 60 * 60
+
+
+def validation_ttl() -> float:
+    """Get the number of seconds a tenant stays validated from KST_VALIDATION_TTL."""
+    try:
+        return float(os.environ.get(VALIDATION_TTL_ENV_VAR, DEFAULT_VALIDATION_TTL))
+    except ValueError:
+        return DEFAULT_VALIDATION_TTL
+
+
+@functools.cache
+def validation_cache() -> TtlCache:
+    """Get the cache of tenants which have recently responded successfully, stored alongside tenants.json.
+
+    The cache is created the first time it is needed, with the TTL set by KST_VALIDATION_TTL at that time.
+    """
+    return TtlCache(platformdirs.user_config_path(appname=APP_NAME) / "validated_tenants.json", ttl=validation_ttl())
+
+
+_sessions: dict[tuple[str, str], requests.Session] = {}
+_sessions_lock = threading.Lock()
+
 
 class ApiConfig(BaseModel):
     """A Container for API configuration values.
@@ -60,19 +97,74 @@ class ApiConfig(BaseModel):
             )
         return v
 
+    @property
+    def cache_key(self) -> str:
+        """A stable key for the tenant and token which does not reveal the token."""
+        return hashlib.sha256(f"{self.url}\n{self.api_token}".encode()).hexdigest()
+
+
+def shared_session(config: ApiConfig) -> requests.Session:
+    """Get the session shared by every client using config.
+
+    Sharing a session lets every resource used during a command reuse the same connection pool instead of
+    opening a new TLS connection for each one.
+
+    Args:
+        config (ApiConfig): The configuration the session is used with
+
+    Returns:
+        requests.Session: The shared session object
+
+    """
+    with _sessions_lock:
+        key = (config.url, config.api_token)
+        if (session := _sessions.get(key)) is None:
+            session = _sessions[key] = requests.Session()
+        return session
+
+
+@atexit.register
+def close_sessions() -> None:
+    """Close every shared session and the connections in its pool.
+
+    This is called when the process exits. Clients created afterwards get new sessions.
+    """
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.close()
+
+
+def is_validated(config: ApiConfig) -> bool:
+    """Check whether the tenant in config responded successfully within the validation TTL."""
+    return validation_cache().get(config.cache_key) is not None
+
+
+def mark_validated(config: ApiConfig) -> None:
+    """Record that the tenant in config responded successfully."""
+    validation_cache().set(config.cache_key, config.url)
+
+
+def defer_validation() -> bool:
+    """Whether validation should be folded into the first API request instead of a separate ping."""
+    return os.environ.get(DEFER_VALIDATION_ENV_VAR, "").lower() not in ("", "0", "false", "no")
+
 
 class ApiClient:
     """Basic API client for interacting with the Kandji API.
 
     The ApiClient class is a thin wrapper around a requests.Session which handles converting
     resource paths to fully resolved API resources. It also manages passing credential's with
-    requests.
+    requests. All clients for the same configuration share one session so connections are reused.
 
     Attributes:
         session (requests.Session): The underlying session used by the client.
+        tenant (str): The host name of the tenant the client connects to.
 
     Methods:
         request: Make an generic HTTP request
+        ping: Check whether the tenant is reachable
         get: Make a GET HTTP request
         patch: Make a PATCH HTTP request
         post: Make a POST HTTP request
@@ -82,7 +174,7 @@ class ApiClient:
 
     def __init__(self, config: ApiConfig) -> None:
         self._config = config
-        self._session = requests.Session()
+        self._session = shared_session(config)
         self._update_header()
 
     @property
@@ -103,10 +195,12 @@ class ApiClient:
         return self._session
 
     def close(self) -> None:
-        """Close the internal session object."""
-        if self._session is not None:
-            self.session.close()
-            self._session = None
+        """Release the internal session object.
+
+        The shared session is left open so other clients for the same configuration can reuse its connections.
+        Shared sessions are closed by close_sessions when the process or daemon shuts down.
+        """
+        self._session = None
 
     def _update_header(self):
         """Update the session headers with the API token."""
@@ -117,6 +211,11 @@ class ApiClient:
             }
         )
 
+    @property
+    def tenant(self) -> str:
+        """The host name of the tenant the client connects to."""
+        return urlparse(self._config.url).hostname or self._config.url
+
     def _make_url(self, path: str):
         """Convert a relative path to a fully qualified URL."""
         return urljoin(self._config.url, path)
@@ -124,7 +223,9 @@ class ApiClient:
     def request(self, method: str, url: str, *args, **kwargs) -> requests.Response:
         """Make a generic HTTP request.
 
-        Handles logging and ensures the source query parameter is included.
+        Handles logging and ensures the source query parameter is included. When files are included, the
+        multipart body is streamed from the file objects with a precomputed Content-Length instead of being
+        built in memory.
 
         Returns:
             requests.Response: The response object from the request
@@ -141,7 +242,18 @@ class ApiClient:
             # Add the source=kst param to all requests
             kwargs["params"] = kwargs.get("params", {}) | {"source": "kst"}
 
-            response = self.session.request(method, url, *args, **kwargs)
+            if files := kwargs.pop("files", None):
+                body = MultipartEncoder(data=kwargs.pop("data", None), files=files)
+                kwargs["data"] = body
+                kwargs["headers"] = (kwargs.get("headers") or {}) | {"Content-Type": body.content_type}
+                console.debug(f"Streaming multipart body of {len(body)} bytes")
+
+            with tracer.span("api.request", method=method, path=urlparse(url).path, tenant=self.tenant) as span:
+                response = self.session.request(method, url, *args, **kwargs)
+                span["status"] = response.status_code
+                span["response_bytes"] = len(response.content)
+                if response.request is not None:
+                    span["request_bytes"] = int(response.request.headers.get("Content-Length", 0))
 
             console.debug(f"Response status code: {response.status_code}")
 
@@ -158,6 +270,10 @@ class ApiClient:
             console.debug(f"Response content: {content}")
 
             response.raise_for_status()
+
+            # Any successful response proves the tenant URL and token are valid
+            if not is_validated(self._config):
+                mark_validated(self._config)
         except requests.ConnectionError as error:
             console.error(f"Connection error occurred: {error}")
             raise
@@ -168,6 +284,26 @@ class ApiClient:
 
         return response
 
+    def ping(self) -> bool:
+        """Check whether the tenant is reachable using the unauthenticated ping endpoint.
+
+        A successful ping is recorded in the validation cache.
+
+        Returns:
+            bool: True if the tenant responded successfully
+
+        """
+        console.debug(f"Validating URL: {self._config.url}")
+        with tracer.span("api.request", method="GET", path=PING_PATH, tenant=self.tenant) as span:
+            response = self.session.get(self._make_url(PING_PATH), params={"source": "kst"})
+            span["status"] = response.status_code
+            span["response_bytes"] = len(response.content)
+        console.debug(f"Response content: {response.text}")
+        console.debug(f"Response status code: {response.status_code}")
+        if response.ok:
+            mark_validated(self._config)
+        return response.ok
+
     def get(self, path: str) -> requests.Response:
         """Make a GET HTTP request to the resolved API endpoint at path."""
         return self.request("GET", self._make_url(path))
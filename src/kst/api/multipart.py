@@ -0,0 +1,120 @@
+import binascii
+import io
+import os
+from collections.abc import Iterator, Mapping
+from typing import IO
+
+# Matches the escaping applied by urllib3.fields.format_multipart_header_param (HTML5 strategy)
+_HEADER_PARAM_ESCAPES = {ord('"'): "%22", ord("\\"): "\\\\"} | {
+    ccode: f"%{ccode:02X}" for ccode in range(0x1F + 1) if ccode != 0x1B
+}
+
+type FileTuple = tuple[str, tuple[str, IO[bytes], str]]
+
+
+def _render_param(name: str, value: str) -> str:
+    return f'{name}="{value.translate(_HEADER_PARAM_ESCAPES)}"'
+
+
+def _file_length(file_obj: IO[bytes]) -> int:
+    """Return the number of bytes remaining to be read from a file object without reading it."""
+    position = file_obj.tell()
+    try:
+        return os.fstat(file_obj.fileno()).st_size - position
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        end = file_obj.seek(0, io.SEEK_END)
+        file_obj.seek(position)
+        return end - position
+
+
+class MultipartEncoder:
+    """A streaming multipart/form-data request body.
+
+    Files are read from disk in fixed size chunks while the request is being sent instead of being
+    loaded into memory up front. The total length of the body is calculated before any data is read
+    so the request can be sent with an exact Content-Length header rather than chunked encoding. The
+    produced body is byte-for-byte identical to the one built by requests for the same data and files.
+
+    Attributes:
+        boundary (str): The boundary string separating each part of the body
+        content_type (str): The value for the Content-Type header of the request
+
+    Methods:
+        read: Read up to size bytes of the encoded body
+        __len__: Return the total length of the encoded body in bytes
+        __iter__: Iterate over the encoded body in chunks
+
+    """
+
+    chunk_size = 64 * 1024
+
+    def __init__(
+        self,
+        data: Mapping[str, object] | None = None,
+        files: list[FileTuple] | None = None,
+        boundary: str | None = None,
+    ) -> None:
+        self.boundary = boundary or binascii.hexlify(os.urandom(16)).decode("ascii")
+
+        # Each part is a bytes object or a (file object, length) pair which is streamed when read
+        self._parts: list[bytes | tuple[IO[bytes], int]] = []
+        for name, values in (data or {}).items():
+            for value in values if isinstance(values, list | tuple) else [values]:
+                if value is None:
+                    continue
+                encoded = value if isinstance(value, bytes) else str(value).encode("utf-8")
+                self._add_headers(f"Content-Disposition: form-data; {_render_param('name', name)}\r\n")
+                self._parts.append(encoded + b"\r\n")
+        for name, (file_name, file_obj, content_type) in files or []:
+            self._add_headers(
+                f"Content-Disposition: form-data; {_render_param('name', name)}; {_render_param('filename', file_name)}\r\n"
+                f"Content-Type: {content_type}\r\n"
+            )
+            self._parts.append((file_obj, _file_length(file_obj)))
+            self._parts.append(b"\r\n")
+        self._parts.append(f"--{self.boundary}--\r\n".encode("latin-1"))
+
+        self._length = sum(part[1] if isinstance(part, tuple) else len(part) for part in self._parts)
+        self._chunks = self._iter_chunks()
+        self._buffer = b""
+
+    def _add_headers(self, headers: str) -> None:
+        self._parts.append(f"--{self.boundary}\r\n{headers}\r\n".encode())
+
+    def _iter_chunks(self) -> Iterator[bytes]:
+        for part in self._parts:
+            if isinstance(part, bytes):
+                yield part
+                continue
+            file_obj, remaining = part
+            while remaining > 0:
+                chunk = file_obj.read(min(self.chunk_size, remaining))
+                if not chunk:
+                    raise ValueError("File was truncated while the request body was being sent.")
+                remaining -= len(chunk)
+                yield chunk
+
+    @property
+    def content_type(self) -> str:
+        """Get the Content-Type header value including the boundary."""
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[bytes]:
+        while chunk := self.read(self.chunk_size):
+            yield chunk
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to size bytes of the encoded body, or the remainder of the body if size is negative."""
+        while size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+
+        if size < 0:
+            size = len(self._buffer)
+        data, self._buffer = self._buffer[:size], self._buffer[size:]
+        return data
@@ -1,6 +1,8 @@
 from io import BufferedReader
 from pathlib import Path
 
+from kst.tracing import tracer
+
 from .payload import CustomProfilePayload, PayloadList
 from .resource_base import ResourceBase
 
@@ -38,16 +40,20 @@ class CustomProfilesResource(ResourceBase):
 
         all_results = PayloadList[CustomProfilePayload]()
         next_page = self._path
+        page = 1
         while next_page:
-            response = self.client.get(next_page)
+            with tracer.span("remote.page", path=self._path, page=page) as span:
+                response = self.client.get(next_page)
 
-            # Parse bytes content to CustomProfilePayloadList or raise ValidationError
-            profile_list = PayloadList.model_validate_json(response.content)
+                # Parse bytes content to CustomProfilePayloadList or raise ValidationError
+                profile_list = PayloadList.model_validate_json(response.content)
+                span["results"] = len(profile_list.results)
 
             all_results.count = profile_list.count
             all_results.results.extend(profile_list.results)
 
             next_page = profile_list.next
+            page += 1
 
         return all_results
 
@@ -1,5 +1,7 @@
 from enum import StrEnum
 
+from kst.tracing import tracer
+
 from .payload import CustomScriptPayload, PayloadList
 from .resource_base import ResourceBase
 
@@ -51,16 +53,20 @@ class CustomScriptsResource(ResourceBase):
 
         all_results = PayloadList[CustomScriptPayload]()
         next_page = self._path
+        page = 1
         while next_page:
-            response = self.client.get(next_page)
+            with tracer.span("remote.page", path=self._path, page=page) as span:
+                response = self.client.get(next_page)
 
-            # Parse bytes content to CustomScriptPayloadList or raise ValidationError
-            script_list = PayloadList.model_validate_json(response.content)
+                # Parse bytes content to CustomScriptPayloadList or raise ValidationError
+                script_list = PayloadList.model_validate_json(response.content)
+                span["results"] = len(script_list.results)
 
             all_results.count = script_list.count
             all_results.results.extend(script_list.results)
 
             next_page = script_list.next
+            page += 1
 
         return all_results
 
@@ -0,0 +1,212 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Buffer
+from pathlib import Path
+from typing import Any
+from uuid import uuid4
+
+from kst.console import OutputConsole
+
+console = OutputConsole(logging.getLogger(__name__))
+
+
+class TtlCache:
+    """A small JSON file backed key value store whose entries expire after a time to live.
+
+    The file is read once on first access and kept in memory afterwards. Each update merges the entry
+    into the current contents of the file and atomically replaces it, so several kst processes can share
+    the same cache file. A cache which cannot be read or written is treated as empty rather than failing
+    the command which uses it.
+
+    Attributes:
+        path (Path): The JSON file backing the cache
+        ttl (float): The number of seconds an entry is valid for after it is set. A ttl of 0 or less
+            disables the cache.
+
+    Methods:
+        get: Get the value stored for a key if it has not expired
+        set: Store a value for a key
+        delete: Remove the entry for a key
+        clear: Remove all entries
+
+    """
+
+    def __init__(self, path: Path, ttl: float) -> None:
+        self.path = path
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries: dict[str, dict] | None = None
+
+    def _read(self) -> dict[str, dict]:
+        try:
+            with self.path.open("r") as file:
+                entries = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as error:
+            console.debug(f"Ignoring unreadable cache file at {self.path}: {error}")
+            return {}
+        return entries if isinstance(entries, dict) else {}
+
+    def _write(self, entries: dict[str, dict]) -> None:
+        temp_path = self.path.with_name(f".{self.path.name}.{uuid4().hex[:8]}.tmp")
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with temp_path.open("w") as file:
+                json.dump(entries, file, indent=2)
+            os.replace(temp_path, self.path)
+        except OSError as error:
+            console.debug(f"Unable to write cache file at {self.path}: {error}")
+            temp_path.unlink(missing_ok=True)
+
+    def _update(self, key: str, entry: dict | None) -> None:
+        now = time.time()
+        with self._lock:
+            entries = {k: v for k, v in self._read().items() if isinstance(v, dict) and v.get("expires", 0) > now}
+            if entry is None:
+                entries.pop(key, None)
+            else:
+                entries[key] = entry
+            self._write(entries)
+            self._entries = entries
+
+    def get(self, key: str) -> Any | None:
+        """Get the value stored for key.
+
+        Returns:
+            Any | None: The stored value or None if the key is missing or expired
+
+        """
+        if self.ttl <= 0:
+            return None
+        with self._lock:
+            if self._entries is None:
+                self._entries = self._read()
+            entry = self._entries.get(key)
+        if not isinstance(entry, dict) or entry.get("expires", 0) <= time.time():
+            return None
+        return entry.get("value")
+
+    def set(self, key: str, value: Any) -> None:
+        """Store a JSON serializable value for key until the ttl has elapsed."""
+        if self.ttl <= 0:
+            return
+        self._update(key, {"expires": time.time() + self.ttl, "value": value})
+
+    def delete(self, key: str) -> None:
+        """Remove the entry for key if it exists."""
+        self._update(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries from the cache."""
+        with self._lock:
+            self._write({})
+            self._entries = {}
+
+
+class BlobStore:
+    """A content-addressed store of blobs keyed by the SHA-256 digest of their contents.
+
+    Besides the blobs themselves, the store keeps references which map the digest of some input to the digest
+    of a blob derived from it, for example the normalized form of a validated file. Since the keys are
+    digests, a reference found in the store is valid for any file with identical contents, no matter which
+    repository or tenant it came from. Reads and writes which fail are treated as cache misses.
+
+    Attributes:
+        root (Path): The directory the blobs and references are stored in
+        enabled (bool): Whether the store is used. A disabled store never returns a hit or writes anything.
+        hits (int): The number of references found in the store
+        misses (int): The number of references which were not found
+
+    Methods:
+        digest: Get the SHA-256 digest of some bytes
+        get: Get a blob by its digest
+        put: Store a blob and return its digest
+        get_ref: Get the blob digest a reference points to
+        set_ref: Store a reference to a blob digest
+        stats: Get the hit and miss counts
+        reset_stats: Reset the hit and miss counts
+
+    """
+
+    def __init__(self, root: Path, enabled: bool = True) -> None:
+        self.root = root
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def digest(data: Buffer) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    def _path(self, namespace: str, digest: str) -> Path:
+        return self.root / namespace / digest[:2] / digest
+
+    def _read(self, path: Path) -> bytes | None:
+        try:
+            return path.read_bytes()
+        except FileNotFoundError:
+            return None
+        except OSError as error:
+            console.debug(f"Unable to read cached blob at {path}: {error}")
+            return None
+
+    def _write(self, path: Path, data: bytes) -> None:
+        if path.exists():
+            return
+        temp_path = path.with_name(f".{path.name}.{uuid4().hex[:8]}.tmp")
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            temp_path.write_bytes(data)
+            os.replace(temp_path, path)
+        except OSError as error:
+            console.debug(f"Unable to write cached blob at {path}: {error}")
+            temp_path.unlink(missing_ok=True)
+
+    def get(self, digest: str) -> bytes | None:
+        """Get the blob with digest or None if it is not stored."""
+        if not self.enabled:
+            return None
+        data = self._read(self._path("blobs", digest))
+        if data is not None and self.digest(data) != digest:
+            console.debug(f"Ignoring corrupt cached blob {digest}")
+            return None
+        return data
+
+    def put(self, data: bytes) -> str:
+        """Store a blob and return its digest."""
+        digest = self.digest(data)
+        if self.enabled:
+            self._write(self._path("blobs", digest), data)
+        return digest
+
+    def get_ref(self, namespace: str, digest: str) -> str | None:
+        """Get the blob digest stored for digest in namespace, counting the lookup as a hit or miss."""
+        if not self.enabled:
+            return None
+        target = self._read(self._path(namespace, digest))
+        with self._lock:
+            if target is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return None if target is None else target.decode()
+
+    def set_ref(self, namespace: str, digest: str, target: str) -> None:
+        """Store a reference from digest in namespace to the blob digest target."""
+        if self.enabled:
+            self._write(self._path(namespace, digest), target.encode())
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
@@ -3,44 +3,70 @@ import logging.handlers
 from pathlib import Path
 from typing import Annotated
 
+import click
 import platformdirs
 import typer
 
 from kst.__about__ import APP_NAME, __version__
 from kst.console import OutputConsole, epilog_text
+from kst.metrics import write_metrics
+from kst.tracing import tracer
 
-from .new import app as new_app
-from .profile import app as profile_app
-from .script import app as script_app
-from .tenant import app as tenant_app
+from .lazy_group import SUBCOMMAND_ARGS_KEY, LazyCommand, lazy_group
 
 __all__ = ["app"]
 
 console = OutputConsole(logging.getLogger(__name__))
 
-app = typer.Typer(name=APP_NAME, rich_markup_mode="rich", pretty_exceptions_show_locals=False)
-app.add_typer(new_app)
-app.add_typer(
-    profile_app,
-    name="profile",
-    help="Interact with Kandji Custom Profiles",
-    epilog=epilog_text,
-    no_args_is_help=True,
-)
-app.add_typer(
-    script_app,
-    name="script",
-    help="Interact with Kandji Custom Scripts",
-    epilog=epilog_text,
-    no_args_is_help=True,
-)
-app.add_typer(
-    tenant_app,
-    name="tenant",
-    help="Manage multiple Kandji tenants",
-    epilog=epilog_text,
-    no_args_is_help=True,
-)
+# Subcommands are imported only when used to keep startup fast
+commands = [
+    LazyCommand(name="new", import_path="kst.cli.new:app", group=False),
+    LazyCommand(name="migrate", import_path="kst.cli.migrate:app", group=False),
+    LazyCommand(
+        name="profile",
+        import_path="kst.cli.profile:app",
+        help="Interact with Kandji Custom Profiles",
+        epilog=epilog_text,
+        no_args_is_help=True,
+    ),
+    LazyCommand(
+        name="script",
+        import_path="kst.cli.script:app",
+        help="Interact with Kandji Custom Scripts",
+        epilog=epilog_text,
+        no_args_is_help=True,
+    ),
+    LazyCommand(
+        name="tenant",
+        import_path="kst.cli.tenant:app",
+        help="Manage multiple Kandji tenants",
+        epilog=epilog_text,
+        no_args_is_help=True,
+    ),
+    LazyCommand(
+        name="baseline",
+        import_path="kst.cli.baseline:app",
+        help="Push a shared baseline repository to many tenants",
+        epilog=epilog_text,
+        no_args_is_help=True,
+    ),
+    LazyCommand(
+        name="report",
+        import_path="kst.cli.report:app",
+        help="Show the reports saved by sync commands",
+        epilog=epilog_text,
+        no_args_is_help=True,
+    ),
+    LazyCommand(
+        name="daemon",
+        import_path="kst.cli.daemon:app",
+        help="Run kst commands in a long lived background process",
+        epilog=epilog_text,
+        no_args_is_help=True,
+    ),
+]
+
+app = typer.Typer(name=APP_NAME, cls=lazy_group(commands), rich_markup_mode="rich", pretty_exceptions_show_locals=False)
 
 
 def version_callback(value: bool) -> None:
@@ -79,6 +105,30 @@ DebugFlag = Annotated[
         rich_help_panel="Logging",
     ),
 ]
+TracePathOption = Annotated[
+    str | None,
+    typer.Option(
+        "--trace",
+        metavar="PATH",
+        show_default=False,
+        help="Write timing spans for each phase of the command to PATH as a Chrome trace.",
+        rich_help_panel="Logging",
+        resolve_path=True,
+    ),
+]
+
+MetricsDirOption = Annotated[
+    str | None,
+    typer.Option(
+        "--metrics-dir",
+        metavar="DIR",
+        envvar="KST_METRICS_DIR",
+        show_default=False,
+        help="Write metrics for the command to a .prom file in DIR, like the textfile directory of node exporter.",
+        rich_help_panel="Logging",
+        resolve_path=True,
+    ),
+]
 
 
 AutoCdFlag = Annotated[
@@ -91,12 +141,34 @@ AutoCdFlag = Annotated[
 ]
 
 
+def invoked_command_name(ctx: click.Context) -> str:
+    """Get the full name of the subcommand invoked from ctx, like "profile sync"."""
+    names = []
+    command, args = ctx.command, list(ctx.meta.get(SUBCOMMAND_ARGS_KEY, []))
+    while isinstance(command, click.Group) and args and (subcommand := command.get_command(ctx, args[0])) is not None:
+        names.append(args.pop(0))
+        command = subcommand
+    return " ".join(names)
+
+
+def export_metrics(directory: Path, command: str) -> None:
+    """Write the metrics of the command from the spans recorded by the tracer."""
+    try:
+        path = write_metrics(directory, tracer.spans, command=command)
+    except OSError as error:
+        console.warning(f"Unable to write metrics to {directory}: {error}")
+        return
+    console.info(f"Metrics written to {path}")
+
+
 @app.callback(no_args_is_help=True, epilog=epilog_text)
 def main(
     log: LogPathOption = str(platformdirs.user_log_path(appname=APP_NAME) / f"{APP_NAME}.log"),
     debug: DebugFlag = False,
     version: VersionFlag = False,  # noqa: ARG001
     auto_cd: AutoCdFlag = False,
+    trace: TracePathOption = None,
+    metrics_dir: MetricsDirOption = None,
 ) -> None:
     """Kandji Sync Toolkit, a utility for local management of Kandji resources."""
 
@@ -116,6 +188,17 @@ def main(
     )
     console.info("--- Starting Kandji Sync Toolkit ---")
 
+    # Time the whole command and optionally export every recorded span once it completes
+    tracer.reset()
+    if (ctx := click.get_current_context(silent=True)) is not None:
+        if trace is not None:
+            trace_path = Path(trace)
+            ctx.call_on_close(lambda: console.info(f"Trace written to {trace_path}"))
+            ctx.call_on_close(lambda: tracer.write_chrome_trace(trace_path))
+        if metrics_dir is not None:
+            ctx.call_on_close(lambda: export_metrics(Path(metrics_dir), invoked_command_name(ctx)))
+        ctx.with_resource(tracer.span("command", command=ctx.invoked_subcommand))
+
     # Handle auto-cd to active tenant's repository if requested
     if auto_cd:
         try:
@@ -0,0 +1,376 @@
+import contextlib
+import logging
+from collections import defaultdict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Annotated
+from uuid import UUID
+
+import requests
+import typer
+from rich import box
+from rich.table import Table
+
+from kst.api import ApiConfig
+from kst.cli.common import (
+    ActionResponse,
+    ActionType,
+    DryRunOption,
+    OperationType,
+    PreparedAction,
+    RepoPathOption,
+    ResultType,
+    SyncResults,
+)
+from kst.cli.utility import (
+    do_push,
+    get_local_members,
+    prepare_remote_members,
+    save_report,
+    sync_concurrency,
+    validate_repo_path,
+)
+from kst.console import OutputConsole, buffered_output, epilog_text
+from kst.diff import ChangeType
+from kst.exceptions import KstError
+from kst.repository import CustomProfile, CustomScript, MemberBase, Repository, RepositoryDirectory
+from kst.repository.custom_script import get_category_index
+from kst.tenant_manager import TenantConfig, get_tenant_manager
+
+__all__ = ["app"]
+
+console = OutputConsole(logging.getLogger(__name__))
+
+app = typer.Typer(rich_markup_mode="rich")
+
+MEMBER_TYPES: tuple[type[MemberBase], ...] = (CustomProfile, CustomScript)
+
+
+# --- Baseline Specific Options ---
+TenantNameOption = Annotated[
+    list[str],
+    typer.Option(
+        "--tenant",
+        "-t",
+        show_default=False,
+        help="The name of a tenant in the tenant manager to push to. Can be repeated.",
+    ),
+]
+AllTenantsOption = Annotated[
+    bool,
+    typer.Option(
+        "--all-tenants",
+        show_default=False,
+        help="Push to every tenant in the tenant manager.",
+    ),
+]
+
+
+@dataclass
+class TenantPlan:
+    """The actions which bring one tenant in line with the baseline.
+
+    Attributes:
+        tenant (TenantConfig): The tenant to push to
+        config (ApiConfig): The API configuration of the tenant
+        actions (list[PreparedAction]): The pushes the tenant needs
+        unchanged (int): The number of baseline members which already match the tenant
+        error (str | None): Why the members of the tenant could not be fetched
+
+    """
+
+    tenant: TenantConfig
+    config: ApiConfig
+    actions: list[PreparedAction] = field(default_factory=list)
+    unchanged: int = 0
+    error: str | None = None
+
+
+def with_member_id[MemberType: MemberBase](member: MemberType, member_id: str) -> MemberType:
+    """Copy a baseline member with the ID it has in a tenant.
+
+    The copy shares the content files of the baseline member, so their contents are never parsed or hashed again.
+    """
+    return member.model_copy(update={"info": member.info.model_copy(update={"id": member_id})})
+
+
+def category_names(config: ApiConfig) -> dict[str, str]:
+    """Get a mapping of Self Service category IDs to lowercase names for the tenant in config."""
+    return {category_id: name for name, category_id in get_category_index(config).items()}
+
+
+def with_category_name[MemberType: MemberBase](member: MemberType, names: dict[str, str]) -> MemberType:
+    """Copy a script with the name of its Self Service category in place of the category ID.
+
+    Each tenant assigns its own category IDs, so scripts are compared and pushed by category name and the name is
+    resolved to an ID in each tenant. Members which are not scripts, and categories missing from names, are kept.
+    """
+    if not isinstance(member, CustomScript) or (category := member.info.self_service_category_id) is None:
+        return member
+    info = member.info.model_copy(update={"self_service_category_id": names.get(category, category).lower()})
+    return member.model_copy(update={"info": info})
+
+
+def is_category_id(category: str | None) -> bool:
+    """Check if a Self Service category is an ID rather than a name."""
+    if category is None:
+        return False
+    try:
+        UUID(category, version=4)
+    except ValueError:
+        return False
+    return True
+
+
+def name_baseline_categories(
+    baseline: Repository[CustomScript], configs: list[ApiConfig], max_workers: int
+) -> Repository[CustomScript]:
+    """Replace the Self Service category IDs of baseline scripts with category names.
+
+    A baseline pulled from a tenant holds the category IDs of that tenant, which mean nothing in the others. The IDs
+    are looked up in every selected tenant, and a script whose category ID is in none of them keeps the ID.
+    """
+    category_ids = {
+        script.info.self_service_category_id
+        for script in baseline.values()
+        if is_category_id(script.info.self_service_category_id)
+    }
+    names: dict[str, str] = {}
+    if category_ids:
+
+        def tenant_names(config: ApiConfig) -> dict[str, str]:
+            # A tenant which can't be reached reports the error when its members are fetched
+            with contextlib.suppress(requests.RequestException, KstError, ValueError):
+                return category_names(config)
+            return {}
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(configs))) as executor:
+            for tenant_index in executor.map(tenant_names, configs):
+                names |= tenant_index
+        for category_id in sorted(category_ids - names.keys()):
+            console.print_warning(
+                f"Self Service category ID {category_id} was not found in any selected tenant. Scripts in the "
+                "category are pushed with the ID, which only exists in the tenant the baseline was pulled from."
+            )
+    return Repository[CustomScript](with_category_name(script, names) for script in baseline.values())
+
+
+def plan_tenant_actions[MemberType: MemberBase](
+    baseline: Repository[MemberType], remote_repo: Repository[MemberType], categories: dict[str, str] | None = None
+) -> tuple[list[PreparedAction[MemberType]], int]:
+    """Compare the baseline with the members of one tenant.
+
+    A baseline member is matched with the tenant member which has the same ID, like when the baseline was pulled
+    from the tenant. Otherwise it is matched by name since each tenant assigns its own IDs. A baseline member which
+    is missing from the tenant is created, and one which differs from its match is updated with the tenant's ID.
+    Members which only exist in the tenant are left alone. A name which matches more than one member in the tenant
+    is ambiguous, so the member is skipped with a conflict for the caller to report.
+
+    Scripts are compared by Self Service category name, so the baseline should already hold category names (see
+    name_baseline_categories) and categories maps the category IDs of the tenant to their names.
+
+    Returns:
+        tuple: The push actions and the number of baseline members which already match the tenant.
+
+    """
+    if categories is not None:
+        remote_repo = Repository[MemberType](with_category_name(member, categories) for member in remote_repo.values())
+    matched_ids = {member.id for member in baseline.values() if member.id in remote_repo}
+    remote_by_name: dict[str, list[MemberType]] = defaultdict(list)
+    for remote_member in remote_repo.values():
+        if remote_member.id not in matched_ids:
+            remote_by_name[remote_member.name].append(remote_member)
+
+    actions: list[PreparedAction[MemberType]] = []
+    unchanged = 0
+    for member in baseline.values():
+        matches = [remote_repo[member.id]] if member.id in matched_ids else remote_by_name.get(member.name, [])
+        if not matches:
+            actions.append(PreparedAction(ActionType.CREATE, OperationType.PUSH, ChangeType.CREATE_LOCAL, member))
+        elif len(matches) > 1:
+            actions.append(PreparedAction(ActionType.SKIP, OperationType.SKIP, ChangeType.CONFLICT, member))
+        elif (tenant_member := with_member_id(member, matches[0].id)).diff_hash == matches[0].diff_hash:
+            unchanged += 1
+        else:
+            actions.append(
+                PreparedAction(ActionType.UPDATE, OperationType.PUSH, ChangeType.UPDATE_LOCAL, tenant_member)
+            )
+    return actions, unchanged
+
+
+def plan_tenant(tenant: TenantConfig, baselines: list[Repository]) -> TenantPlan:
+    """Fetch the members of a tenant and compare them with each baseline repository."""
+    plan = TenantPlan(tenant=tenant, config=tenant.api_config)
+    try:
+        for baseline in baselines:
+            member_type = baseline.member_type
+            remote_repo = Repository[member_type](
+                member_type.from_api_payload(payload) for payload in member_type.list_remote(config=plan.config).results
+            )
+            categories = category_names(plan.config) if member_type is CustomScript else None
+            actions, unchanged = plan_tenant_actions(baseline, remote_repo, categories)
+            plan.actions.extend(actions)
+            plan.unchanged += unchanged
+    except (requests.RequestException, KstError, ValueError) as error:
+        # A tenant which fails is reported on its own without stopping the push to the other tenants
+        plan.error = str(error)
+    return plan
+
+
+def push_baseline(plans: list[TenantPlan], max_workers: int) -> dict[str, SyncResults]:
+    """Push the planned actions to every tenant at once.
+
+    Returns:
+        dict[str, SyncResults]: The results of each tenant by name, in the order of its actions.
+
+    """
+    results: dict[str, SyncResults] = {}
+    with buffered_output(), ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Resolving what the members need from each tenant, like script categories, is done once per tenant
+        for plan in plans:
+            prepare_remote_members(config=plan.config, actions=plan.actions)
+
+        futures: dict[str, list[Future[ActionResponse]]] = {
+            plan.tenant.name: [
+                executor.submit(do_push, config=plan.config, local_repo=None, action=action) for action in plan.actions
+            ]
+            for plan in plans
+        }
+        for tenant_name, tenant_futures in futures.items():
+            tenant_results = results[tenant_name] = SyncResults()
+            for future in tenant_futures:
+                response = future.result()
+                match response.result:
+                    case ResultType.SUCCESS:
+                        tenant_results.success.append(response)
+                    case ResultType.FAILURE:
+                        tenant_results.failure.append(response)
+                    case ResultType.SKIPPED:
+                        tenant_results.skipped.append(response)
+    return results
+
+
+def format_baseline_table(plans: list[TenantPlan], results: dict[str, SyncResults]) -> Table:
+    """Format the outcome of a baseline push with a row for each tenant."""
+    table = Table(box=box.SIMPLE)
+    table.add_column("Tenant", style="bold")
+    table.add_column("Unchanged", justify="right")
+    table.add_column("Success", justify="right")
+    table.add_column("Failure", justify="right")
+    table.add_column("Skipped", justify="right")
+    for plan in plans:
+        if plan.error is not None:
+            table.add_row(plan.tenant.name, "", "", "[red]fetch failed[/]", "")
+            continue
+        tenant_results = results.get(plan.tenant.name, SyncResults())
+        table.add_row(
+            plan.tenant.name,
+            str(plan.unchanged),
+            str(len(tenant_results.success)),
+            str(len(tenant_results.failure)),
+            str(len(tenant_results.skipped)),
+        )
+    return table
+
+
+@app.command(name="push", no_args_is_help=True, epilog=epilog_text)
+def push_baseline_command(
+    repo_str: RepoPathOption = ".",
+    tenant_names: TenantNameOption = [],
+    all_tenants: AllTenantsOption = False,
+    dry_run: DryRunOption = False,
+):
+    """
+    Push the profiles and scripts of a shared baseline repository to many tenants.
+
+    The baseline is loaded, validated and hashed once and every tenant is
+    compared with the same members. Baseline members are matched with the
+    members of each tenant by ID, or by name since each tenant assigns its own
+    IDs. Members whose name matches more than one member of a tenant are
+    skipped and reported as errors.
+    Missing members are created and members which differ are updated. Members
+    which are only in a tenant are left alone. The tenants are pushed to at the
+    same time. Self Service categories of scripts are compared and pushed by
+    name since each tenant assigns its own category IDs too.
+
+    Tenants are selected by name from the tenant manager with --tenant or all at
+    once with --all-tenants. The baseline repository is never modified.
+
+    """
+
+    root = validate_repo_path(repo=repo_str)
+
+    tenant_manager = get_tenant_manager()
+    tenants = tenant_manager.list_tenants() if all_tenants else []
+    for name in tenant_names if not all_tenants else []:
+        if (tenant := tenant_manager.get_tenant(name)) is None:
+            msg = f"Tenant '{name}' does not exist. Use 'kst tenant list' to see the configured tenants."
+            console.error(msg)
+            raise typer.BadParameter(msg)
+        tenants.append(tenant)
+    if not tenants:
+        msg = "No tenants selected to push to. Use --tenant or --all-tenants to select tenants."
+        console.error(msg)
+        raise typer.BadParameter(msg)
+
+    # The baseline is loaded once and its members are shared by every tenant
+    baselines = [
+        get_local_members(
+            repo=root / RepositoryDirectory.from_type(member_type), member_type=member_type, all_members=True
+        )
+        for member_type in MEMBER_TYPES
+        if (root / RepositoryDirectory.from_type(member_type)).is_dir()
+    ]
+    baselines = [baseline for baseline in baselines if len(baseline) > 0]
+
+    max_workers = sync_concurrency()
+    baselines = [
+        name_baseline_categories(baseline, [tenant.api_config for tenant in tenants], max_workers)
+        if baseline.member_type is CustomScript
+        else baseline
+        for baseline in baselines
+    ]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(tenants))) as executor:
+        plans = list(executor.map(lambda tenant: plan_tenant(tenant, baselines), tenants))
+
+    ambiguous = False
+    for plan in plans:
+        if plan.error is not None:
+            console.print_error(f"Failed to fetch the members of tenant '{plan.tenant.name}': {plan.error}")
+        for action in plan.actions:
+            if action.action is ActionType.SKIP:
+                ambiguous = True
+                console.print_error(
+                    f"{type(action.member).__name__} '{action.member.name}' matches more than one member in tenant "
+                    f"'{plan.tenant.name}' and was skipped. Rename the duplicates in the tenant and try again."
+                )
+
+    if dry_run:
+        console.print("Running in dry-run mode")
+        for plan in plans:
+            for action in plan.actions:
+                if action.action is ActionType.SKIP:
+                    continue
+                console.print(
+                    f"Would have {action.action.past_tense()} {type(action.member).__name__}: "
+                    f"[yellow]{action.member.name}[/] in tenant [yellow]{plan.tenant.name}[/]"
+                )
+        console.print("Dry run complete. No changes were made.")
+        if ambiguous:
+            raise typer.Exit(code=1)
+        return
+
+    pushed_plans = [plan for plan in plans if plan.error is None]
+    num_actions = sum(len(plan.actions) for plan in pushed_plans)
+    if num_actions > 0:
+        console.print(f"Pushing {num_actions} change{'s' if num_actions > 1 else ''} to {len(pushed_plans)} tenants...")
+    results = push_baseline(pushed_plans, max_workers=max_workers)
+
+    for plan in pushed_plans:
+        save_report(results=results[plan.tenant.name], tenant={"name": plan.tenant.name, "url": plan.config.url})
+
+    console.print("Baseline push complete!")
+    console.print(format_baseline_table(plans, results))
+
+    if ambiguous or any(plan.error is not None for plan in plans) or any(r.failure for r in results.values()):
+        raise typer.Exit(code=1)
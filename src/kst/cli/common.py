@@ -10,6 +10,8 @@ import typer
 from kst.console import OutputConsole, OutputFormat, SyntaxType
 from kst.diff import ChangeType
 from kst.repository import MemberBase
+from kst.repository.content import blob_store
+from kst.tracing import tracer
 
 console = OutputConsole(logging.getLogger(__name__))
 
@@ -51,6 +53,14 @@ DryRunOption = Annotated[
         show_default=False,
     ),
 ]
+ResumeOption = Annotated[
+    bool,
+    typer.Option(
+        "--resume",
+        help="Resume the previous run which did not complete, skipping the changes it already made.",
+        show_default=False,
+    ),
+]
 ForceOption = Annotated[
     bool,
     typer.Option(
@@ -172,41 +182,56 @@ class SyncResults[MemberType: MemberBase]:
     success: list[ActionResponse[MemberType]] = field(default_factory=list)
     failure: list[ActionResponse[MemberType]] = field(default_factory=list)
     skipped: list[ActionResponse[MemberType]] = field(default_factory=list)
+    unchanged_files: int = 0  # The number of local files which were not rewritten because they were already identical
 
     def format_summary(self) -> str:
         """Format the summary of the results."""
 
-        success_count = len(self.success)
-        failure_count = len(self.failure)
-        skipped_count = len(self.skipped)
+        sections = []
 
-        summary = ""
+        if self.success:
+            lines = [f"Success ({len(self.success)})"]
+            lines.extend(
+                f"- {success.action.capitalize()} {success.member.name + ' ' if success.member else ''}{success.id} {'in repository' if success.operation is OperationType.PULL else 'in Kandji'}"
+                for success in self.success
+            )
+            sections.append("\n".join(lines))
 
-        if success_count > 0:
-            summary += f"\n\nSuccess ({success_count})"
-            for success in self.success:
-                summary += f"\n- {success.action.capitalize()} {success.member.name + ' ' if success.member else ''}{success.id} {'in repository' if success.operation is OperationType.PULL else 'in Kandji'}"
+        if self.failure:
+            lines = [f"Failure ({len(self.failure)})"]
+            lines.extend(
+                f"- {failure.action.capitalize()} {failure.member.name + ' ' if failure.member else ''}{failure.id} {'in repository' if failure.operation is OperationType.PULL else 'in Kandji'}"
+                for failure in self.failure
+            )
+            sections.append("\n".join(lines))
 
-        if failure_count > 0:
-            summary += f"\n\nFailure ({failure_count})"
-            for failure in self.failure:
-                summary += f"\n- {failure.action.capitalize()} {failure.member.name + ' ' if failure.member else ''}{failure.id} {'in repository' if failure.operation is OperationType.PULL else 'in Kandji'}"
+        if self.skipped:
+            lines = [f"Skipped ({len(self.skipped)})"]
+            lines.extend(
+                f"- {skipped.action.capitalize()} {skipped.member.name + ' ' if skipped.member else ''}{skipped.id} "
+                for skipped in self.skipped
+            )
+            sections.append("\n".join(lines))
 
-        if skipped_count > 0:
-            summary += f"\n\nSkipped ({skipped_count})"
-            for skipped in self.skipped:
-                summary += f"\n- {skipped.action.capitalize()} {skipped.member.name + ' ' if skipped.member else ''}{skipped.id} "
+        return "\n\n".join(sections)
 
-        return summary.lstrip()
+    def format_report(self, tenant: dict[str, str] | None = None) -> dict:
+        """Format the results for display.
 
-    def format_report(self) -> dict:
-        """Format the results for display."""
+        The report includes the time spent in each phase of the current command as recorded by the tracer and
+        the hit and miss counts of the content cache. Commands which push to many tenants record the name and
+        URL of the tenant each report belongs to.
+        """
 
         return {
             "id": str(uuid4()),
             "timestamp": datetime.now(UTC).replace(microsecond=0).isoformat(),
+            "tenant": tenant,
             "summary": self.format_summary(),
             "status": "failure" if len(self.failure) != 0 else "warning" if len(self.skipped) != 0 else "success",
+            "unchanged_files": self.unchanged_files,
+            "timings": tracer.summary(),
+            "content_cache": blob_store.stats(),
             "success": [
                 {
                     "id": success.id,
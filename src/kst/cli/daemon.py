@@ -0,0 +1,90 @@
+import logging
+import socket
+from pathlib import Path
+from typing import Annotated
+
+import typer
+
+from kst.console import OutputConsole, epilog_text
+from kst.daemon import request, socket_path
+
+__all__ = ["app"]
+
+console = OutputConsole(logging.getLogger(__name__))
+
+app = typer.Typer(rich_markup_mode="rich")
+
+SocketOption = Annotated[
+    str | None,
+    typer.Option(
+        "--socket",
+        metavar="PATH",
+        show_default=False,
+        envvar="KST_DAEMON_SOCKET",
+        help="Path to the daemon's Unix socket.",
+    ),
+]
+
+
+def resolve_socket(socket_str: str | None) -> Path:
+    return Path(socket_str).expanduser().resolve() if socket_str else socket_path()
+
+
+@app.command(name="start", epilog=epilog_text)
+def start_daemon(socket_str: SocketOption = None):
+    """Start a kst daemon in the foreground.
+
+    While the daemon is running, `kst` commands are forwarded to it instead of
+    starting a new process. The daemon keeps HTTP connections, tenant
+    validations, git lookups and parsed repository members warm between
+    commands.
+
+    Commands run by the daemon can't prompt for input, so provide credentials
+    using environment variables or the tenant manager. Set [bold]KST_NO_DAEMON=1[/]
+    to run a single command without the daemon.
+    """
+
+    if not hasattr(socket, "AF_UNIX"):
+        console.print_error("The kst daemon requires Unix domain socket support.")
+        raise typer.Exit(code=1)
+
+    from kst.daemon.server import DaemonServer
+
+    path = resolve_socket(socket_str)
+    try:
+        server = DaemonServer(path)
+    except FileExistsError as error:
+        console.print_error(str(error))
+        raise typer.Exit(code=1)
+
+    server.warm_up()
+    console.print(f"kst daemon listening at {path}")
+    server.serve()
+    console.print("kst daemon stopped")
+
+
+@app.command(name="stop", epilog=epilog_text)
+def stop_daemon(socket_str: SocketOption = None):
+    """Stop a running kst daemon."""
+
+    path = resolve_socket(socket_str)
+    if request({"control": "stop"}, path=path) is None:
+        console.print_error(f"No kst daemon is running at {path}")
+        raise typer.Exit(code=1)
+    console.print_success(f"Stopped the kst daemon at {path}")
+
+
+@app.command(name="status", epilog=epilog_text)
+def daemon_status(socket_str: SocketOption = None):
+    """Show the status of the kst daemon."""
+
+    path = resolve_socket(socket_str)
+    status = request({"control": "status"}, path=path)
+    if status is None:
+        console.print(f"No kst daemon is running at {path}")
+        raise typer.Exit(code=1)
+
+    console.print(
+        f"kst daemon running at {status['socket']} (pid {status['pid']}) for {status['uptime']:.0f}s, "
+        f"{status['served']} command{'s' if status['served'] != 1 else ''} served"
+    )
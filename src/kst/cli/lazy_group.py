@@ -0,0 +1,105 @@
+import importlib
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import ClassVar, override
+
+import click
+import typer
+from typer.core import TyperGroup
+
+# The key in the click context meta of the arguments following the options of the group
+SUBCOMMAND_ARGS_KEY = "kst.subcommand_args"
+
+
+@dataclass(frozen=True)
+class LazyCommand:
+    """A subcommand whose module is only imported when the subcommand is used.
+
+    Attributes:
+        name (str): The name of the subcommand
+        import_path (str): The location of the Typer app in the form "module:attribute"
+        group (bool): Whether the Typer app is added as a named group of commands. If False, the app's command
+            with the same name is added directly.
+        help (str | None): The help text for a group
+        epilog (str | None): The epilog text for a group
+        no_args_is_help (bool): Whether to show the help of a group when no arguments are passed
+
+    """
+
+    name: str
+    import_path: str
+    group: bool = True
+    help: str | None = None
+    epilog: str | None = None
+    no_args_is_help: bool = False
+
+    def load(self) -> click.Command:
+        """Import the Typer app and convert it to a click command.
+
+        The app is added to an empty Typer app the same way it would be added to the main app, and converted with
+        Typer's public get_command, so no private Typer functions are needed.
+        """
+        module_name, _, attribute = self.import_path.partition(":")
+        typer_app = getattr(importlib.import_module(module_name), attribute)
+
+        parent = typer.Typer(
+            add_completion=False,
+            pretty_exceptions_short=typer_app.pretty_exceptions_short,
+            rich_markup_mode=typer_app.rich_markup_mode,
+        )
+        if self.group:
+            parent.add_typer(
+                typer_app, name=self.name, help=self.help, epilog=self.epilog, no_args_is_help=self.no_args_is_help
+            )
+        else:
+            # Without a name the commands of the app are added directly to the parent
+            parent.add_typer(typer_app)
+
+        group = typer.main.get_command(parent)
+        if not isinstance(group, click.Group) or (command := group.commands.get(self.name)) is None:
+            raise LookupError(f"No command named {self.name} in {self.import_path}")
+        return command
+
+
+class LazyTyperGroup(TyperGroup):
+    """A TyperGroup which imports the modules of its subcommands on first use.
+
+    Only the subcommand being invoked is imported, so commands like `kst tenant current` or `kst --version`
+    don't pay for importing the dependencies of every other subcommand. Listing the commands, for example
+    in the help screen, still imports all of them.
+
+    Use lazy_group to create a subclass with a set of lazy commands to pass as the cls of a Typer app.
+    """
+
+    lazy_commands: ClassVar[dict[str, LazyCommand]] = {}
+
+    @override
+    def resolve_command(
+        self, ctx: click.Context, args: list[str]
+    ) -> tuple[str | None, click.Command | None, list[str]]:
+        # Click discards the arguments once the subcommand runs, so keep them for naming the invoked subcommand
+        ctx.meta[SUBCOMMAND_ARGS_KEY] = list(args)
+        return super().resolve_command(ctx, args)
+
+    @override
+    def list_commands(self, ctx: click.Context) -> list[str]:
+        return [*super().list_commands(ctx), *(name for name in self.lazy_commands if name not in self.commands)]
+
+    @override
+    def get_command(self, ctx: click.Context, cmd_name: str) -> click.Command | None:
+        if cmd_name not in self.commands and cmd_name in self.lazy_commands:
+            self.add_command(self.lazy_commands[cmd_name].load(), cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+
+def lazy_group(commands: Iterable[LazyCommand]) -> type[LazyTyperGroup]:
+    """Create a LazyTyperGroup subclass which loads commands on demand.
+
+    Args:
+        commands (Iterable[LazyCommand]): The lazy subcommands in the order they should be listed
+
+    Returns:
+        type[LazyTyperGroup]: A group class to pass as the cls argument of a Typer app
+
+    """
+    return type("LazyTyperGroup", (LazyTyperGroup,), {"lazy_commands": {command.name: command for command in commands}})
@@ -0,0 +1,146 @@
+import contextlib
+import logging
+from pathlib import Path
+from typing import Annotated
+from uuid import uuid4
+
+import typer
+
+from kst import git
+from kst.cli.common import DryRunOption, RepoPathOption
+from kst.cli.utility import get_local_members, validate_repo_path
+from kst.console import OutputConsole, epilog_text
+from kst.exceptions import GitRepositoryError
+from kst.repository import (
+    CustomProfile,
+    CustomScript,
+    MemberBase,
+    MemberDirectoryIndex,
+    RepositoryDirectory,
+    RepositoryLayout,
+)
+from kst.repository.layout import is_shard, read_layout, write_layout
+
+__all__ = ["app"]
+
+console = OutputConsole(logging.getLogger(__name__))
+
+app = typer.Typer(rich_markup_mode="rich")
+
+MEMBER_TYPES: dict[RepositoryDirectory, type[MemberBase]] = {
+    RepositoryDirectory.PROFILES: CustomProfile,
+    RepositoryDirectory.SCRIPTS: CustomScript,
+}
+
+LayoutArgument = Annotated[
+    RepositoryLayout,
+    typer.Argument(
+        metavar="LAYOUT",
+        show_default=False,
+        help="The layout to move the repository to (flat or sharded).",
+    ),
+]
+
+
+def plan_layout_moves(root: Path, layout: RepositoryLayout) -> list[tuple[Path, Path]]:
+    """Find the member directories which must move for the repository at root to use layout.
+
+    Moving to the sharded layout moves every member which is not already in the shard of its ID. Moving to the
+    flat layout only moves members out of shards, including shards which no longer match the IDs of their members,
+    so members kept in other subdirectories stay where they are.
+
+    Returns:
+        list[tuple[Path, Path]]: The current and new directory of each member which must move.
+
+    """
+    directory_index = MemberDirectoryIndex()
+    moves = []
+    for directory, member_type in MEMBER_TYPES.items():
+        members_root = root / directory
+        if not members_root.is_dir():
+            continue
+        for member in get_local_members(repo=members_root, member_type=member_type, all_members=True).values():
+            source = member.info_path.parent
+            if layout is RepositoryLayout.SHARDED:
+                in_place = source.parent == layout.parent_for(members_root, member.id)
+            else:
+                in_place = not is_shard(members_root, source.parent)
+            if in_place:
+                continue
+            target = directory_index.allocate(layout.parent_for(members_root, member.id), source.name)
+            moves.append((source, target))
+    return moves
+
+
+def move_member_directories(moves: list[tuple[Path, Path]]) -> None:
+    """Move each member directory to its new location and remove any directories left empty."""
+    # A member directory may have the same path as a shard, so it is moved aside before the shard is created
+    target_parents = {target.parent for _, target in moves}
+    staged = []
+    for source, target in moves:
+        if source in target_parents:
+            aside = source.with_name(f".{source.name}.{uuid4().hex[:8]}.migrating")
+            source.rename(aside)
+            staged.append((source, aside, target))
+        else:
+            staged.append((source, source, target))
+
+    for source, current, target in staged:
+        console.debug(f"Moving {source} to {target}")
+        target.parent.mkdir(parents=True, exist_ok=True)
+        current.rename(target)
+
+    # Remove shards and other subdirectories which are now empty, stopping at the first one which is not
+    for source_parent in {source.parent for source, _ in moves}:
+        directory = source_parent
+        with contextlib.suppress(OSError):
+            while directory not in target_parents:
+                directory.rmdir()
+                directory = directory.parent
+
+
+@app.command(name="migrate", epilog=epilog_text, no_args_is_help=True)
+def migrate_repo(layout: LayoutArgument, repo_str: RepoPathOption = ".", dry_run: DryRunOption = False):
+    """Move the members of a repository to a new layout.
+
+    The flat layout keeps member directories directly in the profiles and scripts
+    directories. The sharded layout groups member directories by the first two
+    characters of their ID, which keeps directories small in libraries with many
+    thousands of members.
+
+    Changes are committed to the repository before and after the migration.
+    """
+
+    root = validate_repo_path(repo=repo_str)
+    moves = plan_layout_moves(root, layout)
+
+    if not moves and read_layout(root) is layout:
+        console.print(f"The repository already uses the {layout} layout.")
+        return
+
+    if dry_run:
+        console.print("Running in dry-run mode")
+        for source, target in moves:
+            console.print(
+                f"Would have moved [yellow]{source.relative_to(root)}[/] to [yellow]{target.relative_to(root)}[/]"
+            )
+        console.print("Dry run complete. No changes were made.")
+        return
+
+    try:
+        git.commit_all_changes(cd_path=root, message=f"Before migrating to the {layout} layout")
+    except GitRepositoryError as error:
+        console.print_error(f"Failed to commit changes to the local repository before migrating: {error}")
+        raise typer.Abort
+
+    move_member_directories(moves)
+    write_layout(root, layout)
+
+    try:
+        git.commit_all_changes(cd_path=root, message=f"Migrate to the {layout} layout")
+    except GitRepositoryError:
+        console.print_error(
+            f"The repository was migrated but the changes were not committed. Please commit manually by running `git add --all && git commit -m 'Migrate to the {layout} layout'`."
+        )
+
+    console.print_success(f"Moved {len(moves)} member{'s' if len(moves) != 1 else ''} to the {layout} layout.")
@@ -9,7 +9,8 @@ import typer
 from kst import git
 from kst.console import OutputConsole, epilog_text
 from kst.exceptions import GitRepositoryError, InvalidRepositoryError
-from kst.repository import RepositoryDirectory
+from kst.repository import RepositoryDirectory, RepositoryLayout
+from kst.repository.layout import write_layout
 
 __all__ = ["app"]
 
@@ -29,10 +30,17 @@ PathOption = Annotated[
         help="A Path to the directory where the new repository should be initialized.",
     ),
 ]
+LayoutOption = Annotated[
+    RepositoryLayout,
+    typer.Option(
+        "--layout",
+        help="How member directories are arranged. Use sharded for libraries with many thousands of members.",
+    ),
+]
 
 
 @app.command(name="new", epilog=epilog_text, no_args_is_help=True)
-def new_repo(path_str: PathOption):
+def new_repo(path_str: PathOption, layout: LayoutOption = RepositoryLayout.FLAT):
     """Create a new repository"""
 
     # Check if the path already exists and raise an error if it does.
@@ -55,6 +63,7 @@ def new_repo(path_str: PathOption):
     # Create the directory and initial files.
     path.mkdir(parents=True)
     (path / ".kst").touch()
+    write_layout(path, layout)
     (path / "README.md").write_text(readme_text)
     (path / ".gitignore").write_text(macos_gitignore_text)
     (path / RepositoryDirectory.PROFILES).mkdir()
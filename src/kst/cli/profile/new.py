@@ -124,14 +124,13 @@ def new_profile(
     if import_profile_path is not None:
         try:
             mobileconfig = Mobileconfig.load(import_profile_path)
+            if name is None:
+                name = mobileconfig.data.get("PayloadDisplayName", None)
         except InvalidProfileError as error:
             console.error(f"Failed to load profile data from {import_profile_path}: {error}")
             raise typer.BadParameter(
                 f"The profile ({import_profile_path}) is in an invalid format. Check the file and try again."
             )
-
-        if name is None:
-            name = mobileconfig.data.get("PayloadDisplayName", None)
     else:
         mobileconfig = None
 
@@ -11,6 +11,7 @@ from kst.cli.common import (
     DryRunOption,
     KandjiTenantOption,
     RepoPathOption,
+    ResumeOption,
 )
 from kst.cli.utility import (
     api_config_prompt,
@@ -18,6 +19,7 @@ from kst.cli.utility import (
     filter_changes,
     get_local_members,
     get_remote_members,
+    load_resume_state,
     prepare_push_actions,
     save_report,
     show_push_report,
@@ -26,6 +28,7 @@ from kst.cli.utility import (
 )
 from kst.console import OutputConsole, epilog_text
 from kst.exceptions import GitRepositoryError
+from kst.journal import ActionJournal
 from kst.repository import CustomProfile, RepositoryDirectory
 
 from .common import (
@@ -67,6 +70,7 @@ def push_profiles(
     force: ForceOption = False,
     clean: CleanOption = False,
     dry_run: DryRunOption = False,
+    resume: ResumeOption = False,
     tenant_url: KandjiTenantOption = None,
     api_token: ApiTokenOption = None,
 ):
@@ -86,6 +90,10 @@ def push_profiles(
     If --clean is used, profiles will be deleted from Kandji if they are not in
     the local repository. --clean can only be used with --all.
 
+    If --resume is used, the previous push which did not complete is continued
+    with its original options. Only the profiles it did not finish pushing are
+    compared and pushed again.
+
     """
 
     repo = validate_repo_path(repo=repo_str, subdir=RepositoryDirectory.PROFILES)
@@ -98,7 +106,7 @@ def push_profiles(
         raise typer.BadParameter(msg)
 
     # Check if any profiles are selected
-    if not (all_profiles or paths or profile_ids):
+    if not (all_profiles or paths or profile_ids or resume):
         msg = "No profiles selected to push. Use --all, --path, or --id to select profiles."
         console.error(msg)
         raise typer.BadParameter(msg)
@@ -109,8 +117,17 @@ def push_profiles(
     # Ensure tenant URL and API token are provided
     config = api_config_prompt(tenant_url, api_token)
 
-    # Convert profile ID's to strings and remove any duplicates
-    profile_ids_set = set(map(str, profile_ids))
+    journal = ActionJournal.for_command(repo, "profile-push")
+    if resume:
+        state = load_resume_state(journal, config)
+        # Only the profiles without a completed action are loaded and compared again
+        all_profiles, paths, profile_ids = False, [], []
+        force = state.options.get("force", force)
+        clean = state.options.get("clean", clean)
+        profile_ids_set = state.pending_ids
+    else:
+        # Convert profile IDs to strings and remove any duplicates
+        profile_ids_set = set(map(str, profile_ids))
 
     # Get profiles to push
     local_repo = get_local_members(
@@ -167,7 +184,10 @@ def push_profiles(
         raise typer.Abort
 
     # Push changes to Kandji
-    push_results = do_pushes(config=config, local_repo=local_repo, actions=actions)
+    with journal.recording(
+        command="profile-push", tenant=str(config.url), actions=actions, options={"force": force, "clean": clean}
+    ):
+        push_results = do_pushes(config=config, local_repo=local_repo, actions=actions, journal=journal)
 
     # Commit changes after pushing
     try:
@@ -13,6 +13,7 @@ from kst.cli.common import (
     KandjiTenantOption,
     OperationType,
     RepoPathOption,
+    ResumeOption,
 )
 from kst.cli.utility import (
     api_config_prompt,
@@ -20,6 +21,7 @@ from kst.cli.utility import (
     filter_changes,
     get_local_members,
     get_remote_members,
+    load_resume_state,
     prepare_sync_actions,
     save_report,
     show_sync_report,
@@ -28,6 +30,7 @@ from kst.cli.utility import (
 )
 from kst.console import OutputConsole, epilog_text
 from kst.exceptions import GitRepositoryError
+from kst.journal import ActionJournal
 from kst.repository import CustomProfile, RepositoryDirectory
 
 from .common import (
@@ -69,6 +72,7 @@ def sync_profiles(
     all_profiles: ProfileAllOption = False,
     force_mode: ForceModeOption = ForceMode.SKIP,
     dry_run: DryRunOption = False,
+    resume: ResumeOption = False,
     tenant_url: KandjiTenantOption = None,
     api_token: ApiTokenOption = None,
 ):
@@ -85,13 +89,17 @@ def sync_profiles(
     as if each was passed individually using `--path`.
 
     If `--all` is used, all profiles will be synced overriding other options.
+
+    If `--resume` is used, the previous sync which did not complete is continued
+    with its original options. Only the profiles it did not finish syncing are
+    compared and synced again.
     """
 
     repo = validate_repo_path(repo=repo_str, subdir=RepositoryDirectory.PROFILES)
     paths = [Path(path).expanduser().resolve() for path in paths_str]
 
     # Check if any profiles are selected
-    if not (all_profiles or paths or profile_ids):
+    if not (all_profiles or paths or profile_ids or resume):
         raise typer.BadParameter("No profiles selected to push. Use --all, --path, or --id to select profiles.")
 
     if dry_run:
@@ -100,8 +108,16 @@ def sync_profiles(
     # Ensure tenant URL and API token are provided
     config = api_config_prompt(tenant_url, api_token)
 
-    # Convert profile IDs to strings and remove any duplicates
-    profile_ids_set = set(map(str, profile_ids))
+    journal = ActionJournal.for_command(repo, "profile-sync")
+    if resume:
+        state = load_resume_state(journal, config)
+        # Only the profiles without a completed action are loaded and compared again
+        all_profiles, paths, profile_ids = False, [], []
+        force_mode = ForceMode(state.options.get("force_mode", force_mode))
+        profile_ids_set = state.pending_ids
+    else:
+        # Convert profile IDs to strings and remove any duplicates
+        profile_ids_set = set(map(str, profile_ids))
 
     # Get profiles to push
     local_repo = get_local_members(
@@ -160,7 +176,10 @@ def sync_profiles(
         raise typer.Abort
 
     # Push changes to Kandji
-    sync_results = do_sync(config=config, local_repo=local_repo, actions=actions)
+    with journal.recording(
+        command="profile-sync", tenant=str(config.url), actions=actions, options={"force_mode": str(force_mode)}
+    ):
+        sync_results = do_sync(config=config, local_repo=local_repo, actions=actions, journal=journal)
 
     # Commit changes after sync
     try:
@@ -0,0 +1,147 @@
+import io
+import json
+import logging
+import plistlib
+from itertools import islice
+from typing import Annotated, Any
+
+import typer
+from rich import box
+from rich.table import Table
+
+from kst.cli.common import FormatOption
+from kst.console import OutputConsole, OutputFormat, epilog_text
+from kst.reports import ReportStore
+
+__all__ = ["app"]
+
+console = OutputConsole(logging.getLogger(__name__))
+
+app = typer.Typer(rich_markup_mode="rich")
+
+STATUS_STYLES = {"success": "green", "warning": "yellow", "failure": "red"}
+
+
+# --- Report Specific Options ---
+LimitOption = Annotated[
+    int,
+    typer.Option(
+        "--limit",
+        "-n",
+        min=1,
+        help="The maximum number of reports to show.",
+    ),
+]
+StatusOption = Annotated[
+    list[str],
+    typer.Option(
+        "--status",
+        "-s",
+        show_default=False,
+        help="Only show reports with the given status (success, warning or failure). Can be repeated.",
+    ),
+]
+ReportIdArgument = Annotated[
+    str,
+    typer.Argument(
+        metavar="ID",
+        show_default=False,
+        help="The ID of the report, or the start of it.",
+    ),
+]
+
+
+def summarize_report(report: dict[str, Any]) -> dict[str, Any]:
+    """Reduce a report to the fields shown by the list command."""
+    return {
+        "id": report.get("id"),
+        "timestamp": report.get("timestamp"),
+        "tenant": (report.get("tenant") or {}).get("name"),
+        "status": report.get("status"),
+        "success": len(report.get("success", [])),
+        "failure": len(report.get("failure", [])),
+        "skipped": len(report.get("skipped", [])),
+        "elapsed": report.get("timings", {}).get("elapsed"),
+    }
+
+
+def drop_none(value: Any) -> Any:
+    """Recursively remove None values since plistlib does not support them."""
+    if isinstance(value, dict):
+        return {k: drop_none(v) for k, v in value.items() if v is not None}
+    if isinstance(value, list):
+        return [drop_none(v) for v in value if v is not None]
+    return value
+
+
+def format_data(data: Any, format: OutputFormat) -> str:
+    """Format report data as JSON, YAML or plist."""
+    match format:
+        case OutputFormat.PLIST:
+            return plistlib.dumps(drop_none(data), fmt=plistlib.FMT_XML, sort_keys=False).decode()
+        case OutputFormat.YAML:
+            from kst.utils import yaml
+
+            output_str = io.StringIO()
+            yaml.dump(data, output_str)
+            return output_str.getvalue()
+        case _:
+            return json.dumps(data, indent=2)
+
+
+def format_report_table(summaries: list[dict[str, Any]]) -> Table:
+    table_width = min(max(console.width - 1, 78), 120)
+    table = Table(box=box.SIMPLE, width=table_width)
+    table.add_column("ID", style="bold italic", width=36)
+    table.add_column("Timestamp")
+    table.add_column("Status")
+    table.add_column("Success", justify="right")
+    table.add_column("Failure", justify="right")
+    table.add_column("Skipped", justify="right")
+    for summary in summaries:
+        style = STATUS_STYLES.get(str(summary["status"]), "none")
+        table.add_row(
+            str(summary["id"]),
+            str(summary["timestamp"]),
+            f"[{style}]{summary['status']}[/]",
+            str(summary["success"]),
+            str(summary["failure"]),
+            str(summary["skipped"]),
+        )
+    return table
+
+
+@app.command(name="list", epilog=epilog_text)
+def list_reports(limit: LimitOption = 10, status: StatusOption = [], format: FormatOption = OutputFormat.TABLE):
+    """List the most recent sync reports.
+
+    A report is saved each time a pull, push, sync or delete command completes.
+    """
+
+    reports = ReportStore().iter_reports()
+    if status:
+        reports = (report for report in reports if report.get("status") in status)
+    summaries = [summarize_report(report) for report in islice(reports, limit)]
+
+    if format is OutputFormat.TABLE:
+        if not summaries:
+            console.print("No sync reports found.")
+            return
+        console.print(format_report_table(summaries))
+    else:
+        console.print_syntax(format_data(summaries, format), syntax=format.to_syntax())
+
+
+@app.command(name="show", epilog=epilog_text)
+def show_report(report_id: ReportIdArgument, format: FormatOption = OutputFormat.JSON):
+    """Show the full contents of a sync report."""
+
+    report = ReportStore().get(report_id)
+    if report is None:
+        console.print_error(f"No sync report found with ID {report_id}")
+        raise typer.Exit(code=1)
+
+    if format is OutputFormat.TABLE:
+        console.print(report.get("summary") or "Nothing was changed.")
+    else:
+        console.print_syntax(format_data(report, format), syntax=format.to_syntax())
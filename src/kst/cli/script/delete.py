@@ -15,7 +15,7 @@ from kst.cli.common import (
 )
 from kst.cli.utility import (
     api_config_prompt,
-    do_sync,
+    do_deletes,
     get_local_members,
     get_remote_members,
     prepare_delete_actions,
@@ -198,7 +198,7 @@ def delete(
         console.print_error(f"Failed to commit changes to the local repository before sync: {error}")
         raise typer.Abort
 
-    results = do_sync(config=config, local_repo=local_repo, actions=actions, description="Deleting scripts")
+    results = do_deletes(config=config, local_repo=local_repo, actions=actions, description="Deleting scripts")
 
     # Commit changes after deleting
     try:
@@ -13,6 +13,7 @@ from kst.cli.common import (
     KandjiTenantOption,
     OperationType,
     RepoPathOption,
+    ResumeOption,
 )
 from kst.cli.utility import (
     api_config_prompt,
@@ -20,6 +21,7 @@ from kst.cli.utility import (
     filter_changes,
     get_local_members,
     get_remote_members,
+    load_resume_state,
     prepare_sync_actions,
     save_report,
     show_sync_report,
@@ -28,6 +30,7 @@ from kst.cli.utility import (
 )
 from kst.console import OutputConsole, epilog_text
 from kst.exceptions import GitRepositoryError
+from kst.journal import ActionJournal
 from kst.repository import CustomScript, RepositoryDirectory
 
 from .common import (
@@ -69,6 +72,7 @@ def sync_scripts(
     all_scripts: ScriptAllOption = False,
     force_mode: ForceModeOption = ForceMode.SKIP,
     dry_run: DryRunOption = False,
+    resume: ResumeOption = False,
     tenant_url: KandjiTenantOption = None,
     api_token: ApiTokenOption = None,
 ):
@@ -85,13 +89,17 @@ def sync_scripts(
     as if each was passed individually using `--path`.
 
     If `--all` is used, all scripts will be synced overriding other options.
+
+    If `--resume` is used, the previous sync which did not complete is continued
+    with its original options. Only the scripts it did not finish syncing are
+    compared and synced again.
     """
 
     repo = validate_repo_path(repo=repo_str, subdir=RepositoryDirectory.SCRIPTS)
     paths = [Path(path).expanduser().resolve() for path in paths_str]
 
     # Check if any scripts are selected
-    if not (all_scripts or paths or script_ids):
+    if not (all_scripts or paths or script_ids or resume):
         msg = "No scripts selected to push. Use --all, --path, or --id to select scripts."
         console.error(msg)
         raise typer.BadParameter(msg)
@@ -102,8 +110,16 @@ def sync_scripts(
     # Ensure tenant URL and API token are provided
     config = api_config_prompt(tenant_url, api_token)
 
-    # Convert script IDs to strings and remove any duplicates
-    script_ids_set = set(map(str, script_ids))
+    journal = ActionJournal.for_command(repo, "script-sync")
+    if resume:
+        state = load_resume_state(journal, config)
+        # Only the scripts without a completed action are loaded and compared again
+        all_scripts, paths, script_ids = False, [], []
+        force_mode = ForceMode(state.options.get("force_mode", force_mode))
+        script_ids_set = state.pending_ids
+    else:
+        # Convert script IDs to strings and remove any duplicates
+        script_ids_set = set(map(str, script_ids))
 
     # Get scripts to push
     local_repo = get_local_members(
@@ -161,7 +177,10 @@ def sync_scripts(
         raise typer.Abort
 
     # Push changes to Kandji
-    sync_results = do_sync(config=config, local_repo=local_repo, actions=actions)
+    with journal.recording(
+        command="script-sync", tenant=str(config.url), actions=actions, options={"force_mode": str(force_mode)}
+    ):
+        sync_results = do_sync(config=config, local_repo=local_repo, actions=actions, journal=journal)
 
     # Commit changes after sync
     try:
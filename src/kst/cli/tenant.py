@@ -1,7 +1,6 @@
 """CLI commands for managing Kandji tenants"""
 
 import logging
-import os
 import shutil
 from pathlib import Path
 from typing import Annotated, Optional
@@ -10,9 +9,6 @@ import typer
 from rich import box
 from rich.table import Table
 
-from kst import git
-from kst.cli.common import RepoPathOption
-from kst.cli.new import new_repo
 from kst.console import OutputConsole, epilog_text
 from kst.tenant_manager import get_tenant_manager
 from kst.utils import change_directory
@@ -76,6 +72,8 @@ def add_tenant(
     # Create repository if requested and it doesn't exist
     if create_repo and not repo_path.exists():
         console.print(f"Creating new repository at {repo_path}...")
+        from kst.cli.new import new_repo
+
         new_repo(str(repo_path))
     
     # Check if repository exists
@@ -2,16 +2,15 @@ import contextlib
 import io
 import json
 import logging
+import os
 import plistlib
 import shutil
 from collections import Counter, OrderedDict
-from collections.abc import Iterable, Iterator
-from datetime import UTC, datetime
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
 from pathlib import Path
-from urllib.parse import urljoin
 from uuid import UUID
 
-import platformdirs
 import requests
 import typer
 from pydantic import ValidationError
@@ -20,8 +19,8 @@ from rich.progress import track
 from rich.table import Table
 
 from kst import git
-from kst.__about__ import APP_NAME
-from kst.api import ApiConfig
+from kst.api import ApiClient, ApiConfig
+from kst.api.client import defer_validation, is_validated
 from kst.cli.common import (
     ActionResponse,
     ActionType,
@@ -31,15 +30,25 @@ from kst.cli.common import (
     ResultType,
     SyncResults,
 )
-from kst.console import OutputConsole, OutputFormat, render_plain_text
+from kst.console import OutputConsole, OutputFormat, buffered_output, render_plain_text
 from kst.diff import ChangesDict, ChangeType, three_way_diff
 from kst.exceptions import InvalidRepositoryError, InvalidRepositoryMemberError
 from kst.git import locate_root
-from kst.repository import ACCEPTED_INFO_EXTENSIONS, MemberBase, Repository, RepositoryDirectory
-from kst.utils import yaml
+from kst.journal import ActionJournal, JournalState
+from kst.reports import ReportStore
+from kst.repository import ACCEPTED_INFO_EXTENSIONS, MemberBase, Repository, RepositoryDirectory, RepositoryWriter
+from kst.repository.layout import read_layout
+from kst.repository.member_base import DUPLICATE_SUFFIX
+from kst.tracing import tracer
+from kst.utils import sanitize_filename, yaml
 
 console = OutputConsole(logging.getLogger(__name__))
 
+DELETE_CONCURRENCY_ENV_VAR = "KST_DELETE_CONCURRENCY"
+DEFAULT_DELETE_CONCURRENCY = 8  # Stays below the default connection pool size of a requests session
+SYNC_CONCURRENCY_ENV_VAR = "KST_SYNC_CONCURRENCY"
+DEFAULT_SYNC_CONCURRENCY = 8
+
 
 # --- Utility functions ---
 def api_config_prompt(tenant_url: str | None, api_token: str | None, interactive: bool = True) -> ApiConfig:
@@ -49,6 +58,9 @@ def api_config_prompt(tenant_url: str | None, api_token: str | None, interactive
     provided as arguments. In the event that the function cannot return a valid ApiConfig
     it will raise a typer. Exit exception with a status code of 2.
 
+    The tenant is only pinged if it has not responded successfully within the validation TTL. When
+    KST_DEFER_VALIDATION is set, the ping is skipped and the first API request validates the tenant.
+
     Args:
         tenant_url (str | None): The Kandji Tenant URL.
         api_token (str | None): The Kandji API Token.
@@ -65,6 +77,7 @@ def api_config_prompt(tenant_url: str | None, api_token: str | None, interactive
     if tenant_url is None or api_token is None:
         try:
             from kst.tenant_manager import get_tenant_manager
+
             tenant_manager = get_tenant_manager()
             active_tenant = tenant_manager.get_active_tenant()
 
@@ -101,17 +114,16 @@ def api_config_prompt(tenant_url: str | None, api_token: str | None, interactive
         console.error(msg)
         raise typer.BadParameter(msg)
 
-    # Ensure the URL is a valid Kandji tenant API URL
-    console.debug(f"Validating URL: {config.url}")
-    response = requests.get(urljoin(config.url, "/app/v1/ping"), params={"source": "kst"})
-    if not response.ok:
+    # Ensure the URL is a valid Kandji tenant API URL unless it was recently validated
+    if is_validated(config):
+        console.debug(f"Using cached validation for {config.url}")
+    elif defer_validation():
+        console.debug(f"Deferring validation of {config.url} to the first API request")
+    elif not ApiClient(config).ping():
         msg = f"Unable to connect to ({config.url}). Please check the URL then try again."
         console.error(msg)
         raise typer.BadParameter(msg)
 
-    console.debug(f"Response content: {response.text}")
-    console.debug(f"Response status code: {response.status_code}")
-
     return config
 
 
@@ -139,6 +151,7 @@ def delete_member_directory(member: MemberBase):
         )
 
 
+@tracer.span("diff")
 def filter_changes[MemberType: MemberBase](
     local_repo: Repository[MemberType], remote_repo: Repository[MemberType]
 ) -> ChangesDict:
@@ -191,13 +204,16 @@ def is_uuid(value: str) -> bool:
 
 
 def update_local_member[MemberType: MemberBase](
-    local_repo: Repository[MemberType], result: ActionResponse[MemberType]
+    local_repo: Repository[MemberType],
+    result: ActionResponse[MemberType],
+    writer: RepositoryWriter | None = None,
 ) -> None:
     """Update local repository with the api response from the sync operation.
 
     Args:
         local_repo (Repository): The local repository object.
         result (ActionResponse): The results of the sync operation.
+        writer (RepositoryWriter | None): A writer to stage the updated files in.
 
     """
     if local_repo.root is None:
@@ -218,8 +234,8 @@ def update_local_member[MemberType: MemberBase](
 
     # Update the sync hash with the current diff hash and write the repository member to disk
     local_member.sync_hash = local_member.diff_hash
-    local_member.ensure_paths(local_repo.root)
-    local_member.write()
+    local_member.ensure_paths(local_repo.root, directory_index=local_repo.directory_index)
+    local_member.write(writer=writer)
 
     # Add the updated member to the local repository
     local_repo[result.member.id] = local_member
@@ -280,15 +296,19 @@ def validate_repo_path(
     repo_path = Path(repo).expanduser().resolve()
     try:
         root = locate_root(cd_path=repo_path)
+        # Fail before any changes are made if the layout of the repository is not understood
+        read_layout(root)
         if subdir is not None:
             if validate_subdir and not repo_path.is_relative_to(root / subdir):
                 raise InvalidRepositoryError
             (root / subdir).mkdir(parents=True, exist_ok=True)
             return root / subdir
         return root
-    except InvalidRepositoryError:
+    except InvalidRepositoryError as error:
         subdir_name = subdir + " " if subdir is not None and validate_subdir else ""
         msg = f"The path provided for --repo option is not a valid kst {subdir_name}directory. (got {repo_path})"
+        if error.args:
+            msg = f"{msg}\n{error}"
         console.error(msg)
         raise typer.BadParameter(msg)
 
@@ -420,6 +440,7 @@ def load_members_by_path[MemberType: MemberBase](
                 raise typer.Exit(code=1)
 
 
+@tracer.span("repository.load")
 def get_local_members[MemberType: MemberBase](
     repo: Path,
     member_type: type[MemberType],
@@ -490,6 +511,7 @@ def get_local_members[MemberType: MemberBase](
         raise typer.Exit(code=1)
 
 
+@tracer.span("remote.fetch")
 def get_remote_members[MemberType: MemberBase](
     config: ApiConfig,
     member_type: type[MemberType],
@@ -861,12 +883,52 @@ def prepare_sync_actions[MemberType: MemberBase](
     return actions
 
 
+def load_resume_state(journal: ActionJournal, config: ApiConfig) -> JournalState:
+    """Load the progress of the previous operation recorded in journal so it can be resumed.
+
+    Args:
+        journal (ActionJournal): The journal of the command being resumed.
+        config (ApiConfig): The API configuration of the resumed operation.
+
+    Returns:
+        JournalState: The recorded progress of the previous operation.
+
+    Raises:
+        typer.Exit: If there is nothing to resume or the operation ran against a different tenant.
+
+    """
+    state = journal.load()
+    if state is None:
+        console.print_error("There is no incomplete operation to resume.")
+        raise typer.Exit(code=1)
+    if state.tenant != str(config.url):
+        console.print_error(
+            f"The incomplete operation ran against {state.tenant}. Resume it with the same tenant or run it again."
+        )
+        raise typer.Exit(code=1)
+
+    console.print(
+        f"Resuming the previous operation. {len(state.completed)} of {len(state.actions)} actions already completed."
+    )
+    for action in state.in_flight:
+        message = f"The {action['action']} of {action['id']} was in progress when the operation stopped"
+        if action["action"] == ActionType.CREATE and action["operation"] == OperationType.PUSH:
+            message += " and may have already created a duplicate in Kandji"
+        console.print_warning(f"{message}. It will be verified again.")
+    return state
+
+
 # --- Do Action Functions ---
+@tracer.span("action.push")
 def do_push[MemberType: MemberBase](
-    config: ApiConfig, local_repo: Repository[MemberType], action: PreparedAction[MemberType]
+    config: ApiConfig,
+    local_repo: Repository[MemberType] | None,
+    action: PreparedAction[MemberType],
+    writer: RepositoryWriter | None = None,
 ) -> ActionResponse[MemberType]:
     if action.operation not in {OperationType.PUSH, OperationType.SKIP}:
         raise ValueError("The action must be a push operation.")
+    tracer.annotate(action=action.action, member_type=type(action.member).__name__)
 
     try:
         match action.action:
@@ -880,6 +942,7 @@ def do_push[MemberType: MemberBase](
                 result = None
     except (requests.HTTPError, requests.ConnectionError, ValueError) as e:
         console.print_error(f"Failed to {action.action} item in Kandji {action.member.id}. {e}", stderr=False)
+        tracer.annotate(result=ResultType.FAILURE)
         return ActionResponse(
             id=action.member.id,
             action=action.action,
@@ -914,21 +977,45 @@ def do_push[MemberType: MemberBase](
             member=action.member.from_api_payload(result) if result is not None else None,
         )
 
-        # Most API requests return an updated version so update the local repository with the API response
-        if action.action is not ActionType.DELETE:
-            update_local_member(local_repo, action_response)
+        # Most API requests return an updated version so update the local repository with the API response.
+        # Members pushed from a shared baseline have no local repository to update.
+        if local_repo is not None and action.action is not ActionType.DELETE:
+            update_local_member(local_repo, action_response, writer=writer)
 
+    tracer.annotate(result=action_response.result)
     return action_response
 
 
+def prepare_remote_members[MemberType: MemberBase](
+    config: ApiConfig, actions: Iterable[PreparedAction[MemberType]]
+) -> None:
+    """Let each member type fetch what it needs for the pushes in actions before any of them start.
+
+    Args:
+        config (ApiConfig): The API configuration to use for the push.
+        actions (Iterable[PreparedAction]): The actions which will be taken.
+
+    """
+    members_by_type: dict[type[MemberType], list[MemberType]] = {}
+    for action in actions:
+        if action.operation is OperationType.PUSH and action.action in {ActionType.CREATE, ActionType.UPDATE}:
+            members_by_type.setdefault(type(action.member), []).append(action.member)
+    for member_type, members in members_by_type.items():
+        member_type.prepare_remote(config=config, members=members)
+
+
 def do_pushes[MemberType: MemberBase](
-    config: ApiConfig, local_repo: Repository[MemberType], actions: Iterable[PreparedAction[MemberType]]
+    config: ApiConfig,
+    local_repo: Repository[MemberType],
+    actions: Iterable[PreparedAction[MemberType]],
+    journal: ActionJournal | None = None,
 ) -> SyncResults[MemberType]:
     """Push the changes defined by the actions tuples to Kandji.
 
     Args:
         config (ApiConfig): The API configuration to use for the push.
         actions (Iterable[PreparedAction]): The actions to take.
+        journal (ActionJournal | None): A journal to record the start and result of each action in.
 
     Returns:
         SyncResults: A dataclass containing the successful and failed actions.
@@ -939,33 +1026,50 @@ def do_pushes[MemberType: MemberBase](
         console.print("Nothing to do.")
         return push_results
 
-    for action in track(
-        actions,
-        description="Pushing changes to Kandji",
-        console=console.stdout,
-        transient=True,
-        disable=console.logs_to_std,
-    ):
-        result = do_push(config=config, local_repo=local_repo, action=action)
-        match result.result:
-            case ResultType.SUCCESS:
-                push_results.success.append(result)
-            case ResultType.FAILURE:
-                push_results.failure.append(result)
-            case ResultType.SKIPPED:
-                push_results.skipped.append(result)
+    prepare_remote_members(config=config, actions=actions)
+
+    # Batch the per member messages when the output is not a terminal
+    with RepositoryWriter() as writer, buffered_output():
+        for action in track(
+            actions,
+            description="Pushing changes to Kandji",
+            console=console.stdout,
+            transient=True,
+            disable=console.logs_to_std,
+        ):
+            if journal is not None:
+                journal.begin(action)
+            result = do_push(config=config, local_repo=local_repo, action=action, writer=writer)
+            # Keep the local repository in line with each change already made in Kandji. The action is only
+            # journaled as complete once its files are on disk so a resumed push redoes it otherwise.
+            writer.commit()
+            if journal is not None:
+                journal.end(result)
+            match result.result:
+                case ResultType.SUCCESS:
+                    push_results.success.append(result)
+                case ResultType.FAILURE:
+                    push_results.failure.append(result)
+                case ResultType.SKIPPED:
+                    push_results.skipped.append(result)
+
+    push_results.unchanged_files = writer.unchanged
 
     return push_results
 
 
+@tracer.span("action.pull")
 def do_pull[MemberType: MemberBase](
-    local_repo: Repository[MemberType], action: PreparedAction[MemberType]
+    local_repo: Repository[MemberType],
+    action: PreparedAction[MemberType],
+    writer: RepositoryWriter | None = None,
 ) -> ActionResponse[MemberType]:
     if action.operation not in {OperationType.PULL, OperationType.SKIP}:
         raise ValueError("The action must be a pull operation.")
 
     if local_repo.root is None:
         raise ValueError("The local_repo must have a root path set.")
+    tracer.annotate(action=action.action, member_type=type(action.member).__name__)
 
     match action.action:
         case ActionType.CREATE | ActionType.UPDATE:
@@ -975,12 +1079,14 @@ def do_pull[MemberType: MemberBase](
             else:
                 local_member = action.member
             local_member.sync_hash = local_member.diff_hash
-            local_member.ensure_paths(repo_path=local_repo.root)
-            local_member.write()
+            local_member.ensure_paths(repo_path=local_repo.root, directory_index=local_repo.directory_index)
+            local_member.write(writer=writer)
             local_repo[action.member.id] = local_member
         case ActionType.DELETE:
             local_member = local_repo.pop(action.member.id)
+            member_directory = local_member.info_path.parent
             delete_member_directory(local_member)
+            local_repo.directory_index.release(member_directory)
             local_member = None
         case ActionType.SKIP:
             local_member = action.member
@@ -995,6 +1101,7 @@ def do_pull[MemberType: MemberBase](
         )
         result_type = ResultType.SUCCESS
 
+    tracer.annotate(result=result_type)
     return ActionResponse(
         id=action.member.id,
         action=action.action,
@@ -1017,23 +1124,252 @@ def do_pulls[MemberType: MemberBase](
     if local_repo.root is None:
         raise ValueError("The local_repo must have a root path set.")
 
-    for action in track(
-        actions,
-        description="Pulling changes from Kandji",
-        console=console.stdout,
-        transient=True,
-        disable=console.logs_to_std,
-    ):
-        result = do_pull(local_repo=local_repo, action=action)
-        match result.result:
+    # Batch the per member messages when the output is not a terminal
+    with RepositoryWriter() as writer, buffered_output():
+        for action in track(
+            actions,
+            description="Pulling changes from Kandji",
+            console=console.stdout,
+            transient=True,
+            disable=console.logs_to_std,
+        ):
+            result = do_pull(local_repo=local_repo, action=action, writer=writer)
+            writer.commit()
+            match result.result:
+                case ResultType.SUCCESS:
+                    pull_results.success.append(result)
+                case ResultType.FAILURE:
+                    pull_results.failure.append(result)
+                case ResultType.SKIPPED:
+                    pull_results.skipped.append(result)
+
+    pull_results.unchanged_files = writer.unchanged
+
+    return pull_results
+
+
+def _concurrency_from_env(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    try:
+        return max(1, int(value))
+    except ValueError:
+        console.warning(f"Ignoring invalid value for {name}. Using default of {default}.")
+        return default
+
+
+def delete_concurrency() -> int:
+    """Get the maximum number of remote deletions to run at once from KST_DELETE_CONCURRENCY."""
+    return _concurrency_from_env(DELETE_CONCURRENCY_ENV_VAR, DEFAULT_DELETE_CONCURRENCY)
+
+
+def sync_concurrency() -> int:
+    """Get the maximum number of sync actions to run at once from KST_SYNC_CONCURRENCY."""
+    return _concurrency_from_env(SYNC_CONCURRENCY_ENV_VAR, DEFAULT_SYNC_CONCURRENCY)
+
+
+def do_deletes[MemberType: MemberBase](
+    config: ApiConfig,
+    local_repo: Repository[MemberType],
+    actions: list[PreparedAction[MemberType]],
+    description: str = "Deleting from Kandji",
+) -> SyncResults[MemberType]:
+    """Delete members in Kandji and in the local repository.
+
+    Remote deletions run concurrently with at most delete_concurrency() requests in flight. Local directories
+    are removed afterwards in a single pass. A deletion which fails, for any reason, is recorded as a failure
+    without stopping the others. The results keep the order of the actions.
+
+    Args:
+        config: The API configuration to use for deleting.
+        local_repo: The local repository.
+        actions: The delete actions prepared by prepare_delete_actions.
+        description: The description shown with the progress bar.
+
+    Returns:
+        SyncResults: A dataclass containing the successful and failed actions.
+
+    """
+    if any(action.action is not ActionType.DELETE for action in actions):
+        raise ValueError("All actions must be delete actions.")
+
+    def failure(action: PreparedAction[MemberType]) -> ActionResponse[MemberType]:
+        return ActionResponse(
+            id=action.member.id,
+            action=action.action,
+            operation=action.operation,
+            result=ResultType.FAILURE,
+            member=action.member,
+        )
+
+    def delete_remote(action: PreparedAction[MemberType]) -> ActionResponse[MemberType]:
+        try:
+            return do_push(config=config, local_repo=local_repo, action=action)
+        except Exception as error:
+            console.print_error(f"Failed to delete item in Kandji {action.member.id}. {error}", stderr=False)
+            return failure(action)
+
+    responses: dict[int, ActionResponse[MemberType]] = {}
+    remote_actions = {index: action for index, action in enumerate(actions) if action.operation is OperationType.PUSH}
+    with buffered_output():
+        if remote_actions:
+            with ThreadPoolExecutor(max_workers=min(delete_concurrency(), len(remote_actions))) as executor:
+                futures = {executor.submit(delete_remote, action): index for index, action in remote_actions.items()}
+                for future in track(
+                    as_completed(futures),
+                    total=len(futures),
+                    description=description,
+                    console=console.stdout,
+                    transient=True,
+                    disable=console.logs_to_std,
+                ):
+                    responses[futures[future]] = future.result()
+
+        for index, action in enumerate(actions):
+            if action.operation is OperationType.PULL:
+                try:
+                    responses[index] = do_pull(local_repo=local_repo, action=action)
+                except OSError as error:
+                    console.print_error(f"Failed to delete {action.member.id} locally. {error}", stderr=False)
+                    responses[index] = failure(action)
+
+    results = SyncResults[MemberType]()
+    for index in sorted(responses):
+        match responses[index].result:
             case ResultType.SUCCESS:
-                pull_results.success.append(result)
+                results.success.append(responses[index])
             case ResultType.FAILURE:
-                pull_results.failure.append(result)
+                results.failure.append(responses[index])
             case ResultType.SKIPPED:
-                pull_results.skipped.append(result)
+                results.skipped.append(responses[index])
+    return results
 
-    return pull_results
+
+def action_resources[MemberType: MemberBase](
+    local_repo: Repository[MemberType], action: PreparedAction[MemberType]
+) -> set[tuple[str, ...]]:
+    """Get the local resources an action reads or changes while it runs.
+
+    An existing member claims its own directory. A member pulled into the repository for the first time
+    claims the name its new directory is chosen from, since directories are named after members and a
+    numbered suffix is added when the name is taken. Removing a member directory claims the same name so
+    the removal finishes before a new directory is chosen. New directories are allocated from the directory
+    index of the repository, so members which only share a name do not need to wait for each other.
+
+    Args:
+        local_repo (Repository): The local repository.
+        action (PreparedAction): The action to get the resources of.
+
+    Returns:
+        set: Hashable keys for each resource, which are only compared with each other.
+
+    """
+    member = action.member
+    namespace = type(member).__name__
+    local_member = local_repo.get(member.id)
+    if local_member is not None and local_member.has_paths:
+        directory = local_member.info_path.resolve().parent
+        resources = {(namespace, "path", str(directory).casefold())}
+        if action.operation is OperationType.PULL and action.action is ActionType.DELETE:
+            resources.add((namespace, "name", DUPLICATE_SUFFIX.sub("", directory.name).casefold()))
+        return resources
+
+    if action.operation is OperationType.PULL and action.action in {ActionType.CREATE, ActionType.UPDATE}:
+        return {(namespace, "name", sanitize_filename(member.name).casefold())}
+    return set()
+
+
+def build_action_graph[MemberType: MemberBase](
+    local_repo: Repository[MemberType], actions: list[PreparedAction[MemberType]]
+) -> list[set[int]]:
+    """Find the actions each action must wait for before it can run.
+
+    Two actions which claim the same local resource (see action_resources) run one after the other in the
+    order of actions, except that local deletions always run before the other actions so a directory is
+    removed before a new one with the same name is created. Members pulled into the repository for the first
+    time only wait for those deletions and not for each other, since their directories are allocated from the
+    directory index of the repository. All other actions are independent.
+
+    Args:
+        local_repo (Repository): The local repository.
+        actions (list[PreparedAction]): The actions to take.
+
+    Returns:
+        list[set[int]]: The indexes of the actions each action depends on, in the same order as actions.
+
+    """
+    deletes_first = sorted(
+        range(len(actions)),
+        key=lambda index: (
+            not (actions[index].operation is OperationType.PULL and actions[index].action is ActionType.DELETE)
+        ),
+    )
+    dependencies: list[set[int]] = [set() for _ in actions]
+    last_claim: dict[tuple[str, ...], int] = {}
+    for index in deletes_first:
+        is_local_delete = actions[index].operation is OperationType.PULL and actions[index].action is ActionType.DELETE
+        for resource in action_resources(local_repo, actions[index]):
+            if (previous := last_claim.get(resource)) is not None:
+                dependencies[index].add(previous)
+            if resource[1] != "name" or is_local_delete:
+                last_claim[resource] = index
+    return dependencies
+
+
+def run_action_graph[MemberType: MemberBase, ReturnType](
+    actions: list[PreparedAction[MemberType]],
+    dependencies: list[set[int]],
+    run: Callable[[PreparedAction[MemberType]], ReturnType],
+    max_workers: int,
+) -> Iterator[tuple[int, ReturnType]]:
+    """Run each action once all of the actions it depends on have finished.
+
+    Independent actions run at the same time in a thread pool of at most max_workers threads.
+
+    Args:
+        actions (list[PreparedAction]): The actions to take.
+        dependencies (list[set[int]]): The dependencies of each action as returned by build_action_graph.
+        run (Callable): The function which takes an action.
+        max_workers (int): The maximum number of actions to run at once.
+
+    Yields:
+        tuple: The index of each action and the value returned by run, in the order they complete.
+
+    Raises:
+        ValueError: The dependencies contain a cycle.
+
+    """
+    remaining = [len(depends_on) for depends_on in dependencies]
+    dependents: list[list[int]] = [[] for _ in actions]
+    for index, depends_on in enumerate(dependencies):
+        for dependency in depends_on:
+            dependents[dependency].append(index)
+
+    ready = [index for index, count in enumerate(remaining) if count == 0]
+    if actions and not ready:
+        raise ValueError("The action dependencies contain a cycle.")
+
+    completed = 0
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(actions)))) as executor:
+        running: dict[Future[ReturnType], int] = {}
+        while ready or running:
+            for index in ready:
+                running[executor.submit(run, actions[index])] = index
+            ready = []
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index = running.pop(future)
+                yield index, future.result()
+                completed += 1
+                for dependent in dependents[index]:
+                    remaining[dependent] -= 1
+                    if remaining[dependent] == 0:
+                        ready.append(dependent)
+
+    if completed != len(actions):
+        raise ValueError("The action dependencies contain a cycle.")
 
 
 def do_sync[MemberType: MemberBase](
@@ -1041,36 +1377,48 @@ def do_sync[MemberType: MemberBase](
     local_repo: Repository[MemberType],
     actions: list[PreparedAction[MemberType]],
     description: str = "Syncing changes with Kandji",
+    journal: ActionJournal | None = None,
 ) -> SyncResults[MemberType]:
     """Sync local repository with Kandji.
 
+    Actions which do not depend on each other (see build_action_graph) run concurrently with at most
+    sync_concurrency() actions in flight. The results keep the order of the actions.
+
     Args:
         config: The API configuration to use for syncing.
         local_repo: The local repository.
         actions: A list of prepared actions to take to sync.
+        journal: A journal to record the start and result of each action in.
 
     Returns:
         SyncResults: A dataclass containing the successful and failed actions.
     """
     results = SyncResults[MemberType]()
 
-    for action in track(
-        actions,
-        description=description,
-        console=console.stdout,
-        transient=True,
-        disable=console.logs_to_std,
-    ):
+    prepare_remote_members(config=config, actions=actions)
+
+    def run(action: PreparedAction[MemberType]) -> ActionResponse[MemberType]:
+        if journal is not None:
+            journal.begin(action)
+        # Actions run concurrently, so each one commits only its own files when it completes. The action is only
+        # journaled as complete once its files are on disk so a resumed sync redoes it otherwise.
+        with writer.batch() as batch:
+            response = take(action, batch)
+        if journal is not None:
+            journal.end(response)
+        return response
+
+    def take(action: PreparedAction[MemberType], batch: RepositoryWriter) -> ActionResponse[MemberType]:
         match action.operation:
             case OperationType.PUSH:
-                result = do_push(config=config, local_repo=local_repo, action=action)
+                return do_push(config=config, local_repo=local_repo, action=action, writer=batch)
             case OperationType.PULL:
-                result = do_pull(local_repo=local_repo, action=action)
+                return do_pull(local_repo=local_repo, action=action, writer=batch)
             case OperationType.SKIP:
                 console.print_warning(
                     f"{action.member.name} ({action.member.id}) skipped due to conflicting changes", stderr=False
                 )
-                result = ActionResponse(
+                return ActionResponse(
                     id=action.member.id,
                     action=action.action,
                     operation=action.operation,
@@ -1078,13 +1426,29 @@ def do_sync[MemberType: MemberBase](
                     member=action.member,
                 )
 
-        match result.result:
+    responses: dict[int, ActionResponse[MemberType]] = {}
+    dependencies = build_action_graph(local_repo, actions)
+    with RepositoryWriter() as writer, buffered_output():
+        for index, response in track(
+            run_action_graph(actions, dependencies, run, max_workers=sync_concurrency()),
+            total=len(actions),
+            description=description,
+            console=console.stdout,
+            transient=True,
+            disable=console.logs_to_std,
+        ):
+            responses[index] = response
+
+    for index in sorted(responses):
+        match responses[index].result:
             case ResultType.SUCCESS:
-                results.success.append(result)
+                results.success.append(responses[index])
             case ResultType.FAILURE:
-                results.failure.append(result)
+                results.failure.append(responses[index])
             case ResultType.SKIPPED:
-                results.skipped.append(result)
+                results.skipped.append(responses[index])
+
+    results.unchanged_files = writer.unchanged
 
     return results
 
@@ -1415,40 +1779,18 @@ def show_sync_report[MemberType: MemberBase](
         console.print(skip_table, new_line_start=True)
 
 
+@tracer.span("report.save")
 def save_report[MemberType: MemberBase](
-    results: SyncResults[MemberType],
-    report_path: Path = platformdirs.user_log_path(appname=APP_NAME) / f"{APP_NAME}_report.json",
+    results: SyncResults[MemberType], report_path: Path | None = None, tenant: dict[str, str] | None = None
 ) -> None:
-    """Save the sync report to a file.
+    """Append the sync report to the report store.
 
     Args:
-        sync_results (SyncResults): The results of the sync operation.
-        output_path (Path): The path to save the report.
+        results (SyncResults): The results of the sync operation.
+        report_path (Path | None): The JSON Lines file to append the report to. Defaults to the user log directory.
+        tenant (dict[str, str] | None): The name and URL of the tenant the results belong to.
 
     """
-    if report_path.exists():
-        with report_path.open("r") as file:
-            try:
-                sync_report = json.load(file)
-                if not isinstance(sync_report, list):
-                    raise json.JSONDecodeError("Invalid JSON format", "", 0)
-            except json.JSONDecodeError:
-                new_name = f"{report_path.name}.bkp_{datetime.now(UTC).strftime('%Y%m%d%H%M%S')}"
-                console.warning(
-                    f"The sync report file is invalid. The file will be backed up to {new_name}, and a new report file will be created."
-                )
-                shutil.move(
-                    report_path,
-                    report_path.with_name(new_name),
-                )
-                sync_report = []
-    else:
-        sync_report = []
-
-    # Insert a new report entry
-    sync_report.insert(0, results.format_report())
-    report_path.parent.mkdir(parents=True, exist_ok=True)
-    with report_path.open("w") as file:
-        json.dump(sync_report, file, indent=2)
-
-    console.info(f"Sync report saved to {report_path}")
+    store = ReportStore(report_path)
+    store.append(results.format_report(tenant=tenant))
+    console.info(f"Sync report saved to {store.path}")
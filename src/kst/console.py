@@ -1,8 +1,13 @@
+import contextlib
 import functools
 import logging
+import os
 import sys
+import threading
+from collections.abc import Iterator
 from enum import StrEnum
 from io import StringIO
+from typing import TextIO
 
 from pygments.lexers import get_lexer_by_name, guess_lexer
 from rich.console import Console
@@ -19,6 +24,17 @@ theme = Theme({"warning": "yellow", "error": "red", "success": "green"})
 stdout = Console(theme=theme, highlight=False)
 stderr = Console(theme=theme, highlight=False, stderr=True)
 
+
+def detect_terminal() -> None:
+    """Detect the terminal of the stdout and stderr consoles again.
+
+    Consoles detect their color system and read COLUMNS and LINES when they are created, so a process which
+    changes its standard streams and environment between commands, like the daemon, detects them again.
+    """
+    for console in (stdout, stderr):
+        console.__init__(theme=theme, highlight=False, stderr=console.stderr)
+
+
 epilog_text = "Made with :heart: by [yellow]Kandji[/yellow]"
 
 
@@ -47,21 +63,98 @@ class OutputFormat(StrEnum):
                 return None
 
 
+@functools.lru_cache(maxsize=4)
+def _plain_console(columns: str | None) -> Console:  # noqa: ARG001
+    """Get a console for rendering rich objects to plain text.
+
+    Consoles read the width from COLUMNS when they are created, so a console is cached for each value.
+    """
+    return Console(file=StringIO(), force_terminal=False, color_system=None, highlight=False)
+
+
 def render_plain_text(message, new_line_start: bool = False) -> str:
     """Render a message to plain text without markup."""
-    if isinstance(message, str) and "[" not in message:
-        # If the message is a string and does not contain any markup, return it as is
+    if isinstance(message, str):
+        if "[" in message:
+            # Strip the markup without rendering the message on a console
+            text = Text.from_markup(message)
+            text.expand_tabs()
+            message = text.plain
         return ("\n" if new_line_start else "") + message
 
-    # Otherwise, use the rich console to render the message to plain text
-    capture_file = StringIO()
-    Console(file=capture_file, force_terminal=False, color_system=None, highlight=False).print(
-        message,
-        end="",
-        soft_wrap=True,  # disables inserting new lines to match the console width
-        new_line_start=new_line_start,
-    )
-    return capture_file.getvalue()
+    # Otherwise, use a rich console to render the message to plain text
+    console = _plain_console(os.environ.get("COLUMNS"))
+    with console.capture() as capture:
+        console.print(
+            message,
+            end="",
+            soft_wrap=True,  # disables inserting new lines to match the console width
+            new_line_start=new_line_start,
+        )
+    return capture.get()
+
+
+class _OutputBuffer:
+    """Collect plain text written to a non-terminal stream and write it in batches."""
+
+    def __init__(self, max_lines: int) -> None:
+        self.max_lines = max_lines
+        self._lock = threading.Lock()
+        self._file: TextIO | None = None
+        self._lines: list[str] = []
+
+    def write(self, file: TextIO, text: str) -> None:
+        with self._lock:
+            if file is not self._file:
+                # Keep the order of output written to different streams
+                self._flush()
+                self._file = file
+            self._lines.append(text)
+            if len(self._lines) >= self.max_lines:
+                self._flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def _flush(self) -> None:
+        if self._lines and self._file is not None:
+            self._file.write("".join(self._lines))
+            self._file.flush()
+        self._lines.clear()
+
+
+_output_buffer: _OutputBuffer | None = None
+
+
+@contextlib.contextmanager
+def buffered_output(max_lines: int = 100) -> Iterator[None]:
+    """Write messages printed to non-terminal streams in batches instead of one at a time.
+
+    Messages printed to a terminal are unaffected. The buffer is flushed every max_lines messages and when
+    the context exits. Nested contexts share the outermost buffer.
+    """
+    global _output_buffer  # noqa: PLW0603
+
+    if _output_buffer is not None:
+        yield
+        return
+
+    _output_buffer = _OutputBuffer(max_lines)
+    try:
+        yield
+    finally:
+        buffer, _output_buffer = _output_buffer, None
+        buffer.flush()
+
+
+def write_plain_text(stream: Console, text: str) -> None:
+    """Write plain text directly to the file of a non-terminal console."""
+    if (buffer := _output_buffer) is not None:
+        buffer.write(stream.file, text)
+    else:
+        stream.file.write(text)
+        stream.file.flush()
 
 
 class OutputConsole:
@@ -144,20 +237,28 @@ class OutputConsole:
     ):
         """Print a message to the console and log it to the logger."""
 
-        # Log the sanitized message to the log handler
-        plain_message = render_plain_text(message, new_line_start=isinstance(message, Syntax | Table))
-        self.log(level, plain_message)
-
         # Skip printing to the console if there is already a stream handler to avoid duplicate output
-        if not self.logs_to_std:
-            stream: Console = getattr(self, "stderr" if stderr else "stdout")
-            if stream.is_terminal:
-                # If the console is a terminal, print the styled message
-                styled_message = Text.from_markup(message, style=style) if isinstance(message, str) else message
-                stream.print(styled_message, new_line_start=new_line_start, soft_wrap=soft_wrap)
-            else:
-                # If the console is not a terminal, print the plain message
-                stream.print(plain_message, new_line_start=False, overflow="ignore", soft_wrap=True)
+        stream: Console | None = None if self.logs_to_std else getattr(self, "stderr" if stderr else "stdout")
+        to_terminal = stream is not None and stream.is_terminal
+
+        # Only render the plain message when it is logged or printed to avoid paying for it on every call
+        plain_message = None
+        if self._logger.isEnabledFor(level) or (stream is not None and not to_terminal):
+            plain_message = render_plain_text(message, new_line_start=isinstance(message, Syntax | Table))
+
+        # Log the sanitized message to the log handler
+        if plain_message is not None:
+            self.log(level, plain_message)
+
+        if stream is None:
+            return
+        if to_terminal:
+            # If the console is a terminal, print the styled message
+            styled_message = Text.from_markup(message, style=style) if isinstance(message, str) else message
+            stream.print(styled_message, new_line_start=new_line_start, soft_wrap=soft_wrap)
+        else:
+            # If the console is not a terminal, write the plain message as is
+            write_plain_text(stream, f"{plain_message}\n")
 
     def print_success(self, message: str, style: str = "success", level: int = logging.INFO, stderr: bool = False):
         """Print a success message to the console and log it to the logger."""
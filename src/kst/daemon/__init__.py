@@ -0,0 +1,3 @@
+from .client import NO_DAEMON_ENV_VAR, SOCKET_ENV_VAR, forward, request, socket_path
+
+__all__ = ["NO_DAEMON_ENV_VAR", "SOCKET_ENV_VAR", "forward", "request", "socket_path"]
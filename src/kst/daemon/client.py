@@ -0,0 +1,135 @@
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+from typing import IO, Any
+
+from kst.__about__ import APP_NAME
+
+# The client is imported before every command so it avoids importing anything beyond the standard library,
+# apart from platformdirs when the default socket path is needed
+
+SOCKET_ENV_VAR = "KST_DAEMON_SOCKET"
+NO_DAEMON_ENV_VAR = "KST_NO_DAEMON"
+
+
+def socket_path() -> Path:
+    """Get the path of the daemon's Unix socket.
+
+    Defaults to a socket in the user runtime directory which can be overridden with the KST_DAEMON_SOCKET
+    environment variable.
+    """
+    if override := os.environ.get(SOCKET_ENV_VAR):
+        return Path(override).expanduser()
+
+    import platformdirs
+
+    return platformdirs.user_runtime_path(appname=APP_NAME) / "daemon.sock"
+
+
+def send_message(stream: IO[bytes], message: dict[str, Any]) -> None:
+    stream.write(json.dumps(message).encode() + b"\n")
+    stream.flush()
+
+
+def receive_message(stream: IO[bytes]) -> dict[str, Any] | None:
+    line = stream.readline()
+    return json.loads(line) if line else None
+
+
+def connect(path: Path, timeout: float | None = None) -> socket.socket | None:
+    if not hasattr(socket, "AF_UNIX") or not path.exists():
+        return None
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(timeout)
+    try:
+        client.connect(str(path))
+    except OSError:
+        client.close()
+        return None
+    return client
+
+
+def request(message: dict[str, Any], path: Path | None = None) -> dict[str, Any] | None:
+    """Send a control message to the daemon and return its response.
+
+    Returns:
+        dict | None: The response from the daemon or None if the daemon is not running
+
+    """
+    client = connect(path or socket_path(), timeout=5)
+    if client is None:
+        return None
+    with client, client.makefile("rwb") as stream:
+        send_message(stream, message)
+        return receive_message(stream)
+
+
+def terminal() -> dict[str, Any]:
+    """Describe the terminal the standard streams of this process are attached to.
+
+    Returns:
+        dict: Whether stdout and stderr are terminals and the columns and lines of the terminal, if there is one
+
+    """
+    isatty = {}
+    for name, stream in (("stdout", sys.stdout), ("stderr", sys.stderr)):
+        try:
+            isatty[name] = stream.isatty()
+        except (AttributeError, ValueError):
+            isatty[name] = False
+
+    size = None
+    for stream in (sys.stdout, sys.stderr, sys.stdin):
+        try:
+            size = os.get_terminal_size(stream.fileno())
+            break
+        except (AttributeError, ValueError, OSError):
+            continue
+    return {"isatty": isatty, "size": None if size is None else [size.columns, size.lines]}
+
+
+def forward(argv: list[str], path: Path | None = None) -> int | None:
+    """Run a kst command in the daemon if it is running.
+
+    The command runs with the current working directory and environment of the caller, and sees the terminal of
+    the caller so it keeps its colors, progress bars and width. Its output is streamed back and written to this
+    process's stdout and stderr as it is produced.
+
+    Args:
+        argv (list[str]): The command line arguments, excluding the program name
+        path (Path | None): The daemon socket path. Defaults to socket_path().
+
+    Returns:
+        int | None: The exit code of the command or None if the daemon is not available
+
+    """
+    if os.environ.get(NO_DAEMON_ENV_VAR) or (argv and argv[0] == "daemon"):
+        return None
+
+    client = connect(path or socket_path())
+    if client is None:
+        return None
+
+    with client, client.makefile("rwb") as stream:
+        try:
+            send_message(stream, {"argv": argv, "cwd": os.getcwd(), "env": dict(os.environ), "terminal": terminal()})
+            exit_code = None
+            while (message := receive_message(stream)) is not None:
+                if "stdout" in message:
+                    sys.stdout.write(message["stdout"])
+                    sys.stdout.flush()
+                elif "stderr" in message:
+                    sys.stderr.write(message["stderr"])
+                    sys.stderr.flush()
+                elif "exit_code" in message:
+                    exit_code = message["exit_code"]
+                    break
+        except (OSError, ValueError):
+            exit_code = None
+
+    if exit_code is None:
+        sys.stderr.write("Lost connection to the kst daemon before the command completed.\n")
+        return 1
+    return exit_code
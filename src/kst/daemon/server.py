@@ -0,0 +1,333 @@
+import contextlib
+import ctypes
+import io
+import logging
+import os
+import select
+import socket
+import socketserver
+import sys
+import threading
+import time
+import traceback
+from collections.abc import Iterator
+from pathlib import Path
+from typing import IO, Any, override
+
+from kst.__about__ import APP_NAME
+from kst.console import OutputConsole
+
+from .client import connect, receive_message, send_message
+
+console = OutputConsole(logging.getLogger(__name__))
+
+
+class _Cancellation:
+    """Interrupt a command running in the daemon when its client goes away.
+
+    A client which is interrupted with Ctrl-C or otherwise disconnects closes its socket. The connection is
+    watched while the command runs and a KeyboardInterrupt is raised in the thread running the command once the
+    client is gone, so the command stops as it would have if it had run in the client's own process.
+
+    Methods:
+        watch: Start watching the connection of the client
+        cancel: Interrupt the command
+        stop: Stop watching once the command has finished
+
+    """
+
+    def __init__(self, connection: socket.socket) -> None:
+        self._connection = connection
+        self._thread_id = threading.get_ident()
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def watch(self) -> None:
+        """Start watching the connection of the client from a background thread."""
+        threading.Thread(target=self._watch, daemon=True).start()
+
+    def _watch(self) -> None:
+        while not self._done.is_set():
+            try:
+                readable, _, _ = select.select([self._connection], [], [], 0.5)
+                # The client sends nothing after its request, so a readable socket means it was closed
+                if readable and not self._connection.recv(1, socket.MSG_PEEK):
+                    break
+            except (OSError, ValueError):
+                break
+        self.cancel()
+
+    def cancel(self) -> None:
+        """Interrupt the command unless it has already finished."""
+        with self._lock:
+            if self._done.is_set():
+                return
+            self._done.set()
+            console.info("The daemon client disconnected, interrupting its command")
+            ctypes.pythonapi.PyThreadState_SetAsyncExc(
+                ctypes.c_ulong(self._thread_id), ctypes.py_object(KeyboardInterrupt)
+            )
+
+    def stop(self) -> None:
+        """Stop watching the connection and discard an interruption which was not raised yet."""
+        with self._lock:
+            if self._done.is_set():
+                ctypes.pythonapi.PyThreadState_SetAsyncExc(ctypes.c_ulong(self._thread_id), None)
+            self._done.set()
+
+
+class _StreamWriter(io.TextIOBase):
+    """A text stream which forwards everything written to it to a daemon client.
+
+    The stream is a terminal if the stream of the client it forwards to is one.
+    """
+
+    def __init__(
+        self, stream: IO[bytes], name: str, cancellation: _Cancellation | None = None, isatty: bool = False
+    ) -> None:
+        self._stream = stream
+        self._name = name
+        self._cancellation = cancellation
+        self._isatty = isatty
+
+    @override
+    def writable(self) -> bool:
+        return True
+
+    @override
+    def isatty(self) -> bool:
+        return self._isatty
+
+    @override
+    def write(self, text: str) -> int:
+        if text:
+            try:
+                send_message(self._stream, {self._name: text})
+            except OSError:
+                # The client is gone so the command is interrupted instead of running on without any output
+                if self._cancellation is not None:
+                    self._cancellation.cancel()
+        return len(text)
+
+
+def _reload_settings() -> None:
+    """Apply the settings read from environment variables and the terminal of the environment a command runs with."""
+    from kst.api import client
+    from kst.console import detect_terminal
+    from kst.repository import custom_script
+    from kst.repository.content import blob_store, content_cache_enabled
+
+    detect_terminal()
+    blob_store.enabled = content_cache_enabled()
+    client.validation_cache.cache_clear()
+    custom_script.category_cache.cache_clear()
+    custom_script.forget_missing_categories()
+
+
+@contextlib.contextmanager
+def _command_context(
+    cwd: str,
+    env: dict[str, str],
+    stream: IO[bytes],
+    cancellation: _Cancellation | None = None,
+    terminal: dict[str, Any] | None = None,
+) -> Iterator[None]:
+    """Run a command as if it was started by the client in cwd with env and output to stream.
+
+    The terminal describes the streams of the client as sent by kst.daemon.client.terminal, so the command's
+    output streams are terminals when the client's are and the output fits the client's terminal.
+    """
+    terminal = terminal or {}
+    isatty = terminal.get("isatty") or {}
+    original_cwd = os.getcwd()
+    original_env = dict(os.environ)
+    root_logger = logging.getLogger()
+    original_handlers = list(root_logger.handlers)
+    original_level = root_logger.level
+    original_streams = sys.stdin, sys.stdout, sys.stderr
+    try:
+        os.chdir(cwd)
+        os.environ.clear()
+        os.environ.update(env)
+        if (size := terminal.get("size")) is not None:
+            # A size set in the environment of the client takes precedence like it does for its own terminal
+            os.environ.setdefault("COLUMNS", str(size[0]))
+            os.environ.setdefault("LINES", str(size[1]))
+        sys.stdin = io.StringIO()
+        sys.stdout = _StreamWriter(stream, "stdout", cancellation, isatty=bool(isatty.get("stdout")))
+        sys.stderr = _StreamWriter(stream, "stderr", cancellation, isatty=bool(isatty.get("stderr")))
+        _reload_settings()
+        yield
+    finally:
+        sys.stdin, sys.stdout, sys.stderr = original_streams
+        os.environ.clear()
+        os.environ.update(original_env)
+        os.chdir(original_cwd)
+        _reload_settings()
+
+        # Remove the handlers configured by the command so the next command can configure logging again
+        for handler in root_logger.handlers:
+            if handler not in original_handlers:
+                root_logger.removeHandler(handler)
+                handler.close()
+        root_logger.setLevel(original_level)
+
+
+class DaemonServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """A Unix socket server which runs kst commands in a long lived process.
+
+    Keeping the process alive amortizes the interpreter startup and imports, and keeps warm state between
+    commands: the HTTP sessions and tenant validations for each tenant, the located git executable and
+    repository roots, and parsed repository members which have not changed on disk.
+
+    Commands are run one at a time since each one changes the working directory, environment and standard
+    streams of the process.
+
+    Attributes:
+        path (Path): The path of the Unix socket
+        started (float): The time the server was started
+        served (int): The number of commands run
+
+    Methods:
+        serve: Serve commands until a stop request is received
+
+    """
+
+    daemon_threads = True
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.started = time.time()
+        self.served = 0
+        self._command_lock = threading.Lock()
+        self._last_cwd: str | None = None
+
+        path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+        if connect(path, timeout=1) is not None:
+            raise FileExistsError(f"A kst daemon is already listening at {path}")
+        path.unlink(missing_ok=True)
+
+        # The socket is created with the permissions left by the umask, so only the user can ever connect to it
+        original_umask = os.umask(0o177)
+        try:
+            super().__init__(str(path), _DaemonHandler)
+        finally:
+            os.umask(original_umask)
+
+    def warm_up(self) -> None:
+        """Import every subcommand and enable the in-memory member cache."""
+        import click
+        import typer.main
+
+        from kst.cli import app
+        from kst.repository import MemberCache, Repository
+
+        group = typer.main.get_command(app)
+        with click.Context(group) as ctx:
+            for name in group.list_commands(ctx):
+                group.get_command(ctx, name)
+        Repository.member_cache = MemberCache()
+
+    def run_command(
+        self,
+        argv: list[str],
+        cwd: str,
+        env: dict[str, str],
+        stream: IO[bytes],
+        cancellation: _Cancellation | None = None,
+        terminal: dict[str, Any] | None = None,
+    ) -> int:
+        """Run a kst command with the client's working directory, environment, terminal and output stream.
+
+        Settings read from environment variables are applied again for each command, so a command sees the
+        environment of its client rather than the one the daemon was started with.
+
+        Returns:
+            int: The exit code of the command
+
+        """
+        from kst import git
+        from kst.cli import app
+        from kst.repository.content import blob_store
+        from kst.repository.layout import read_layout
+
+        with self._command_lock:
+            if cwd != self._last_cwd:
+                # Cached git lookups may be relative to the working directory
+                git.locate_root.cache_clear()
+                git.has_git_user_config.cache_clear()
+                self._last_cwd = cwd
+            # The layout of a repository may be changed by editing its .kst file between commands
+            read_layout.cache_clear()
+
+            # Reports include the content cache stats of a single command
+            blob_store.reset_stats()
+
+            self.served += 1
+            with _command_context(cwd, env, stream, cancellation, terminal):
+                try:
+                    app(args=argv, prog_name=APP_NAME)
+                except SystemExit as exit_error:
+                    code = exit_error.code
+                    return code if isinstance(code, int) else (0 if code is None else 1)
+                except KeyboardInterrupt:
+                    return 130
+                except Exception:
+                    sys.stderr.write(traceback.format_exc())
+                    return 1
+            return 0
+
+    def serve(self) -> None:
+        """Serve commands until a stop request is received, then remove the socket and close HTTP sessions."""
+        from kst.api.client import close_sessions
+
+        try:
+            self.serve_forever()
+        finally:
+            self.server_close()
+            self.path.unlink(missing_ok=True)
+            close_sessions()
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "pid": os.getpid(),
+            "socket": str(self.path),
+            "uptime": time.time() - self.started,
+            "served": self.served,
+        }
+
+
+class _DaemonHandler(socketserver.StreamRequestHandler):
+    server: DaemonServer
+
+    @override
+    def handle(self) -> None:
+        try:
+            message = receive_message(self.rfile)
+        except ValueError:
+            return
+        if message is None:
+            return
+
+        match message:
+            case {"control": "status"}:
+                send_message(self.wfile, self.server.status())
+            case {"control": "stop"}:
+                send_message(self.wfile, self.server.status())
+                threading.Thread(target=self.server.shutdown, daemon=True).start()
+            case {"argv": list(argv), "cwd": str(cwd), "env": dict(env)}:
+                console.info(f"Running command from daemon client: {' '.join(argv)}")
+                cancellation = _Cancellation(self.connection)
+                cancellation.watch()
+                try:
+                    exit_code = self.server.run_command(
+                        argv, cwd, env, self.wfile, cancellation, terminal=message.get("terminal")
+                    )
+                except KeyboardInterrupt:
+                    exit_code = 130
+                finally:
+                    cancellation.stop()
+                with contextlib.suppress(OSError):
+                    send_message(self.wfile, {"exit_code": exit_code})
+            case _:
+                send_message(self.wfile, {"error": "Unknown request"})
@@ -8,7 +8,7 @@ from pathlib import Path
 
 from kst.console import OutputConsole
 from kst.exceptions import GitRepositoryError, InvalidRepositoryError
-from kst.repository import RepositoryDirectory
+from kst.tracing import tracer
 
 console = OutputConsole(logging.getLogger(__name__))
 
@@ -92,7 +92,9 @@ def git(
     cmd.extend(args)
     console.debug(f"Executing git command: {' '.join(cmd)}")
 
-    result = subprocess.run(cmd, check=False, text=True, capture_output=True)
+    with tracer.span("git.command", subcommand=args[0] if args else "") as span:
+        result = subprocess.run(cmd, check=False, text=True, capture_output=True)
+        span["exit_code"] = result.returncode
     console.debug(f"Git command executed with exit code {result.returncode}")
 
     if expected_exit_code is not None and result.returncode != expected_exit_code:
@@ -162,6 +164,30 @@ def locate_root(*, cd_path: Path = Path("."), check_marker=True) -> Path:
     return root
 
 
+@functools.cache
+def locate_git_dir(*, cd_path: Path = Path(".")) -> Path:
+    """Locate the .git directory of the repository, where kst keeps files which must not be committed.
+
+    Args:
+        cd_path (Path): The path to run the git command from.
+
+    Returns:
+        Path: The absolute path to the git directory.
+
+    Raises:
+        InvalidRepositoryError: If a git repository is not found.
+
+    """
+    root = locate_root(cd_path=cd_path, check_marker=False)
+    try:
+        result = git("rev-parse", "--absolute-git-dir", cd_path=root, expected_exit_code=0)
+    except GitRepositoryError as error:
+        msg = f"Failed to locate the git directory of the repository at {root}"
+        console.error(msg)
+        raise InvalidRepositoryError(msg) from error
+    return Path(result.stdout.strip())
+
+
 class GitStatus(StrEnum):
     """Git status enum."""
 
@@ -228,6 +254,9 @@ def changed_paths(*, cd_path: Path = Path("."), stage: bool = False) -> list[Sta
 
 def generate_commit_body(repo: Path, stage: bool = False) -> str:
     """Generate a commit body for kst operations."""
+    # Imported here since kst.repository imports this module
+    from kst.repository import RepositoryDirectory
+
     changed = {
         "Profiles": defaultdict[str, set[Path]](set),
         "Scripts": defaultdict[str, set[Path]](set),
@@ -253,6 +282,7 @@ def generate_commit_body(repo: Path, stage: bool = False) -> str:
     return commit_body.strip()
 
 
+@tracer.span("git.commit")
 def commit_all_changes(
     *, cd_path: Path = Path("."), message: str, scope: Path | None = None, include_body: bool = True
 ) -> None:
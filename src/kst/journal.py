@@ -0,0 +1,193 @@
+import json
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from pathlib import Path
+from types import TracebackType
+from typing import TYPE_CHECKING, Any, Self
+
+from kst import git
+from kst.console import OutputConsole
+
+if TYPE_CHECKING:
+    from kst.cli.common import ActionResponse, PreparedAction
+
+__all__ = ["ActionJournal", "JournalState"]
+
+console = OutputConsole(logging.getLogger(__name__))
+
+# Journals are kept in the git directory so they are never committed with the repository
+JOURNAL_DIRECTORY = Path("kst") / "journal"
+
+
+@dataclass
+class JournalState:
+    """The recorded progress of an operation which did not complete.
+
+    Attributes:
+        command (str): The command which recorded the journal
+        tenant (str): The URL of the tenant the operation ran against
+        options (dict): The command options needed to prepare the same actions again
+        actions (list[dict]): The ID, action and operation of every action the operation prepared
+        completed (set[tuple[str, str]]): The ID and operation of each action which succeeded
+        in_flight (list[dict]): The actions which started but never finished
+
+    """
+
+    command: str
+    tenant: str
+    options: dict[str, Any] = field(default_factory=dict)
+    actions: list[dict[str, str]] = field(default_factory=list)
+    completed: set[tuple[str, str]] = field(default_factory=set)
+    in_flight: list[dict[str, str]] = field(default_factory=list)
+
+    @property
+    def pending_ids(self) -> set[str]:
+        """The IDs of members with an action which did not succeed."""
+        return {action["id"] for action in self.actions if (action["id"], action["operation"]) not in self.completed}
+
+
+class ActionJournal:
+    """A write-ahead journal of the actions taken by a push or sync.
+
+    The prepared actions are recorded before any of them run. Each action is then recorded when it begins
+    and again with its result when it ends, so an operation which is interrupted leaves a record of exactly
+    which actions completed and which were in flight. The journal is removed once the operation finishes
+    without any failures. Otherwise it is kept so the operation can be resumed with --resume.
+
+    Each record is a single line of JSON which is flushed as soon as it is written so it survives the process
+    being killed. Records may be written from several threads at once.
+
+    Attributes:
+        path (Path): The JSON Lines file of the journal
+
+    Methods:
+        for_command: Get the journal of a command in a repository
+        load: Read the progress of an operation which did not complete
+        recording: Record a new operation, replacing any previous journal
+        begin: Record that an action has started
+        end: Record the result of an action
+        discard: Remove the journal
+
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._file = None
+        self._failed = False
+
+    @classmethod
+    def for_command(cls, repo: Path, command: str) -> Self:
+        """Get the journal of command for the repository containing repo."""
+        return cls(git.locate_git_dir(cd_path=repo) / JOURNAL_DIRECTORY / f"{command}.jsonl")
+
+    def load(self) -> JournalState | None:
+        """Read the progress of an operation which did not complete.
+
+        Returns:
+            JournalState | None: The recorded progress or None if there is no valid journal.
+
+        """
+        try:
+            with self.path.open("r") as file:
+                lines = file.readlines()
+        except FileNotFoundError:
+            return None
+
+        state = None
+        started: dict[tuple[str, str], dict[str, str]] = {}
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # The last line may be incomplete if the process was killed while writing it
+                console.debug(f"Skipping invalid journal line in {self.path}")
+                continue
+
+            match record.get("event"):
+                case "start":
+                    state = JournalState(
+                        command=record["command"],
+                        tenant=record["tenant"],
+                        options=record.get("options", {}),
+                        actions=record.get("actions", []),
+                    )
+                case "begin" if state is not None:
+                    started[(record["id"], record["operation"])] = record
+                case "end" if state is not None:
+                    key = (record["id"], record["operation"])
+                    started.pop(key, None)
+                    if record.get("result") == "success":
+                        state.completed.add(key)
+
+        if state is not None:
+            state.in_flight = list(started.values())
+        return state
+
+    def recording(
+        self, *, command: str, tenant: str, actions: "list[PreparedAction]", options: dict[str, Any] | None = None
+    ) -> Self:
+        """Start recording a new operation, replacing any previous journal.
+
+        Use the returned journal as a context manager to record the actions while they run.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._failed = False
+        self._file = self.path.open("w", buffering=1)
+        self._write(
+            {
+                "event": "start",
+                "timestamp": datetime.now(UTC).isoformat(),
+                "command": command,
+                "tenant": tenant,
+                "options": options or {},
+                "actions": [
+                    {"id": action.member.id, "action": str(action.action), "operation": str(action.operation)}
+                    for action in actions
+                ],
+            }
+        )
+        return self
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc_value: BaseException | None, traceback: TracebackType | None
+    ) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        if exc_type is None and not self._failed:
+            self.discard()
+
+    def _write(self, record: dict[str, Any]) -> None:
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(json.dumps(record) + "\n")
+
+    def begin(self, action: "PreparedAction") -> None:
+        """Record that action has started."""
+        self._write(
+            {"event": "begin", "id": action.member.id, "action": str(action.action), "operation": str(action.operation)}
+        )
+
+    def end(self, response: "ActionResponse") -> None:
+        """Record the result of an action.
+
+        Only record the result once the local changes of the action are on disk, since a successful action is
+        not taken again when the operation is resumed.
+        """
+        if response.result == "failure":
+            self._failed = True
+        self._write(
+            {"event": "end", "id": response.id, "operation": str(response.operation), "result": str(response.result)}
+        )
+
+    def discard(self) -> None:
+        """Remove the journal."""
+        self.path.unlink(missing_ok=True)
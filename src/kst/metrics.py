@@ -0,0 +1,200 @@
+import math
+import os
+import re
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+from uuid import uuid4
+
+from kst.tracing import Span
+
+__all__ = ["MetricFamily", "format_metrics", "metrics_path", "write_metrics"]
+
+# The upper bounds in seconds of the buckets of every duration histogram
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_UNSAFE_FILE_CHARACTERS = re.compile(r"[^A-Za-z0-9_.-]+")
+
+type LabelSet = tuple[tuple[str, str], ...]
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: LabelSet) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape_label_value(value)}"' for name, value in labels) + "}"
+
+
+@dataclass
+class MetricFamily:
+    """A metric and its samples in the Prometheus text exposition format.
+
+    Attributes:
+        name (str): The name of the metric, including the _total suffix of a counter
+        kind (str): The type of the metric (counter, gauge or histogram)
+        help (str): The description of the metric
+        values (dict): The value of each label set of a counter or gauge
+        observations (dict): The observed values of each label set of a histogram
+
+    Methods:
+        add: Add to the value of a counter or set the value of a gauge
+        observe: Record a value in a histogram
+        format: Format the metric as lines of text
+
+    """
+
+    name: str
+    kind: str
+    help: str
+    values: dict[LabelSet, float] = field(default_factory=dict)
+    observations: dict[LabelSet, list[float]] = field(default_factory=dict)
+
+    @staticmethod
+    def _label_set(labels: dict[str, object]) -> LabelSet:
+        return tuple((name, str(value)) for name, value in labels.items() if value is not None)
+
+    def add(self, value: float = 1, **labels: object) -> None:
+        """Add value to a counter or set the value of a gauge for labels."""
+        label_set = self._label_set(labels)
+        if self.kind == "gauge":
+            self.values[label_set] = value
+        else:
+            self.values[label_set] = self.values.get(label_set, 0) + value
+
+    def observe(self, value: float, **labels: object) -> None:
+        """Record value in the histogram for labels."""
+        self.observations.setdefault(self._label_set(labels), []).append(value)
+
+    def format(self) -> list[str]:
+        """Format the metric as lines of text, or no lines if it has no samples."""
+        if not self.values and not self.observations:
+            return []
+
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in self.values.items():
+            lines.append(f"{self.name}{_format_labels(labels)} {_format_value(value)}")
+        for labels, observed in self.observations.items():
+            for bound in (*DURATION_BUCKETS, math.inf):
+                bucket_labels = (*labels, ("le", _format_value(bound)))
+                count = sum(1 for value in observed if value <= bound)
+                lines.append(f"{self.name}_bucket{_format_labels(bucket_labels)} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(sum(observed))}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {len(observed)}")
+        return lines
+
+
+def format_metrics(spans: Iterable[Span], labels: dict[str, str] | None = None) -> str:
+    """Convert the spans recorded during a command to metrics.
+
+    API requests, pushes, pulls and git commands are counted from their spans, and the duration of every phase
+    is recorded in a histogram. The result is in the Prometheus text exposition format read by the textfile
+    collector of the node exporter.
+
+    Args:
+        spans (Iterable[Span]): The spans recorded by the tracer
+        labels (dict[str, str] | None): Labels added to every sample, like the command and tenant
+
+    Returns:
+        str: The metrics as text
+
+    """
+    labels = labels or {}
+    command_duration = MetricFamily("kst_command_duration_seconds", "gauge", "Duration of the command.")
+    completed = MetricFamily("kst_command_completed_timestamp_seconds", "gauge", "When the command completed.")
+    phases = MetricFamily("kst_phase_duration_seconds", "histogram", "Duration of each phase of the command.")
+    requests = MetricFamily("kst_api_requests_total", "counter", "API requests by method and status code.")
+    request_duration = MetricFamily("kst_api_request_duration_seconds", "histogram", "Duration of API requests.")
+    sent = MetricFamily("kst_api_request_bytes_total", "counter", "Bytes sent in API request bodies.")
+    received = MetricFamily("kst_api_response_bytes_total", "counter", "Bytes received in API response bodies.")
+    actions = MetricFamily("kst_actions_total", "counter", "Pushed and pulled members by action and result.")
+    git_commands = MetricFamily("kst_git_commands_total", "counter", "Git commands by subcommand and exit code.")
+    git_duration = MetricFamily("kst_git_command_duration_seconds", "histogram", "Duration of git commands.")
+
+    for span in spans:
+        attributes = span.attributes
+        match span.name:
+            case "command":
+                command_duration.add(span.duration, **labels)
+                continue
+            case "api.request":
+                tenant_labels = labels | {"tenant": attributes.get("tenant")}
+                request_labels = tenant_labels | {"method": attributes.get("method")}
+                requests.add(**request_labels, status=attributes.get("status", "error"))
+                request_duration.observe(span.duration, **request_labels)
+                sent.add(attributes.get("request_bytes", 0), **tenant_labels)
+                received.add(attributes.get("response_bytes", 0), **tenant_labels)
+            case "action.push" | "action.pull":
+                actions.add(
+                    **labels,
+                    operation=span.name.removeprefix("action."),
+                    member_type=attributes.get("member_type"),
+                    action=attributes.get("action"),
+                    result=attributes.get("result", "error"),
+                )
+            case "git.command":
+                git_labels = labels | {"subcommand": attributes.get("subcommand")}
+                git_commands.add(**git_labels, exit_code=attributes.get("exit_code", "error"))
+                git_duration.observe(span.duration, **git_labels)
+        phases.observe(span.duration, **labels, phase=span.name)
+    completed.add(time.time(), **labels)
+
+    families = (
+        command_duration,
+        completed,
+        phases,
+        requests,
+        request_duration,
+        sent,
+        received,
+        actions,
+        git_commands,
+        git_duration,
+    )
+    return "".join(f"{line}\n" for family in families for line in family.format())
+
+
+def metrics_path(directory: Path, command: str, tenant: str | None = None) -> Path:
+    """Get the file the metrics of command are written to, with a separate file for each tenant."""
+    name = "_".join(part for part in ("kst", command, tenant) if part)
+    return directory / f"{_UNSAFE_FILE_CHARACTERS.sub('_', name)}.prom"
+
+
+def write_metrics(directory: Path, spans: Iterable[Span], command: str) -> Path:
+    """Write the metrics of a command to a file in directory.
+
+    When every API request of the command went to the same tenant, the file and every sample are labeled with
+    the tenant. The file is replaced atomically so a collector never reads a partially written file.
+
+    Args:
+        directory (Path): The directory to write the file to, like the textfile directory of the node exporter
+        spans (Iterable[Span]): The spans recorded by the tracer
+        command (str): The name of the command, like "profile sync"
+
+    Returns:
+        Path: The file the metrics were written to
+
+    """
+    spans = list(spans)
+    tenants = {span.attributes.get("tenant") for span in spans if span.name == "api.request"}
+    tenant = tenants.pop() if len(tenants) == 1 else None
+    labels = {"command": command} | ({"tenant": tenant} if tenant else {})
+
+    path = metrics_path(directory, command, tenant)
+    temp_path = path.with_name(f".{path.name}.{uuid4().hex[:8]}.tmp")
+    directory.mkdir(parents=True, exist_ok=True)
+    try:
+        temp_path.write_text(format_metrics(spans, labels))
+        os.replace(temp_path, path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+    return path
@@ -0,0 +1,140 @@
+import json
+import logging
+import os
+import shutil
+import threading
+from collections.abc import Iterator
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import platformdirs
+
+from kst.__about__ import APP_NAME
+from kst.console import OutputConsole
+
+__all__ = ["DEFAULT_REPORT_PATH", "ReportStore"]
+
+console = OutputConsole(logging.getLogger(__name__))
+
+DEFAULT_REPORT_PATH = platformdirs.user_log_path(appname=APP_NAME) / f"{APP_NAME}_report.jsonl"
+
+# Reports were previously saved as a single JSON array which was rewritten on every run
+LEGACY_REPORT_NAME = f"{APP_NAME}_report.json"
+
+MAX_REPORT_BYTES_ENV_VAR = "KST_REPORT_MAX_BYTES"
+REPORT_BACKUPS_ENV_VAR = "KST_REPORT_BACKUPS"
+DEFAULT_MAX_REPORT_BYTES = 10 * 1024 * 1024
+DEFAULT_REPORT_BACKUPS = 5
+
+
+def _int_from_env(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        console.warning(f"Ignoring invalid value for {name}. Using default of {default}.")
+        return default
+
+
+class ReportStore:
+    """An append-only store of sync reports saved as JSON Lines.
+
+    Each report is appended to the end of the file as a single line, so saving a report costs the same no
+    matter how many reports were saved before it. Once the file grows past max_bytes it is rotated the same
+    way as a log file: the current file is renamed with a .1 suffix, older files are shifted up and only
+    the newest backups are kept.
+
+    Attributes:
+        path (Path): The JSON Lines file new reports are appended to. Defaults to DEFAULT_REPORT_PATH.
+        max_bytes (int): The size after which the file is rotated. A value of 0 or less disables rotation.
+        backups (int): The number of rotated files to keep
+
+    Methods:
+        append: Append a report to the store
+        iter_reports: Iterate over saved reports from newest to oldest
+        get: Get a saved report by ID
+
+    """
+
+    def __init__(self, path: Path | None = None, max_bytes: int | None = None, backups: int | None = None):
+        self.path = DEFAULT_REPORT_PATH if path is None else path
+        self.max_bytes = (
+            _int_from_env(MAX_REPORT_BYTES_ENV_VAR, DEFAULT_MAX_REPORT_BYTES) if max_bytes is None else max_bytes
+        )
+        self.backups = _int_from_env(REPORT_BACKUPS_ENV_VAR, DEFAULT_REPORT_BACKUPS) if backups is None else backups
+        self._lock = threading.Lock()
+
+    @property
+    def files(self) -> list[Path]:
+        """The files of the store from newest to oldest."""
+        return [self.path, *(self.path.with_name(f"{self.path.name}.{index}") for index in range(1, self.backups + 1))]
+
+    def _rotate(self) -> None:
+        files = self.files
+        if self.backups < 1:
+            self.path.unlink(missing_ok=True)
+            return
+        for older, newer in reversed(list(zip(files[1:], files[:-1], strict=True))):
+            if newer.exists():
+                os.replace(newer, older)
+
+    def _migrate_legacy(self) -> None:
+        """Convert a report file saved in the legacy JSON array format to JSON Lines."""
+        legacy_path = self.path.with_name(LEGACY_REPORT_NAME)
+        if legacy_path == self.path or not legacy_path.exists() or self.path.exists():
+            return
+
+        backup_path = legacy_path.with_name(f"{legacy_path.name}.bkp_{datetime.now(UTC).strftime('%Y%m%d%H%M%S')}")
+        try:
+            with legacy_path.open("r") as file:
+                reports = json.load(file)
+            if not isinstance(reports, list):
+                raise json.JSONDecodeError("Invalid JSON format", "", 0)
+        except (OSError, json.JSONDecodeError):
+            console.warning(f"The sync report file is invalid. The file will be backed up to {backup_path.name}.")
+            shutil.move(legacy_path, backup_path)
+            return
+
+        # The legacy file kept the newest report first
+        with self.path.open("w") as file:
+            file.writelines(json.dumps(report) + "\n" for report in reversed(reports))
+        shutil.move(legacy_path, backup_path)
+        console.info(f"Converted {len(reports)} sync reports from {legacy_path} to {self.path}")
+
+    def append(self, report: dict[str, Any]) -> None:
+        """Append a report to the end of the store, rotating the file first if it is too large."""
+        line = json.dumps(report) + "\n"
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._migrate_legacy()
+            try:
+                size = self.path.stat().st_size
+            except FileNotFoundError:
+                size = 0
+            if self.max_bytes > 0 and size > 0 and size + len(line) > self.max_bytes:
+                self._rotate()
+
+            # A single write in append mode keeps lines from concurrent kst processes intact
+            with self.path.open("a") as file:
+                file.write(line)
+
+    def iter_reports(self) -> Iterator[dict[str, Any]]:
+        """Iterate over saved reports from newest to oldest, skipping any lines which are not valid JSON."""
+        for path in self.files:
+            try:
+                with path.open("r") as file:
+                    lines = file.readlines()
+            except FileNotFoundError:
+                continue
+            for line in reversed(lines):
+                try:
+                    report = json.loads(line)
+                except json.JSONDecodeError:
+                    console.debug(f"Skipping invalid sync report line in {path}")
+                    continue
+                if isinstance(report, dict):
+                    yield report
+
+    def get(self, report_id: str) -> dict[str, Any] | None:
+        """Get the saved report with report_id or the newest report whose ID starts with report_id."""
+        return next((report for report in self.iter_reports() if str(report.get("id", "")).startswith(report_id)), None)
@@ -14,8 +14,10 @@ from .info import (
     ProfileInfoFile,
     ScriptInfoFile,
 )
-from .member_base import MemberBase
-from .repository import Repository, RepositoryDirectory
+from .layout import RepositoryLayout
+from .member_base import MemberBase, MemberDirectoryIndex
+from .repository import MemberCache, Repository, RepositoryDirectory
+from .writer import RepositoryWriter
 
 __all__ = [
     "ACCEPTED_INFO_EXTENSIONS",
@@ -33,10 +35,14 @@ __all__ = [
     "InfoFile",
     "InfoFormat",
     "MemberBase",
+    "MemberCache",
+    "MemberDirectoryIndex",
     "Mobileconfig",
     "ProfileInfoFile",
     "Repository",
     "RepositoryDirectory",
+    "RepositoryLayout",
+    "RepositoryWriter",
     "Script",
     "ScriptInfoFile",
 ]
@@ -1,20 +1,29 @@
 import hashlib
 import io
 import json
+import os
 import plistlib
+import re
+import threading
 from abc import ABC
 from collections import OrderedDict
+from datetime import UTC, datetime
 from functools import lru_cache
 from pathlib import Path
 from typing import Any, Self, override
 from uuid import uuid4
 from xml.parsers import expat
 
-from pydantic import BaseModel, ConfigDict, Field, field_validator
+import platformdirs
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr, field_validator
 
+from kst.__about__ import APP_NAME
+from kst.cache import BlobStore
 from kst.console import OutputFormat
 from kst.exceptions import InvalidProfileError
-from kst.utils import yaml
+from kst.utils import map_file, yaml
+
+from .writer import RepositoryWriter
 
 DEFAULT_SCRIPT_CONTENT = """#!/bin/zsh -f
 # https://support.kandji.io/kb/custom-scripts-overview
@@ -24,6 +33,111 @@ exit 0
 """
 DEFAULT_SCRIPT_SUFFIX = ".zsh"
 
+CONTENT_CACHE_ENV_VAR = "KST_CONTENT_CACHE"
+
+
+def content_cache_enabled() -> bool:
+    """Whether the content cache is enabled, which it is unless KST_CONTENT_CACHE is set to 0."""
+    return os.environ.get(CONTENT_CACHE_ENV_VAR, "1") != "0"
+
+
+# Validated file contents shared by all repositories and tenants
+blob_store = BlobStore(platformdirs.user_cache_path(appname=APP_NAME) / "content", enabled=content_cache_enabled())
+
+
+# The start of an XML plist with a dictionary at its root, which can be validated by the structural scan
+XML_PLIST_PREFIX = re.compile(rb"\s*(?:<\?xml[^>]*\?>\s*)?(?:<!DOCTYPE[^>]*>\s*)?<plist\b[^>]*>\s*<dict\b")
+PARSED_PLIST_CACHE_SIZE = 256
+
+# The elements of an XML plist which hold a value, and those of them which only hold text
+PLIST_VALUE_ELEMENTS = frozenset({"dict", "array", "string", "integer", "real", "date", "data", "true", "false"})
+PLIST_TEXT_ELEMENTS = frozenset({"key", "string", "integer", "real", "date", "data"})
+
+# The dates plistlib can parse, which need at least a year, month and day
+PLIST_DATE = re.compile(r"(\d{4})-(\d\d)-(\d\d)(?:T(\d\d)(?::(\d\d)(?::(\d\d))?)?)?Z", re.ASCII)
+
+# The DER encoded object identifier of CMS SignedData (1.2.840.113549.1.7.2) which starts a signed profile
+SIGNED_DATA_OID = bytes.fromhex("06092a864886f70d010702")
+
+# Parsed profile data keyed by the digest of the content it was parsed from, most recently used last
+_parsed_plists: OrderedDict[str, dict[str, Any]] = OrderedDict()
+_parsed_plists_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1024)
+def content_digest(content: str) -> str:
+    """Get the SHA-256 digest of some file content, memoized since it is hashed on every diff."""
+    return hashlib.sha256(content.encode()).hexdigest()
+
+
+def is_signed_profile(data: bytes) -> bool:
+    """Check the header of some profile bytes for a CMS signed envelope."""
+    return data[:1] == b"\x30" and SIGNED_DATA_OID in data[:16]
+
+
+@lru_cache(maxsize=256)
+def signed_digest(content: str) -> str:
+    """Get the SHA-256 digest of the raw bytes of a signed profile."""
+    return hashlib.sha256(content.encode("latin-1")).hexdigest()
+
+
+def _der_element(data: bytes, offset: int) -> tuple[int, int, int, int]:
+    """Read the BER/DER element at offset.
+
+    Returns:
+        tuple[int, int, int, int]: The tag, the start and end of its contents and the offset after the element.
+
+    """
+    tag, length = data[offset], data[offset + 1]
+    offset += 2
+    if tag & 0x1F == 0x1F:
+        raise ValueError("High tag numbers are not supported")
+    if length == 0x80:
+        # Indefinite length contents end at the first end-of-contents marker after the nested elements
+        end = offset
+        while data[end : end + 2] != b"\0\0":
+            end = _der_element(data, end)[3]
+        return tag, offset, end, end + 2
+    if length & 0x80:
+        size = length & 0x7F
+        length = int.from_bytes(data[offset : offset + size])
+        offset += size
+    if offset + length > len(data):
+        raise ValueError("Element extends past the end of the data")
+    return tag, offset, offset + length, offset + length
+
+
+def _der_children(data: bytes, element: tuple[int, int, int, int]) -> list[tuple[int, int, int, int]]:
+    """Read the elements nested in a constructed element."""
+    children = []
+    offset, end = element[1], element[2]
+    while offset < end:
+        children.append(_der_element(data, offset))
+        offset = children[-1][3]
+    return children
+
+
+def extract_signed_content(data: bytes) -> bytes:
+    """Extract the profile embedded in a CMS signed envelope without verifying the signature.
+
+    Raises:
+        ValueError: If the data is not a signed envelope with embedded content.
+
+    """
+    try:
+        content_type, content = _der_children(data, _der_element(data, 0))[:2]
+        if data[content_type[1] - 2 : content_type[2]] != SIGNED_DATA_OID:
+            raise ValueError("The envelope is not signed data")
+        # SignedData: version, digestAlgorithms, encapContentInfo, ...
+        encapsulated = _der_children(data, _der_children(data, _der_children(data, content)[0])[2])
+        octets = _der_children(data, encapsulated[1])[0]
+        if octets[0] == 0x04:
+            return data[octets[1] : octets[2]]
+        # Constructed octet strings are split into chunks, which BER encoders emit for large contents
+        return b"".join(data[chunk[1] : chunk[2]] for chunk in _der_children(data, octets) if chunk[0] == 0x04)
+    except (IndexError, ValueError) as error:
+        raise ValueError("The signed profile does not contain an embedded profile") from error
+
 
 class File(BaseModel, ABC):
     """An abstract data model for representing a generic file."""
@@ -33,6 +147,9 @@ class File(BaseModel, ABC):
     content: str
     path: Path | None = Field(exclude=True, default=None)
 
+    # The digest of the bytes content was decoded from, which is only valid while content is that same string
+    _loaded_digest: tuple[str, str] | None = PrivateAttr(default=None)
+
     @field_validator("path", mode="after")
     @classmethod
     def ensure_absolute_paths(cls, v: Path | None) -> Path | None:
@@ -43,16 +160,50 @@ class File(BaseModel, ABC):
 
     @property
     def diff_hash(self) -> str:
-        return hashlib.sha256(self.content.encode()).hexdigest()
+        if self._loaded_digest is not None and self._loaded_digest[0] is self.content:
+            return self._loaded_digest[1]
+        return content_digest(self.content)
+
+    def _remember_digest(self, digest: str) -> Self:
+        """Remember the digest of the bytes content was decoded from so diff_hash doesn't encode it again."""
+        self._loaded_digest = (self.content, digest)
+        return self
 
     @classmethod
     def load(cls, path: Path) -> Self:
-        return cls(content=path.read_text(), path=path)
+        with map_file(path) as data:
+            content = str(data, "utf-8")
+            if "\r" in content:
+                # Match the universal newlines of reading in text mode, which also changes the digest
+                return cls(content=content.replace("\r\n", "\n").replace("\r", "\n"), path=path)
+            return cls(content=content, path=path)._remember_digest(hashlib.sha256(data).hexdigest())
+
+    def serialize(self) -> bytes:
+        """Return the bytes which are written to disk for the file."""
+        return self.content.encode()
 
-    def write(self):
+    def write(self, writer: RepositoryWriter | None = None) -> None:
+        """Write the file to its path.
+
+        Args:
+            writer (RepositoryWriter | None): A writer to stage the file in. If not provided, the file is
+                written atomically right away.
+
+        """
         if self.path is None:
             raise ValueError("Cannot write without a path set.")
-        self.path.write_text(self.content)
+
+        if writer is None:
+            with RepositoryWriter() as writer:
+                self.write(writer=writer)
+            return
+
+        writer.write_bytes(self.path, self.serialize(), executable=self.executable)
+
+    @property
+    def executable(self) -> bool:
+        """Whether the file should be written with executable permissions."""
+        return False
 
     def format_plain_text(self, format: OutputFormat) -> str:  # noqa: ARG002
         """Format the content as plain text."""
@@ -60,7 +211,11 @@ class File(BaseModel, ABC):
 
 
 class Mobileconfig(File):
-    """A data model for representing a mobileconfig file."""
+    """A data model for representing a mobileconfig file.
+
+    Signed profiles are kept as their raw bytes, stored in content one character per byte, so they are written
+    back exactly as they were read. The embedded profile is only extracted once its data is needed.
+    """
 
     @field_validator("path", mode="after")
     @classmethod
@@ -70,17 +225,154 @@ class Mobileconfig(File):
             raise ValueError("Invalid mobileconfig file extension: Expected .mobileconfig")
         return v
 
+    @property
+    def signed(self) -> bool:
+        """Whether the content is a signed profile."""
+        return self.content[:1] == "0" and SIGNED_DATA_OID.decode("latin-1") in self.content[:16]
+
+    @property
+    @override
+    def diff_hash(self) -> str:
+        if self.signed and (self._loaded_digest is None or self._loaded_digest[0] is not self.content):
+            return signed_digest(self.content)
+        return super().diff_hash
+
+    @override
+    def serialize(self) -> bytes:
+        return self.content.encode("latin-1") if self.signed else super().serialize()
+
+    @property
+    def plist_content(self) -> str:
+        """The plist of the profile, which is embedded in the envelope of a signed profile."""
+        if self.signed:
+            return extract_signed_content(self.serialize()).decode()
+        return self.content
+
     @property
     def data(self) -> dict[str, Any]:
-        return self._data(self.content)
+        """The parsed profile data, which is only parsed the first time it is needed for the same content.
+
+        Raises:
+            InvalidProfileError: If the content is not a valid plist.
+
+        """
+        digest = self.diff_hash
+        with _parsed_plists_lock:
+            if (cached := _parsed_plists.get(digest)) is not None:
+                _parsed_plists.move_to_end(digest)
+                return cached
+        try:
+            content = extract_signed_content(self.serialize()) if self.signed else self.content
+            return self._remember_data(digest, self._data(content))
+        except ValueError as error:
+            location = "" if self.path is None else f" at {self.path}"
+            raise InvalidProfileError(f"The mobileconfig{location} is in an invalid format: {error}") from error
+
+    @staticmethod
+    def _remember_data(digest: str, data: dict[str, Any]) -> dict[str, Any]:
+        with _parsed_plists_lock:
+            _parsed_plists[digest] = data
+            if len(_parsed_plists) > PARSED_PLIST_CACHE_SIZE:
+                _parsed_plists.popitem(last=False)
+        return data
 
     @staticmethod
-    @lru_cache
     def _data(content: str | bytes) -> dict[str, Any]:
         try:
-            return plistlib.loads(content, dict_type=OrderedDict)
+            data = plistlib.loads(content, dict_type=OrderedDict)
         except (plistlib.InvalidFileException, expat.ExpatError) as error:
             raise ValueError("The mobileconfig content is not a valid plist") from error
+        if not isinstance(data, dict):
+            raise ValueError("The mobileconfig content does not have a dictionary at its root")
+        return data
+
+    @staticmethod
+    def _check_scalar(name: str, text: str) -> None:
+        """Check that the text of an integer, real or date element can be parsed like plistlib does."""
+        match name:
+            case "integer":
+                int(text, 16) if text.startswith(("0x", "0X")) else int(text)
+            case "real":
+                float(text)
+            case "date":
+                if (match := PLIST_DATE.match(text)) is None:
+                    raise ValueError(f"Invalid date {text!r}")
+                datetime(*(int(group) for group in match.groups() if group is not None), tzinfo=UTC)
+
+    @classmethod
+    def _scan(cls, content: bytes) -> None:
+        """Check the structure of an XML plist without building its data.
+
+        The text of integer, real and date elements is checked too, since those are the values plistlib fails to
+        convert when the data is built.
+
+        Raises:
+            ValueError: If the content is not well-formed XML, is not structured like a plist or has a scalar
+                which can't be converted.
+
+        """
+        # The element names and, for dictionaries, the number of keys and values of each open element
+        stack: list[list[Any]] = []
+        # The text of the open scalar element, which is only collected for elements that need to be converted
+        text: list[str] = []
+
+        def start_element(name: str, _attributes: dict[str, str]) -> None:
+            if not stack:
+                if name != "plist":
+                    raise ValueError(f"Unexpected root element <{name}>")
+            elif stack[-1][0] in PLIST_TEXT_ELEMENTS or stack[-1][0] in ("true", "false"):
+                raise ValueError(f"Unexpected element <{name}> in <{stack[-1][0]}>")
+            elif stack[-1][0] == "plist":
+                if stack[-1][1] or name != "dict":
+                    raise ValueError("The plist does not have a single dictionary at its root")
+                stack[-1][1] += 1
+            elif stack[-1][0] == "dict":
+                # Dictionary entries alternate between a key and its value
+                expected_key = stack[-1][1] % 2 == 0
+                if (name == "key") != expected_key or (not expected_key and name not in PLIST_VALUE_ELEMENTS):
+                    raise ValueError(f"Unexpected element <{name}> in <dict>")
+                stack[-1][1] += 1
+            elif name not in PLIST_VALUE_ELEMENTS:
+                raise ValueError(f"Unexpected element <{name}> in <{stack[-1][0]}>")
+            stack.append([name, 0])
+            if name in ("integer", "real", "date"):
+                parser.CharacterDataHandler = text.append
+
+        def end_element(name: str) -> None:
+            _, count = stack.pop()
+            if name == "dict" and count % 2:
+                raise ValueError("A key in a dictionary is missing its value")
+            if name in ("integer", "real", "date"):
+                parser.CharacterDataHandler = None
+                cls._check_scalar(name, "".join(text))
+                text.clear()
+
+        parser = expat.ParserCreate()
+        parser.StartElementHandler = start_element
+        parser.EndElementHandler = end_element
+        try:
+            parser.Parse(content, True)
+        except expat.ExpatError as error:
+            raise ValueError("The mobileconfig content is not a valid plist") from error
+
+    @classmethod
+    def _validate(cls, content: bytes) -> dict[str, Any] | None:
+        """Validate the content of a mobileconfig file.
+
+        XML plists with a dictionary at their root are only scanned to check that they are well-formed and
+        structured like a plist, which is much faster than building the data. Anything else is fully parsed.
+
+        Returns:
+            dict[str, Any] | None: The parsed data if the content had to be parsed, otherwise None.
+
+        Raises:
+            ValueError: If the content is not a valid plist.
+
+        """
+        if XML_PLIST_PREFIX.match(content) is None:
+            return cls._data(content)
+        cls._scan(content)
+        return None
 
     @classmethod
     def default_content(cls, _id: str | None = None, name: str = "New Profile") -> str:
@@ -106,22 +398,51 @@ class Mobileconfig(File):
     @override
     @classmethod
     def load(cls, path: Path) -> Self:
-        profile_bytes = path.read_bytes()
+        """Load and validate a mobileconfig, converting binary plists to XML.
+
+        Contents which were already validated are looked up in the content cache by digest to skip validating them
+        again. The profile data is only parsed once it is needed unless the file is a binary plist. Signed profiles
+        are kept as they are after checking the profile embedded in them.
+        """
+        with map_file(path) as data:
+            digest = blob_store.digest(data)
+            if (content_ref := blob_store.get_ref("mobileconfig", digest)) is not None:
+                if content_ref == digest:
+                    encoding = "latin-1" if is_signed_profile(data[:16]) else "utf-8"
+                    return cls(content=str(data, encoding), path=path)._remember_digest(digest)
+                if (content_bytes := blob_store.get(content_ref)) is not None:
+                    return cls(content=content_bytes.decode(), path=path)._remember_digest(content_ref)
+            profile_bytes = bytes(data)
+
+        if is_signed_profile(profile_bytes):
+            try:
+                cls._validate(extract_signed_content(profile_bytes))
+            except ValueError as error:
+                raise InvalidProfileError(
+                    f"The signed mobileconfig at {path} is in an invalid format. Check the file and try again."
+                ) from error
+            blob_store.set_ref("mobileconfig", digest, digest)
+            return cls(content=profile_bytes.decode("latin-1"), path=path)._remember_digest(digest)
+
         try:
-            profile_data = cls._data(profile_bytes)
+            profile_data = cls._validate(profile_bytes)
         except ValueError as error:
             raise InvalidProfileError(
                 f"The mobileconfig at {path} is in an invalid format. Check the file and try again."
             ) from error
-        if profile_bytes[:8] == b"bplist00":
-            profile_content = plistlib.dumps(profile_data, fmt=plistlib.FMT_XML).decode()
+        if profile_data is not None and profile_bytes[:8] == b"bplist00":
+            profile_content = plistlib.dumps(profile_data, fmt=plistlib.FMT_XML)
+            normalized_digest = blob_store.put(profile_content)
         else:
-            profile_content = profile_bytes.decode()
-        return cls(content=profile_content, path=path)
+            profile_content, normalized_digest = profile_bytes, digest
+        if profile_data is not None:
+            cls._remember_data(normalized_digest, profile_data)
+        blob_store.set_ref("mobileconfig", digest, normalized_digest)
+        return cls(content=profile_content.decode(), path=path)._remember_digest(normalized_digest)
 
     @override
     def format_plain_text(self, format: OutputFormat) -> str:
-        format_dict = plistlib.loads(self.content)
+        format_dict = _plain_dicts(self.data)
         match format:
             case OutputFormat.PLIST | OutputFormat.TABLE:
                 return plistlib.dumps(format_dict, fmt=plistlib.FMT_XML, sort_keys=False).decode()
@@ -133,14 +454,19 @@ class Mobileconfig(File):
                 return output_str.getvalue()
 
 
+def _plain_dicts(value: Any) -> Any:
+    """Recursively convert the OrderedDicts of parsed plist data to dicts, which YAML dumps as plain mappings."""
+    if isinstance(value, dict):
+        return {key: _plain_dicts(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_plain_dicts(item) for item in value]
+    return value
+
+
 class Script(File):
     """A data model for representing a script file."""
 
+    @property
     @override
-    def write(self):
-        if self.path is None:
-            raise ValueError("Cannot write without a path set.")
-        self.path.write_text(self.content)
-
-        # Make the script executable
-        self.path.chmod(self.path.stat().st_mode | 0o111)
+    def executable(self) -> bool:
+        return True
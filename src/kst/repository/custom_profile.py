@@ -1,4 +1,3 @@
-import plistlib
 from pathlib import Path
 from typing import Self, override
 
@@ -6,7 +5,6 @@ from rich.syntax import Syntax
 from rich.table import Table
 from ruamel.yaml.scalarstring import LiteralScalarString
 
-from kst import git
 from kst.api import ApiConfig, CustomProfilePayload, CustomProfilesResource, PayloadList
 from kst.console import SyntaxType
 from kst.exceptions import (
@@ -20,7 +18,9 @@ from kst.utils import sanitize_filename
 
 from .content import Mobileconfig
 from .info import ACCEPTED_INFO_EXTENSIONS, PROFILE_RUNS_ON_PARAMS, ProfileInfoFile
-from .member_base import MemberBase
+from .layout import member_parent
+from .member_base import MemberBase, MemberDirectoryIndex
+from .writer import RepositoryWriter
 
 DIRECTORY_NAME = "profiles"
 
@@ -44,33 +44,29 @@ class CustomProfile(MemberBase):
         self.profile.path = value
 
     @override
-    def ensure_paths(self, repo_path: Path) -> None:
+    def ensure_paths(self, repo_path: Path, directory_index: MemberDirectoryIndex | None = None) -> None:
         """Set the info_path and profile_path properties to valid default paths within the repository.
 
+        A member which already has paths is moved to the shard of its ID when the repository is sharded and the
+        ID has changed, like after the member is created in Kandji.
+
         Raises:
             InvalidRepositoryError: repo_path is not a valid Kandji Sync Toolkit repository.
         """
         if self.has_paths:
-            return  # Nothing to do here
-
-        repo_path = repo_path.resolve()
-        profiles_root = git.locate_root(cd_path=repo_path) / "profiles"
-
-        profile_parent = (repo_path if repo_path.is_relative_to(profiles_root) else profiles_root) / sanitize_filename(
-            self.info.name
-        )
+            self._ensure_shard(repo_path, DIRECTORY_NAME, sanitize_filename(self.info.name), directory_index)
+            return
 
         # If output path already exists, increment the path with a number
-        count = 0
-        while profile_parent.exists():
-            count += 1
-            profile_parent = profile_parent.parent / f"{sanitize_filename(self.info.name)} ({count})"
+        profile_parent = (directory_index or MemberDirectoryIndex()).allocate(
+            member_parent(repo_path, DIRECTORY_NAME, self.id), sanitize_filename(self.info.name)
+        )
 
         self.info.path = profile_parent / f"info.{self.info.format}"
         self.profile.path = profile_parent / "profile.mobileconfig"
 
     @override
-    def write(self, write_content=True) -> None:
+    def write(self, write_content=True, writer: RepositoryWriter | None = None) -> None:
         """Save the CustomProfile object to the file system at the profile_path and info_path locations."""
         # Ensure valid profile path and info path are set
         if not self.has_paths:
@@ -82,15 +78,19 @@ class CustomProfile(MemberBase):
                 f"The info_path and profile_path properties must be paths to files within the same directory ({self.info_path.parent} != {self.profile_path.parent})."
             )
 
-        # Create missing directories if they do not exist
-        self.info_path.parent.mkdir(parents=True, exist_ok=True)
+        if writer is None:
+            with RepositoryWriter() as writer:
+                self.write(write_content=write_content, writer=writer)
+            return
+
+        self._stage_moved_paths(writer)
 
         # Write info to file
-        self.info.write()
+        self.info.write(writer=writer)
 
         # Write profile to file
         if write_content:
-            self.profile.write()
+            self.profile.write(writer=writer)
 
     @override
     @classmethod
@@ -102,10 +102,11 @@ class CustomProfile(MemberBase):
             for param in PROFILE_RUNS_ON_PARAMS:
                 setattr(payload, param, True)
 
-        info_file = ProfileInfoFile.model_validate(payload.model_dump(exclude={"profile"}))
-        mobileconfig = Mobileconfig(content=payload.profile)
+        # The payload was validated when it was received, so the member is built without validating it again
+        info_file = ProfileInfoFile.from_payload_data({k: v for k, v in vars(payload).items() if k != "profile"})
+        mobileconfig = Mobileconfig.model_construct(content=payload.profile)
 
-        return cls(info=info_file, profile=mobileconfig)
+        return cls.model_construct(info=info_file, profile=mobileconfig)
 
     @override
     def to_api_payload(self) -> CustomProfilePayload:
@@ -248,18 +249,23 @@ class CustomProfile(MemberBase):
 
     @override
     def prepare_syntax_dict(self, syntax: SyntaxType | None = None) -> dict:
-        """Format the CustomProfile object as a dictionary for output conversion."""
+        """Format the CustomProfile object as a dictionary for output conversion.
+
+        Raises:
+            InvalidProfileError: If the XML syntax is requested and the profile is not a valid plist.
+
+        """
 
         output_dict = self.info.model_dump(mode="json", exclude={"sync_hash"})
-        output_dict["profile"] = self.profile.content
+        output_dict["profile"] = self.profile.plist_content
         if output_dict.get("updated_at") is None:
             output_dict["updated_at"] = output_dict["created_at"]
 
         # do format specific transforms
         match syntax:
             case SyntaxType.XML:
-                # To avoid double-encoding, we need to decode the profile content
-                output_dict["profile"] = plistlib.loads(output_dict["profile"].encode())
+                # To avoid double-encoding, the parsed profile data is output instead of its content
+                output_dict["profile"] = self.profile.data
                 # Plistlib does not support None values, so we need to remove them
                 output_dict = {k: v for k, v in output_dict.items() if v is not None}
                 return output_dict
@@ -286,6 +292,6 @@ class CustomProfile(MemberBase):
         table.add_row("Runs On", self._format_runs_on())
         table.add_row("Created At", self.info.created_at)
         table.add_row("Updated At", self.info.updated_at if self.info.updated_at is not None else self.info.created_at)
-        table.add_row("Profile", Syntax(self.profile.content, "xml", background_color="default"))
+        table.add_row("Profile", Syntax(self.profile.plist_content, "xml", background_color="default"))
 
         return table
@@ -1,15 +1,20 @@
 import contextlib
 import functools
+import logging
+import os
+import threading
+from collections.abc import Iterable
 from pathlib import Path
 from typing import Self, override
 from uuid import UUID
 
+import platformdirs
 from pygments.lexers import guess_lexer
 from rich.syntax import Syntax
 from rich.table import Table
 from ruamel.yaml.scalarstring import LiteralScalarString
 
-from kst import git
+from kst.__about__ import APP_NAME
 from kst.api import (
     ApiConfig,
     CustomScriptPayload,
@@ -18,7 +23,8 @@ from kst.api import (
     PayloadList,
     SelfServiceCategoriesResource,
 )
-from kst.console import SyntaxType
+from kst.cache import TtlCache
+from kst.console import OutputConsole, SyntaxType
 from kst.exceptions import (
     DuplicateInfoFileError,
     DuplicateScriptError,
@@ -30,12 +36,68 @@ from kst.utils import sanitize_filename
 
 from .content import DEFAULT_SCRIPT_CONTENT, DEFAULT_SCRIPT_SUFFIX, Script
 from .info import ACCEPTED_INFO_EXTENSIONS, DEFAULT_SCRIPT_CATEGORY, ScriptInfoFile
-from .member_base import MemberBase
+from .layout import member_parent
+from .member_base import MemberBase, MemberDirectoryIndex
+from .writer import RepositoryWriter
+
+console = OutputConsole(logging.getLogger(__name__))
 
 DIRECTORY_NAME = "scripts"
 
+CATEGORY_TTL_ENV_VAR = "KST_CATEGORY_TTL"
+DEFAULT_CATEGORY_TTL = 3600
+
+
+def category_ttl() -> float:
+    """Get the number of seconds Self Service categories are cached for from KST_CATEGORY_TTL."""
+    try:
+        return float(os.environ.get(CATEGORY_TTL_ENV_VAR, DEFAULT_CATEGORY_TTL))
+    except ValueError:
+        return DEFAULT_CATEGORY_TTL
+
 
 @functools.cache
+def category_cache() -> TtlCache:
+    """Get the cache of the Self Service categories of each tenant shared between runs.
+
+    The cache is created the first time it is needed, with the TTL set by KST_CATEGORY_TTL at that time.
+    """
+    return TtlCache(platformdirs.user_cache_path(appname=APP_NAME) / "categories.json", ttl=category_ttl())
+
+
+# Category indexes already loaded by this process keyed by ApiConfig.cache_key
+_category_indexes: dict[str, dict[str, str]] = {}
+# Lowercase category names which were still missing after the index was refreshed, keyed by ApiConfig.cache_key
+_missing_categories: dict[str, set[str]] = {}
+_category_lock = threading.Lock()
+
+
+def get_category_index(config: ApiConfig, refresh: bool = False) -> dict[str, str]:
+    """Get a mapping of lowercase Self Service category names to IDs for the tenant in config.
+
+    The categories are fetched at most once per process unless refresh is True, and are cached on disk for
+    KST_CATEGORY_TTL seconds so later runs don't need to fetch them at all.
+    """
+    with _category_lock:
+        if not refresh:
+            if (index := _category_indexes.get(config.cache_key)) is not None:
+                return index
+            if (index := category_cache().get(config.cache_key)) is not None:
+                _category_indexes[config.cache_key] = index
+                return index
+
+        with SelfServiceCategoriesResource(config) as ss:
+            categories = ss.list()
+
+        index = {}
+        for category in categories:
+            # Keep the first category with a name like the original lookup did
+            index.setdefault(category.name.lower(), category.id)
+        _category_indexes[config.cache_key] = index
+        category_cache().set(config.cache_key, index)
+        return index
+
+
 def get_category_id(config: ApiConfig, name: str | None = None) -> str:
     """Get the ID for the named category (or default) in Self Service, if it exists."""
     if name is not None:
@@ -43,14 +105,26 @@ def get_category_id(config: ApiConfig, name: str | None = None) -> str:
             UUID(name, version=4)
             return name  # name is already a valid UUID
 
-    with SelfServiceCategoriesResource(config) as ss:
-        categories = ss.list()
-
     name = DEFAULT_SCRIPT_CATEGORY if name is None else name
-    try:
-        return next(c.id for c in categories if c.name.lower() == name.lower())
-    except StopIteration:
-        raise ValueError(f"Unable to get ID for category '{name}'. Ensure the category exists.")
+    if (category_id := get_category_index(config).get(name.lower())) is not None:
+        return category_id
+
+    # The category may have been created since the index was loaded, but a category which was still missing after
+    # a refresh is not fetched again for every other script in the same run
+    with _category_lock:
+        missing = name.lower() in _missing_categories.get(config.cache_key, ())
+    if not missing:
+        if (category_id := get_category_index(config, refresh=True).get(name.lower())) is not None:
+            return category_id
+        with _category_lock:
+            _missing_categories.setdefault(config.cache_key, set()).add(name.lower())
+    raise ValueError(f"Unable to get ID for category '{name}'. Ensure the category exists.")
+
+
+def forget_missing_categories() -> None:
+    """Forget which categories were missing so they are looked up again, like when the daemon starts a command."""
+    with _category_lock:
+        _missing_categories.clear()
 
 
 class CustomScript(MemberBase):
@@ -105,28 +179,24 @@ class CustomScript(MemberBase):
                 return "No enforcement"
 
     @override
-    def ensure_paths(self, repo_path: Path) -> None:
+    def ensure_paths(self, repo_path: Path, directory_index: MemberDirectoryIndex | None = None) -> None:
         """Set the path properties to valid default paths within the repository.
 
+        A member which already has paths is moved to the shard of its ID when the repository is sharded and the
+        ID has changed, like after the member is created in Kandji.
+
         Raises:
             InvalidRepositoryError: repo_path is not a valid Kandji Sync Toolkit repository.
         """
         if self.has_paths:
-            return  # Nothing to do here
+            self._ensure_shard(repo_path, DIRECTORY_NAME, sanitize_filename(self.info.name), directory_index)
+            return
 
         if self.info.path is None:
-            repo_path = repo_path.resolve()
-            scripts_root = git.locate_root(cd_path=repo_path) / "scripts"
-
-            script_parent = (repo_path if repo_path.is_relative_to(scripts_root) else scripts_root) / sanitize_filename(
-                self.info.name
-            )
-
             # If output path already exists, increment the path with a number
-            count = 0
-            while script_parent.exists():
-                count += 1
-                script_parent = script_parent.parent / f"{sanitize_filename(self.info.name)} ({count})"
+            script_parent = (directory_index or MemberDirectoryIndex()).allocate(
+                member_parent(repo_path, DIRECTORY_NAME, self.id), sanitize_filename(self.info.name)
+            )
 
             self.info.path = script_parent / f"info.{self.info.format}"
 
@@ -142,7 +212,7 @@ class CustomScript(MemberBase):
                 self.remediation.path = self.info.path.parent / self.remediation.path.name
 
     @override
-    def write(self, write_content=True) -> None:
+    def write(self, write_content=True, writer: RepositoryWriter | None = None) -> None:
         """Save the CustomScript object to the file system."""
         # Ensure valid paths are set
         if not self.has_paths:
@@ -168,37 +238,43 @@ class CustomScript(MemberBase):
                 f'The remediation script file name must start with "remediation" (got {self.remediation_path.name}).'
             )
 
-        # Create missing directories if they do not exist
-        self.info_path.parent.mkdir(parents=True, exist_ok=True)
+        if writer is None:
+            with RepositoryWriter() as writer:
+                self.write(write_content=write_content, writer=writer)
+            return
+
+        self._stage_moved_paths(writer)
 
         # Write info to file
-        self.info.write()
+        self.info.write(writer=writer)
 
         # Write script content to file(s)
         if write_content:
-            self.audit.write()
+            self.audit.write(writer=writer)
             if self.remediation is None:
                 try:
-                    remediation_path = next(self.info_path.parent.glob("remediation*"))
-                    remediation_path.unlink()
+                    writer.unlink(next(self.info_path.parent.glob("remediation*")))
                 except StopIteration:
                     pass
             else:
-                self.remediation.write()
+                self.remediation.write(writer=writer)
 
     @override
     @classmethod
     def from_api_payload(cls, payload: CustomScriptPayload) -> Self:
         """Create a CustomScript object from an API payload."""
 
-        info_file = ScriptInfoFile.model_validate(payload.model_dump(exclude={"script", "remediation_script"}))
-        audit_script = Script(content=payload.script)
+        # The payload was validated when it was received, so the member is built without validating it again
+        info_file = ScriptInfoFile.from_payload_data(
+            {k: v for k, v in vars(payload).items() if k not in {"script", "remediation_script"}}
+        )
+        audit_script = Script.model_construct(content=payload.script)
         if payload.remediation_script != "":
-            remediation_script = Script(content=payload.remediation_script)
+            remediation_script = Script.model_construct(content=payload.remediation_script)
         else:
             remediation_script = None
 
-        return cls(info=info_file, audit=audit_script, remediation=remediation_script)
+        return cls.model_construct(info=info_file, audit=audit_script, remediation=remediation_script)
 
     @override
     def to_api_payload(self) -> CustomScriptPayload:
@@ -300,6 +376,20 @@ class CustomScript(MemberBase):
         with CustomScriptsResource(config) as api:
             return api.get(id=self.id)
 
+    @override
+    @classmethod
+    def prepare_remote(cls, config: ApiConfig, members: Iterable[Self]) -> None:
+        """Resolve the Self Service category of every script up front so pushes never wait on a lookup."""
+        names = {member.info.self_service_category_id for member in members if member.info.show_in_self_service}
+        if not names:
+            return
+        try:
+            for name in names:
+                get_category_id(config=config, name=name)
+        except (ValueError, OSError) as error:
+            # Each script reports its own category errors when it is pushed
+            console.debug(f"Unable to resolve all Self Service categories before pushing: {error}")
+
     @override
     def create_remote(self, config: ApiConfig) -> CustomScriptPayload:
         """Create custom script object in Kandji"""
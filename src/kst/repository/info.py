@@ -1,6 +1,8 @@
 import hashlib
+import io
 import json
 import plistlib
+import re
 from abc import ABC, abstractmethod
 from collections import OrderedDict
 from datetime import UTC, datetime
@@ -14,7 +16,9 @@ from ruamel.yaml import YAMLError
 
 from kst.api import ExecutionFrequency
 from kst.exceptions import InvalidInfoFileError
-from kst.utils import yaml
+from kst.utils import safe_yaml, yaml
+
+from .writer import RepositoryWriter
 
 INFO_FORMAT_HASH_KEYS = ("id", "name", "active")
 PROFILE_RUNS_ON_PARAMS = ("runs_on_mac", "runs_on_iphone", "runs_on_ipad", "runs_on_tv", "runs_on_vision")
@@ -30,6 +34,80 @@ SCRIPT_INFO_HASH_KEYS = (
 DEFAULT_SCRIPT_CATEGORY = "Utilities"
 
 
+# A top level key and its value on a single line
+_FLAT_YAML_LINE = re.compile(r"([A-Za-z_][A-Za-z0-9_]*):(?: +(.*))?")
+# Plain scalars which YAML would resolve to a number or a timestamp instead of a string
+_FLAT_YAML_NUMBER = re.compile(
+    r"[-+]?[0-9_.]*[0-9][0-9_.]*(?:[eE][-+]?[0-9]+)?|[-+]?0[box][0-9a-fA-F_]+|[-+]?\.(?:inf|Inf|INF|nan|NaN|NAN)"
+)
+_FLAT_YAML_TIMESTAMP = re.compile(r"[0-9]{4}-[0-9]{1,2}-[0-9]{1,2}")
+_FLAT_YAML_PLAIN = re.compile(r"[A-Za-z0-9_.()/][^:#'\"\\]*")
+_FLAT_YAML_CONSTANTS = {
+    "true": True,
+    "True": True,
+    "TRUE": True,
+    "false": False,
+    "False": False,
+    "FALSE": False,
+    "null": None,
+    "Null": None,
+    "NULL": None,
+    "~": None,
+}
+
+
+def _parse_flat_yaml_value(value: str) -> tuple[bool, Any]:
+    if value in _FLAT_YAML_CONSTANTS:
+        return True, _FLAT_YAML_CONSTANTS[value]
+    if value.isdigit() and (value == "0" or not value.startswith("0")):
+        return True, int(value)
+    if len(value) >= 2 and value[0] == value[-1] == "'":
+        inner = value[1:-1]
+        if "'" not in inner.replace("''", ""):
+            return True, inner.replace("''", "'")
+    elif len(value) >= 2 and value[0] == value[-1] == '"':
+        inner = value[1:-1]
+        if '"' not in inner and "\\" not in inner:
+            return True, inner
+    elif (
+        _FLAT_YAML_PLAIN.fullmatch(value)
+        and not _FLAT_YAML_NUMBER.fullmatch(value)
+        and not _FLAT_YAML_TIMESTAMP.match(value)
+    ):
+        return True, value
+    return False, None
+
+
+def parse_flat_yaml(text: str) -> dict[str, Any] | None:
+    """Parse a YAML document which is a flat mapping of simple scalars, like the info files kst writes.
+
+    This is much faster than a full YAML parser for the thousands of small info files in a large repository.
+    Only a strict subset of YAML is understood: one unindented key per line with a null, boolean, decimal
+    integer, quoted string or plain string value which cannot be mistaken for a number or timestamp.
+
+    Returns:
+        dict | None: The parsed mapping or None if the document uses anything outside of the subset, in
+            which case it must be parsed with a full YAML parser.
+
+    """
+    data: dict[str, Any] = {}
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        if "\t" in line or (match := _FLAT_YAML_LINE.fullmatch(line.rstrip(" "))) is None:
+            return None
+        key, value = match.groups()
+        if key in data:
+            return None
+        if not value:
+            data[key] = None
+            continue
+        parsed, data[key] = _parse_flat_yaml_value(value)
+        if not parsed:
+            return None
+    return data
+
+
 class InfoFormat(StrEnum):
     PLIST = "plist"
     JSON = "json"
@@ -79,6 +157,16 @@ class InfoFile(BaseModel, ABC):
                 raise ValueError("Invalid info file name. Expected format: {INFO_FORMAT}")
         return v
 
+    @classmethod
+    def from_payload_data(cls, data: dict[str, Any]) -> Self:
+        """Create an info file from the fields of an API payload which was already validated.
+
+        The payload models enforce the same field types as the info files, so only the normalization done by
+        the model validators is repeated instead of validating every field a second time. This is only for
+        payloads received from the API; info files loaded from disk are always validated.
+        """
+        return cls.model_construct(**data | {"id": data["id"].lower()})
+
     @classmethod
     def load(cls, path: Path) -> Self:
         match path.suffix:
@@ -100,8 +188,12 @@ class InfoFile(BaseModel, ABC):
                         ) from error
             case ".yml" | ".yaml":
                 try:
-                    info_data = yaml.load(path)
-                except YAMLError as error:
+                    text = path.read_text(encoding="utf-8")
+                    # Round-trip loading is only needed to preserve formatting when editing a file in place
+                    info_data = parse_flat_yaml(text)
+                    if info_data is None:
+                        info_data = safe_yaml.load(text)
+                except (YAMLError, UnicodeDecodeError) as error:
                     raise InvalidInfoFileError(f"Profile info at {path} is not a valid yaml file.\n{error}") from error
             case _:
                 raise InvalidInfoFileError(f"Profile info file at {path} does not have a valid suffix. ({INFO_FORMAT})")
@@ -113,7 +205,8 @@ class InfoFile(BaseModel, ABC):
         except ValidationError as error:
             raise InvalidInfoFileError(f"Profile info at {path} is not a valid info file.\n{error}") from error
 
-    def write(self) -> None:
+    def serialize(self) -> bytes:
+        """Return the bytes which are written to disk for the info file in the format of its path."""
         if self.path is None:
             raise ValueError("The info file has no path set.")
 
@@ -123,21 +216,33 @@ class InfoFile(BaseModel, ABC):
         # Exclude profile and info_path since they are unnecessary in the info file
         info_data = self.model_dump(mode="json", exclude_unset=True, exclude_none=True, exclude={"path", "content"})
 
-        # Create missing directories if they do not exist
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-
-        # Write info to file
-        if self.path.suffix == ".plist":
-            with self.path.open("wb") as file:
+        match self.path.suffix:
+            case ".plist":
                 # plistlib dump's indent type is not configurable. As a workaround, we dump to a string and use expandtabs.
-                plist_str = plistlib.dumps(info_data, sort_keys=False)
-                file.write(plist_str.expandtabs(4))
-        elif self.path.suffix == ".json":
-            with self.path.open("w") as file:
-                json.dump(info_data, file, indent=2)
-        elif self.path.suffix in (".yml", ".yaml"):
-            with self.path.open("w") as file:
-                yaml.dump(info_data, file)
+                return plistlib.dumps(info_data, sort_keys=False).expandtabs(4)
+            case ".json":
+                return json.dumps(info_data, indent=2).encode()
+            case ".yml" | ".yaml":
+                output = io.StringIO()
+                yaml.dump(info_data, output)
+                return output.getvalue().encode()
+            case _:
+                raise ValueError(f"The info file path does not have a valid suffix. ({INFO_FORMAT})")
+
+    def write(self, writer: RepositoryWriter | None = None) -> None:
+        """Write the info file to its path.
+
+        Args:
+            writer (RepositoryWriter | None): A writer to stage the file in. If not provided, the file is
+                written atomically right away.
+
+        """
+        if writer is None:
+            with RepositoryWriter() as writer:
+                self.write(writer=writer)
+            return
+
+        writer.write_bytes(self.path, self.serialize())
 
     @property
     @abstractmethod
@@ -173,6 +278,15 @@ class ProfileInfoFile(InfoFile):
             raise ValueError("At least one runs_on_* property must be True.")
         return self
 
+    @override
+    @classmethod
+    def from_payload_data(cls, data: dict[str, Any]) -> Self:
+        if not any(data.get(param) for param in PROFILE_RUNS_ON_PARAMS):
+            raise ValueError("At least one runs_on_* property must be True.")
+        if data.get("mdm_identifier", "") == "":
+            data["mdm_identifier"] = f"com.kandji.profile.custom.{data['id']}"
+        return super().from_payload_data(data)
+
     @property
     @override
     def diff_hash(self) -> str:
@@ -210,6 +324,13 @@ class ScriptInfoFile(InfoFile):
             values["self_service_recommended"] = values.get("self_service_recommended") or False
         return values
 
+    @override
+    @classmethod
+    def from_payload_data(cls, data: dict[str, Any]) -> Self:
+        data = cls.update_self_service_options(data)
+        data["execution_frequency"] = ExecutionFrequency(data["execution_frequency"])
+        return super().from_payload_data(data)
+
     @property
     @override
     def diff_hash(self) -> str:
@@ -0,0 +1,107 @@
+import functools
+import re
+import tomllib
+from enum import StrEnum
+from pathlib import Path
+
+from kst import git
+from kst.exceptions import InvalidRepositoryError
+
+# The file which marks the root of a kst repository and holds its settings
+MARKER_FILE = ".kst"
+
+# The number of leading ID characters which name the shard of a member in the sharded layout
+SHARD_PREFIX_LENGTH = 2
+
+# Shard directories are named after the leading characters of the lowercase UUIDs of their members
+_SHARD_NAME = re.compile(rf"[0-9a-f]{{{SHARD_PREFIX_LENGTH}}}")
+
+_LAYOUT_SETTING = re.compile(r"^\s*layout\s*=.*$\n?", re.MULTILINE)
+
+
+class RepositoryLayout(StrEnum):
+    """The ways member directories can be arranged within the profiles and scripts directories.
+
+    FLAT: Member directories are placed directly in the profiles or scripts directory.
+    SHARDED: Member directories are grouped in shard directories named after the first characters of their ID so
+        no directory holds more than a small fraction of a very large library.
+    """
+
+    FLAT = "flat"
+    SHARDED = "sharded"
+
+    def parent_for(self, members_root: Path, member_id: str) -> Path:
+        """Get the directory a member's directory belongs in under members_root."""
+        if self is RepositoryLayout.SHARDED:
+            return members_root / member_id[:SHARD_PREFIX_LENGTH].lower()
+        return members_root
+
+
+@functools.cache
+def read_layout(root: Path) -> RepositoryLayout:
+    """Read the layout of the repository at root from its .kst file.
+
+    The .kst file is a TOML document, which is empty for the default flat layout.
+
+    Raises:
+        InvalidRepositoryError: If the .kst file has an invalid layout setting.
+
+    """
+    try:
+        settings = tomllib.loads((root / MARKER_FILE).read_text())
+        return RepositoryLayout(settings.get("layout", RepositoryLayout.FLAT))
+    except FileNotFoundError:
+        return RepositoryLayout.FLAT
+    except (tomllib.TOMLDecodeError, ValueError) as error:
+        raise InvalidRepositoryError(
+            f"The {MARKER_FILE} file at {root} has an invalid layout. Expected one of: {', '.join(RepositoryLayout)}"
+        ) from error
+
+
+def write_layout(root: Path, layout: RepositoryLayout) -> None:
+    """Store layout in the .kst file of the repository at root, keeping any other settings."""
+    marker = root / MARKER_FILE
+    settings = _LAYOUT_SETTING.sub("", marker.read_text() if marker.exists() else "")
+    if layout is not RepositoryLayout.FLAT:
+        settings = f'layout = "{layout}"\n{settings}'
+    marker.write_text(settings)
+    read_layout.cache_clear()
+
+
+def member_parent(repo_path: Path, members_directory: str, member_id: str) -> Path:
+    """Choose the directory a new member directory is created in.
+
+    In the flat layout, new members are placed in repo_path when it is within the members directory of the
+    repository and in the members directory otherwise. In the sharded layout, new members are always placed in
+    the shard of their ID.
+
+    Raises:
+        InvalidRepositoryError: repo_path is not a valid Kandji Sync Toolkit repository.
+
+    """
+    repo_path = repo_path.resolve()
+    root = git.locate_root(cd_path=repo_path)
+    members_root = root / members_directory
+    layout = read_layout(root)
+    if layout is RepositoryLayout.FLAT:
+        return repo_path if repo_path.is_relative_to(members_root) else members_root
+    return layout.parent_for(members_root, member_id)
+
+
+def member_shard(repo_path: Path, members_directory: str, member_id: str) -> Path | None:
+    """Get the shard a member directory belongs in, or None when the repository does not use the sharded layout.
+
+    Raises:
+        InvalidRepositoryError: repo_path is not a valid Kandji Sync Toolkit repository.
+
+    """
+    root = git.locate_root(cd_path=repo_path.resolve())
+    layout = read_layout(root)
+    if layout is not RepositoryLayout.SHARDED:
+        return None
+    return layout.parent_for(root / members_directory, member_id)
+
+
+def is_shard(members_root: Path, directory: Path) -> bool:
+    """Check if directory is a shard of members_root, even if it no longer matches the IDs of its members."""
+    return directory.parent == members_root and _SHARD_NAME.fullmatch(directory.name) is not None
@@ -2,11 +2,14 @@ import hashlib
 import io
 import json
 import plistlib
+import re
+import threading
 from abc import ABC, abstractmethod
+from collections.abc import Iterable
 from pathlib import Path
 from typing import Self
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, PrivateAttr
 from rich.table import Table
 
 from kst.api import ApiConfig, ApiPayloadType, PayloadList
@@ -15,6 +18,57 @@ from kst.utils import yaml
 
 from .content import File
 from .info import InfoFile
+from .layout import member_shard
+from .writer import RepositoryWriter
+
+# The suffix added to a new member directory when its name is already taken
+DUPLICATE_SUFFIX = re.compile(r" \(\d+\)$")
+
+
+class MemberDirectoryIndex:
+    """An index of the member directory names allocated during a repository operation.
+
+    New member directories are named after the member, with a numbered suffix when the name is already taken.
+    The index remembers the names it has handed out and the next suffix to try for each name, so allocating
+    thousands of directories with the same name only checks the file system for the candidates which were not
+    already allocated. Directories may be allocated from several threads at once.
+
+    Methods:
+        allocate: Reserve a unique directory for a member
+        release: Make the name of a removed directory available again
+
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._allocated: set[tuple[Path, str]] = set()
+        self._next_suffix: dict[tuple[Path, str], int] = {}
+
+    def allocate(self, parent: Path, name: str) -> Path:
+        """Reserve a directory in parent named name, adding a numbered suffix if it is taken.
+
+        Returns:
+            Path: A directory which did not exist and was not allocated before
+
+        """
+        key = (parent, name.casefold())
+        with self._lock:
+            count = self._next_suffix.get(key, 0)
+            while True:
+                directory = parent / (name if count == 0 else f"{name} ({count})")
+                if (parent, directory.name.casefold()) not in self._allocated and not directory.exists():
+                    break
+                count += 1
+            self._allocated.add((parent, directory.name.casefold()))
+            self._next_suffix[key] = count + 1
+        return directory
+
+    def release(self, directory: Path) -> None:
+        """Make the name of a removed directory available to the next allocation."""
+        name = directory.name.casefold()
+        with self._lock:
+            self._allocated.discard((directory.parent, name))
+            self._next_suffix.pop((directory.parent, DUPLICATE_SUFFIX.sub("", name)), None)
 
 
 class MemberBase[InfoType: InfoFile](BaseModel, ABC):
@@ -24,6 +78,9 @@ class MemberBase[InfoType: InfoFile](BaseModel, ABC):
 
     info: InfoType
 
+    # The files left behind by a move, which are removed when the member is next written
+    _moved_paths: tuple[Path, ...] = PrivateAttr(default=())
+
     @property
     def id(self) -> str:
         """Get the unique identifier."""
@@ -99,15 +156,57 @@ class MemberBase[InfoType: InfoFile](BaseModel, ABC):
         return all(child.path is not None for child in self.children)
 
     @abstractmethod
-    def ensure_paths(self, repo_path: Path) -> None:
-        """Set the path properties to valid default paths within the repository."""
+    def ensure_paths(self, repo_path: Path, directory_index: MemberDirectoryIndex | None = None) -> None:
+        """Set the path properties to valid default paths within the repository.
+
+        If a directory index is provided, the new member directory is allocated from it so members can be
+        placed in the repository from several threads at once.
+        """
+
+    def move_directory(self, directory: Path) -> None:
+        """Move the files of the member into directory.
+
+        The files at the old paths are removed the next time the member is written, along with the old member
+        directory and its parent if no other files are left in them.
+        """
+        moved_paths = []
+        for child in self.children:
+            if child.path is not None:
+                moved_paths.append(child.path)
+                child.path = directory / child.path.name
+        self._moved_paths += tuple(moved_paths)
+
+    def _ensure_shard(
+        self, repo_path: Path, members_directory: str, name: str, directory_index: MemberDirectoryIndex | None
+    ) -> None:
+        """Move the member to the shard of its ID if the ID changed after it was placed in a sharded repository.
+
+        The ID of a new member changes when it is created in Kandji, and the member is then named after name in
+        its new shard.
+        """
+        shard = member_shard(repo_path, members_directory, self.id)
+        if shard is not None and self.info_path.parent.parent.resolve() != shard:
+            self.move_directory((directory_index or MemberDirectoryIndex()).allocate(shard, name))
+
+    def _stage_moved_paths(self, writer: RepositoryWriter) -> None:
+        """Stage the removal of the files and directories left behind by move_directory."""
+        for path in self._moved_paths:
+            writer.unlink(path)
+            writer.rmdir(path.parent)
+            writer.rmdir(path.parent.parent)
+        self._moved_paths = ()
 
     @abstractmethod
     def write(
         self,
         write_content=True,
+        writer: RepositoryWriter | None = None,
     ) -> None:
-        """Save the instance to the file system at the path locations."""
+        """Save the instance to the file system at the path locations.
+
+        If a writer is provided, the files are staged in it and written when it is committed. Otherwise, the
+        files are written atomically right away.
+        """
 
     @classmethod
     @abstractmethod
@@ -145,6 +244,10 @@ class MemberBase[InfoType: InfoFile](BaseModel, ABC):
     def get_remote(self, config: ApiConfig) -> ApiPayloadType:
         """Get object from Kandji"""
 
+    @classmethod
+    def prepare_remote(cls, config: ApiConfig, members: Iterable[Self]) -> None:
+        """Fetch anything members need from Kandji before they are created or updated as a batch."""
+
     @abstractmethod
     def create_remote(self, config: ApiConfig) -> ApiPayloadType:
         """Create object in Kandji"""
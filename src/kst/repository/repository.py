@@ -1,7 +1,9 @@
+import os
+import threading
 from collections.abc import Iterable, Iterator, MutableMapping
 from enum import StrEnum
 from pathlib import Path
-from typing import Self, override
+from typing import ClassVar, Self, override
 from uuid import UUID
 
 from kst import git
@@ -12,7 +14,7 @@ from .custom_profile import CustomProfile
 from .custom_script import DIRECTORY_NAME as SCRIPT_DIRECTORY_NAME
 from .custom_script import CustomScript
 from .info import ACCEPTED_INFO_EXTENSIONS
-from .member_base import MemberBase
+from .member_base import MemberBase, MemberDirectoryIndex
 
 
 class RepositoryDirectory(StrEnum):
@@ -30,6 +32,57 @@ class RepositoryDirectory(StrEnum):
         }[model]
 
 
+class MemberCache:
+    """An in-memory cache of members loaded from a repository.
+
+    A cached member is reused while none of the files in its directory have changed, which is detected
+    using the size, modification time and inode of each file. Copies of the cached members are returned so
+    that changes made by one command never leak into the next.
+
+    Methods:
+        load: Load a member from its info file, reusing a cached copy if its files are unchanged
+        clear: Remove all cached members
+
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._entries: dict[tuple[type[MemberBase], Path], tuple[tuple, MemberBase]] = {}
+
+    @staticmethod
+    def _signature(directory: Path) -> tuple:
+        signature = []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                stat = entry.stat()
+                signature.append((entry.name, stat.st_size, stat.st_mtime_ns, stat.st_ino))
+        return tuple(sorted(signature))
+
+    def load[MemberType: MemberBase](self, model: type[MemberType], info_path: Path) -> MemberType:
+        """Load a member of type model from info_path.
+
+        Returns:
+            MemberType: A member which is never shared with another caller
+
+        """
+        directory = info_path.parent.resolve()
+        key = (model, directory)
+        with self._lock:
+            cached = self._entries.get(key)
+        if cached is not None and cached[0] == self._signature(directory):
+            return cached[1].model_copy(deep=True)  # type: ignore[return-value]
+
+        member = model.from_path(info_path)
+        with self._lock:
+            # Loading may generate missing files so the signature is taken afterwards
+            self._entries[key] = (self._signature(directory), member.model_copy(deep=True))
+        return member
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
 class Repository[MemberType: MemberBase](MutableMapping[str, MemberType]):
     """A mutable mapping of ID to RepositoryMember objects.
 
@@ -38,15 +91,25 @@ class Repository[MemberType: MemberBase](MutableMapping[str, MemberType]):
 
     In addition to the standard constructor, a Repository objects can be loaded from a directory.
 
+    Attributes:
+        member_cache (MemberCache | None): When set, load_path reuses members which are unchanged on disk
+            since they were last loaded. This is used by long running processes like the kst daemon.
+        directory_index (MemberDirectoryIndex): The directories allocated to new members of the repository
+
     Methods:
         load_path: Load scripts from a directory of mobileconfig files.
     """
 
+    member_cache: ClassVar[MemberCache | None] = None
+
     def __init__(self, members: Iterable[MemberType] = iter(()), root: Path | None = None) -> None:
         """Initialize the Repository object."""
         self._id_dict: dict[str, MemberType] = {}
         self._path_dict: dict[Path, str] = {}
         self._member_type: type[MemberType] | None = None
+        # Members may be added and removed from several threads during a sync
+        self._lock = threading.RLock()
+        self.directory_index = MemberDirectoryIndex()
         for member in members:
             self.__setitem__(member.id, member)
         self._root_path = root
@@ -78,19 +141,22 @@ class Repository[MemberType: MemberBase](MutableMapping[str, MemberType]):
     def __setitem__(self, key: str, value: MemberType) -> None:
         if key != value.id:
             raise ValueError("Key must match member ID")
-        if self._member_type is None:
-            self._member_type = type(value)
-        self._id_dict[key] = value
-        if value.has_paths:
-            self._path_dict[value.info_path.resolve().parent] = value.id
+        path = value.info_path.resolve().parent if value.has_paths else None
+        with self._lock:
+            if self._member_type is None:
+                self._member_type = type(value)
+            self._id_dict[key] = value
+            if path is not None:
+                self._path_dict[path] = value.id
 
     @override
     def __delitem__(self, key: str) -> None:
-        if key in self._id_dict:
-            del self._id_dict[key]
-            self._path_dict = {k: v for k, v in self._path_dict.items() if v != key}
-        else:
-            raise KeyError(f"Repository member with ID={key} was not found")
+        with self._lock:
+            if key in self._id_dict:
+                del self._id_dict[key]
+                self._path_dict = {k: v for k, v in self._path_dict.items() if v != key}
+            else:
+                raise KeyError(f"Repository member with ID={key} was not found")
 
     @override
     def __contains__(self, key: object) -> bool:
@@ -119,7 +185,10 @@ class Repository[MemberType: MemberBase](MutableMapping[str, MemberType]):
         members: list[MemberType] = []
         ids: set[str] = set()
         for member_path in (p for p in path.glob("**/info.*") if p.suffix in ACCEPTED_INFO_EXTENSIONS):
-            member = model.from_path(member_path)
+            if cls.member_cache is not None:
+                member = cls.member_cache.load(model, member_path)
+            else:
+                member = model.from_path(member_path)
             if member.id in ids:
                 # Two scripts in the same repository cannot have the same ID
                 raise InvalidRepositoryError(f"Duplicate member ID ({member.id}) found at {member_path.parent}")
@@ -0,0 +1,220 @@
+import contextlib
+import logging
+import os
+import threading
+from pathlib import Path
+from types import TracebackType
+from typing import Self
+from uuid import uuid4
+
+from kst.console import OutputConsole
+from kst.tracing import tracer
+from kst.utils import map_file
+
+console = OutputConsole(logging.getLogger(__name__))
+
+FSYNC_ENV_VAR = "KST_FSYNC"
+
+
+def _fsync_default() -> bool:
+    return os.environ.get(FSYNC_ENV_VAR, "").lower() not in ("", "0", "false", "no")
+
+
+class RepositoryWriter:
+    """Stage file writes for a repository operation and atomically move them into place.
+
+    Each staged file is written to a hidden temporary file next to its destination as soon as it is
+    staged. When the writer is committed, every staged file is renamed over its destination so a file
+    is never left partially written, even if the process is interrupted before the changes are committed
+    to git. Directories are created once per operation instead of once per file. Files which already contain
+    identical bytes on disk are not rewritten so their modification times are preserved.
+
+    A writer may be committed any number of times. Operations commit it after each action so the local
+    changes of every completed action are on disk even if the operation is interrupted before it ends. When
+    used as a context manager, the writer is committed again when the context exits.
+
+    Committing a writer moves everything staged in it, so a writer must not be shared by actions which run at
+    the same time. Each concurrent action stages its files in its own batch instead, which shares the created
+    directories and the unchanged count of its writer but only commits the files staged in it.
+
+    When fsync is enabled, each staged file is flushed to disk before it is renamed and every affected
+    directory is synced once after the renames of each commit have completed.
+
+    Attributes:
+        fsync (bool): Whether to flush files and directories to disk on commit. Defaults to the value of
+            the KST_FSYNC environment variable.
+        unchanged (int): The number of writes skipped because the file on disk was already identical
+
+    Methods:
+        batch: Create a writer for the files of a single action
+        write_bytes: Stage bytes to be written to a path
+        unlink: Stage the removal of a path
+        rmdir: Stage the removal of a directory if it is left empty
+        commit: Move all staged files into place and remove all staged deletions
+        rollback: Discard all staged changes
+
+    """
+
+    def __init__(self, fsync: bool | None = None) -> None:
+        self.fsync = _fsync_default() if fsync is None else fsync
+        self._staged: dict[Path, Path] = {}
+        self._unlinks: set[Path] = set()
+        self._rmdirs: set[Path] = set()
+        self._directories: set[Path] = set()
+        self.unchanged = 0
+        self._lock = threading.Lock()
+        self._parent: RepositoryWriter | None = None
+
+    def batch(self) -> "RepositoryWriter":
+        """Create a writer whose commit only moves the files staged in it.
+
+        Returns:
+            RepositoryWriter: A writer sharing the directories created by this writer and its unchanged count
+
+        """
+        batch = RepositoryWriter(fsync=self.fsync)
+        batch._directories = self._directories
+        batch._lock = self._lock
+        batch._parent = self
+        return batch
+
+    def __enter__(self) -> Self:
+        return self
+
+    def __exit__(
+        self, exc_type: type[BaseException] | None, exc_value: BaseException | None, traceback: TracebackType | None
+    ) -> None:
+        # Staged files are always complete, so they are committed even if the operation was interrupted. This
+        # keeps the repository in line with any remote changes which were made before the interruption.
+        self.commit()
+
+    def _ensure_directory(self, directory: Path) -> None:
+        if directory not in self._directories:
+            directory.mkdir(parents=True, exist_ok=True)
+            with self._lock:
+                self._directories.add(directory)
+
+    @tracer.span("repository.write")
+    def write_bytes(self, path: Path, data: bytes, executable: bool = False) -> None:
+        """Stage bytes to be written to path when the writer is committed.
+
+        Args:
+            path (Path): The destination path
+            data (bytes): The complete file content
+            executable (bool): Whether the file should be made executable
+
+        """
+        # A path staged more than once in a single operation is replaced by the latest data
+        with self._lock:
+            previous = self._staged.pop(path, None)
+            self._unlinks.discard(path)
+        if previous is not None:
+            previous.unlink(missing_ok=True)
+
+        try:
+            existing = path.stat()
+        except OSError:
+            existing = None
+        existing_mode = existing.st_mode if existing is not None else None
+
+        if existing is not None and existing.st_size == len(data) and self._has_content(path, data):
+            if executable and existing_mode & 0o111 != 0o111:
+                path.chmod(existing_mode | 0o111)
+            with self._lock:
+                (self._parent or self).unchanged += 1
+            return
+
+        self._ensure_directory(path.parent)
+
+        temp_path = path.with_name(f".{path.name}.{uuid4().hex[:8]}.tmp")
+        flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, "O_BINARY", 0)
+        try:
+            fd = os.open(temp_path, flags, 0o666)
+        except FileNotFoundError:
+            # The directory was removed after it was first created during this operation
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd = os.open(temp_path, flags, 0o666)
+        with open(fd, "wb") as file:
+            file.write(data)
+            if self.fsync:
+                file.flush()
+                os.fsync(fd)
+
+        # Keep the permissions of an existing file to match overwriting it in place
+        mode = existing_mode
+        if mode is None and executable:
+            mode = temp_path.stat().st_mode
+        if executable:
+            mode |= 0o111
+        if mode is not None:
+            temp_path.chmod(mode)
+
+        with self._lock:
+            self._staged[path] = temp_path
+
+    @staticmethod
+    def _has_content(path: Path, data: bytes) -> bool:
+        """Check if the file at path already contains exactly data."""
+        try:
+            if path.stat().st_size != len(data):
+                return False
+            with map_file(path) as existing, memoryview(existing) as view:
+                return view == data
+        except OSError:
+            return False
+
+    def unlink(self, path: Path) -> None:
+        """Stage the removal of path when the writer is committed."""
+        with self._lock:
+            previous = self._staged.pop(path, None)
+            self._unlinks.add(path)
+        if previous is not None:
+            previous.unlink(missing_ok=True)
+
+    def rmdir(self, directory: Path) -> None:
+        """Stage the removal of directory when the writer is committed, if no files are left in it."""
+        with self._lock:
+            self._rmdirs.add(directory)
+
+    @tracer.span("repository.commit")
+    def commit(self) -> None:
+        """Move all staged files into place and remove all staged deletions."""
+        with self._lock:
+            staged, self._staged = self._staged, {}
+            unlinks, self._unlinks = self._unlinks, set()
+            rmdirs, self._rmdirs = self._rmdirs, set()
+
+        directories = set()
+        for path, temp_path in staged.items():
+            temp_path.replace(path)
+            directories.add(path.parent)
+        for path in unlinks:
+            path.unlink(missing_ok=True)
+            directories.add(path.parent)
+        # Nested directories are removed before the directories which contain them
+        for directory in sorted(rmdirs, key=lambda path: len(path.parts), reverse=True):
+            with contextlib.suppress(OSError):
+                directory.rmdir()
+                with self._lock:
+                    self._directories.discard(directory)
+                directories.discard(directory)
+                directories.add(directory.parent)
+
+        if self.fsync and hasattr(os, "O_DIRECTORY"):
+            for directory in directories:
+                fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+                try:
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+
+        console.debug(f"Committed {len(staged)} staged file(s) and {len(unlinks)} removal(s) to disk.")
+
+    def rollback(self) -> None:
+        """Discard all staged changes and remove any temporary files."""
+        with self._lock:
+            staged, self._staged = self._staged, {}
+            self._unlinks = set()
+            self._rmdirs = set()
+        for temp_path in staged.values():
+            temp_path.unlink(missing_ok=True)
@@ -3,17 +3,27 @@
 import json
 import logging
 import os
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
+from uuid import uuid4
 
 import platformdirs
-import typer
 
 from kst.__about__ import APP_NAME
-from kst.api import ApiConfig
 from kst.console import OutputConsole
 
+try:
+    import fcntl
+except ImportError:  # Windows has no advisory locks, so writes only rely on the atomic replace
+    fcntl = None
+
+if TYPE_CHECKING:
+    from kst.api import ApiConfig
+
 console = OutputConsole(logging.getLogger(__name__))
 
 
@@ -26,145 +36,217 @@ class TenantConfig:
     repo_path: str
 
     @property
-    def api_config(self) -> ApiConfig:
+    def api_config(self) -> 'ApiConfig':
         """Convert to ApiConfig for use with API client"""
+        from kst.api import ApiConfig
+
         return ApiConfig(tenant_url=self.tenant_url, api_token=self.api_token)
 
 
 class TenantManager:
-    """Manages multiple Kandji tenant configurations"""
+    """Manages multiple Kandji tenant configurations
 
-    def __init__(self):
-        self.config_dir = platformdirs.user_config_path(appname=APP_NAME)
-        self.config_file = self.config_dir / 'tenants.json'
-        self.config_dir.mkdir(parents=True, exist_ok=True)
+    The configuration file is shared by every kst process, so it is never written in place. Changes are made
+    while holding an exclusive advisory lock on a sidecar lock file: the file is read again, changed and
+    atomically replaced, so concurrent processes neither see a partially written file nor lose each
+    other's changes. Reads need no lock since the file is always complete.
+
+    The whole file is parsed when a tenant is first needed and parsed again only after it changes on disk.
+    Tenants are not stored separately, so reading one tenant parses every tenant in the file; only building
+    the TenantConfig of each tenant is deferred until it is requested.
+    """
+
+    def __init__(self, config_dir: Path | None = None):
+        self.config_dir = platformdirs.user_config_path(appname=APP_NAME) if config_dir is None else config_dir
+        self.config_file = self.config_dir / "tenants.json"
+        self.lock_file = self.config_dir / "tenants.json.lock"
+        self._lock = threading.RLock()
+        self._raw_tenants: dict[str, dict] = {}
         self._tenants: Dict[str, TenantConfig] = {}
         self._active_tenant: Optional[str] = None
-        self._load_config()
+        self._loaded = False
+        self._signature: tuple | None = None
+
+    def _file_signature(self) -> tuple | None:
+        """Identify the current version of the configuration file"""
+        try:
+            stat = self.config_file.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
 
     def _load_config(self):
-        """Load tenant configuration from file"""
-        if not self.config_file.exists():
+        """Parse the whole tenant configuration file if it changed since it was last parsed"""
+        signature = self._file_signature()
+        with self._lock:
+            if self._loaded and signature == self._signature:
+                return
+
+            self._raw_tenants = {}
             self._tenants = {}
             self._active_tenant = None
+            self._loaded = True
+            self._signature = signature
+            if signature is None:
+                return
+
+            try:
+                with self.config_file.open("r") as f:
+                    data = json.load(f)
+                tenants = data.get("tenants", {})
+                if not isinstance(tenants, dict):
+                    raise TypeError("tenants must be an object")
+            except (OSError, json.JSONDecodeError, AttributeError, TypeError) as e:
+                console.print_error(f"Error loading tenant configuration: {e}")
+                return
+            self._raw_tenants = {name: cfg for name, cfg in tenants.items() if isinstance(cfg, dict)}
+            self._active_tenant = data.get("active_tenant")
+
+    def _tenant(self, name: str) -> TenantConfig | None:
+        """Build the configuration of a tenant the first time it is requested"""
+        self._load_config()
+        with self._lock:
+            if (tenant := self._tenants.get(name)) is not None:
+                return tenant
+            if (cfg := self._raw_tenants.get(name)) is None:
+                return None
+            try:
+                tenant = TenantConfig(
+                    name=name,
+                    tenant_url=cfg["tenant_url"],
+                    api_token=cfg["api_token"],
+                    repo_path=cfg["repo_path"],
+                )
+            except KeyError as e:
+                console.print_error(f"Error loading tenant configuration for '{name}': missing {e}")
+                return None
+            self._tenants[name] = tenant
+            return tenant
+
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        """Hold an exclusive advisory lock on the configuration file shared by every kst process"""
+        self.config_dir.mkdir(parents=True, exist_ok=True)
+        if fcntl is None:
+            yield
             return
+        with self.lock_file.open("a") as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
 
-        try:
-            with self.config_file.open('r') as f:
-                data = json.load(f)
-                self._tenants = {
-                    name: TenantConfig(
-                        name=name,
-                        tenant_url=cfg['tenant_url'],
-                        api_token=cfg['api_token'],
-                        repo_path=cfg['repo_path'],
-                    )
-                    for name, cfg in data.get('tenants', {}).items()
-                }
-                self._active_tenant = data.get('active_tenant')
-        except (json.JSONDecodeError, KeyError) as e:
-            console.print_error(f"Error loading tenant configuration: {e}")
-            self._tenants = {}
-            self._active_tenant = None
+    @contextmanager
+    def _updating(self) -> Iterator[None]:
+        """Change the latest configuration on disk and save it, without another process writing in between"""
+        with self._lock, self._file_lock():
+            self._loaded = False
+            self._load_config()
+            yield
+            self._save_config()
 
     def _save_config(self):
-        """Save tenant configuration to file"""
+        """Atomically replace the configuration file"""
         data = {
-            'active_tenant': self._active_tenant,
-            'tenants': {
-                name: {
-                    'tenant_url': t.tenant_url,
-                    'api_token': t.api_token,
-                    'repo_path': t.repo_path,
-                }
-                for name, t in self._tenants.items()
-            }
+            "active_tenant": self._active_tenant,
+            "tenants": self._raw_tenants,
         }
-        
-        with self.config_file.open('w') as f:
-            json.dump(data, f, indent=2)
+
+        # The file holds API tokens, so it is only readable by its owner
+        temp_path = self.config_file.with_name(f".{self.config_file.name}.{uuid4().hex[:8]}.tmp")
+        try:
+            with os.fdopen(os.open(temp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600), "w") as f:
+                json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.config_file)
+        except BaseException:
+            temp_path.unlink(missing_ok=True)
+            raise
+        self._signature = self._file_signature()
 
     def add_tenant(self, name: str, tenant_url: str, api_token: str, repo_path: str) -> TenantConfig:
         """Add a new tenant configuration"""
-        if name in self._tenants:
-            raise ValueError(f"Tenant '{name}' already exists")
-        
         # Ensure the repository path is absolute
         repo_path = Path(repo_path).expanduser().resolve().as_posix()
-        
-        # Create tenant configuration
-        tenant = TenantConfig(
-            name=name,
-            tenant_url=tenant_url,
-            api_token=api_token,
-            repo_path=repo_path
-        )
-        
-        self._tenants[name] = tenant
-        
-        # Set as active tenant if none is set
-        if self._active_tenant is None:
-            self._active_tenant = name
-            
-        self._save_config()
-        return tenant
 
-    def update_tenant(self, name: str, tenant_url: Optional[str] = None, 
-                     api_token: Optional[str] = None, repo_path: Optional[str] = None) -> TenantConfig:
+        with self._updating():
+            if name in self._raw_tenants:
+                raise ValueError(f"Tenant '{name}' already exists")
+
+            self._raw_tenants[name] = {
+                "tenant_url": tenant_url,
+                "api_token": api_token,
+                "repo_path": repo_path,
+            }
+
+            # Set as active tenant if none is set
+            if self._active_tenant is None:
+                self._active_tenant = name
+
+        return self._tenant(name)
+
+    def update_tenant(
+        self, name: str, tenant_url: str | None = None, api_token: str | None = None, repo_path: str | None = None
+    ) -> TenantConfig:
         """Update an existing tenant configuration"""
-        if name not in self._tenants:
-            raise ValueError(f"Tenant '{name}' does not exist")
-            
-        tenant = self._tenants[name]
-        
-        if tenant_url is not None:
-            tenant.tenant_url = tenant_url
-            
-        if api_token is not None:
-            tenant.api_token = api_token
-            
-        if repo_path is not None:
-            # Ensure the repository path is absolute
-            tenant.repo_path = Path(repo_path).expanduser().resolve().as_posix()
-            
-        self._save_config()
-        return tenant
+        with self._updating():
+            if name not in self._raw_tenants:
+                raise ValueError(f"Tenant '{name}' does not exist")
+
+            cfg = self._raw_tenants[name]
+
+            if tenant_url is not None:
+                cfg["tenant_url"] = tenant_url
+
+            if api_token is not None:
+                cfg["api_token"] = api_token
+
+            if repo_path is not None:
+                # Ensure the repository path is absolute
+                cfg["repo_path"] = Path(repo_path).expanduser().resolve().as_posix()
+
+        return self._tenant(name)
 
     def remove_tenant(self, name: str) -> None:
         """Remove a tenant configuration"""
-        if name not in self._tenants:
-            raise ValueError(f"Tenant '{name}' does not exist")
-            
-        del self._tenants[name]
-        
-        # If the active tenant was removed, set to None or another tenant
-        if self._active_tenant == name:
-            self._active_tenant = next(iter(self._tenants.keys())) if self._tenants else None
-            
-        self._save_config()
+        with self._updating():
+            if name not in self._raw_tenants:
+                raise ValueError(f"Tenant '{name}' does not exist")
+
+            del self._raw_tenants[name]
+
+            # If the active tenant was removed, set to None or another tenant
+            if self._active_tenant == name:
+                self._active_tenant = next(iter(self._raw_tenants.keys())) if self._raw_tenants else None
 
     def switch_tenant(self, name: str) -> TenantConfig:
         """Switch to a different tenant"""
-        if name not in self._tenants:
-            raise ValueError(f"Tenant '{name}' does not exist")
-            
-        self._active_tenant = name
-        self._save_config()
-        return self._tenants[name]
+        with self._updating():
+            if name not in self._raw_tenants:
+                raise ValueError(f"Tenant '{name}' does not exist")
+
+            self._active_tenant = name
+
+        return self._tenant(name)
 
     def get_tenant(self, name: str) -> Optional[TenantConfig]:
         """Get a tenant configuration by name"""
-        return self._tenants.get(name)
+        return self._tenant(name)
 
     def get_active_tenant(self) -> Optional[TenantConfig]:
         """Get the active tenant configuration"""
+        self._load_config()
         if not self._active_tenant:
             return None
-        return self._tenants.get(self._active_tenant)
+        return self._tenant(self._active_tenant)
 
     def list_tenants(self) -> List[TenantConfig]:
         """List all tenant configurations"""
-        return list(self._tenants.values())
+        self._load_config()
+        tenants = (self._tenant(name) for name in list(self._raw_tenants))
+        return [tenant for tenant in tenants if tenant is not None]
 
     def set_environment_for_active_tenant(self) -> bool:
         """Set environment variables for the active tenant"""
@@ -186,10 +268,12 @@ class TenantManager:
 
 # Singleton instance of the tenant manager
 _tenant_manager = None
+_tenant_manager_lock = threading.Lock()
 
 def get_tenant_manager() -> TenantManager:
     """Get the singleton tenant manager instance"""
     global _tenant_manager
-    if _tenant_manager is None:
-        _tenant_manager = TenantManager()
-    return _tenant_manager
\ No newline at end of file
+    with _tenant_manager_lock:
+        if _tenant_manager is None:
+            _tenant_manager = TenantManager()
+    return _tenant_manager
@@ -0,0 +1,178 @@
+import contextlib
+import json
+import os
+import threading
+import time
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+
+TRACE_PROCESS_NAME = "kst"
+
+
+@dataclass(frozen=True, slots=True)
+class Span:
+    """A single timed phase of a kst command.
+
+    Attributes:
+        name (str): The name of the phase (e.g. "api.request" or "git.commit")
+        start (float): Seconds between the start of the tracer and the start of the span
+        duration (float): The duration of the span in seconds
+        thread_id (int): The native ID of the thread which recorded the span
+        attributes (dict): Additional details about the span
+
+    """
+
+    name: str
+    start: float
+    duration: float
+    thread_id: int
+    attributes: dict = field(default_factory=dict)
+
+
+class Tracer:
+    """A lightweight collector of timing spans.
+
+    Spans are recorded with time.perf_counter and kept in memory until the tracer is reset. The
+    tracer is thread safe so spans may be recorded from worker threads.
+
+    Attributes:
+        spans (list[Span]): A copy of all recorded spans in the order they completed
+
+    Methods:
+        span: Time a block of code or a function call
+        annotate: Attach details to the innermost open span of the current thread
+        reset: Discard all recorded spans and restart the clock
+        summary: Aggregate the recorded spans by name
+        chrome_trace: Format the recorded spans as a Chrome trace
+        write_chrome_trace: Write the Chrome trace to a file
+
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._spans: list[Span] = []
+        self._origin = time.perf_counter()
+        self._local = threading.local()
+
+    def _open_spans(self) -> list[dict]:
+        """The attributes of the spans open in the current thread, innermost last."""
+        if (open_spans := getattr(self._local, "open_spans", None)) is None:
+            open_spans = self._local.open_spans = []
+        return open_spans
+
+    @property
+    def spans(self) -> list[Span]:
+        with self._lock:
+            return list(self._spans)
+
+    @contextlib.contextmanager
+    def span(self, name: str, **attributes) -> Iterator[dict]:
+        """Time the enclosed block and record it as a span.
+
+        The span is recorded even if the block raises. The yielded attributes dictionary may be updated
+        inside the block to attach details which are only known after the work is done. The returned
+        object can also be used as a decorator to time every call of a function.
+
+        Args:
+            name (str): The name of the phase being timed
+            **attributes: Additional details to store with the span
+
+        Yields:
+            dict: The attributes which will be stored with the span
+
+        """
+        open_spans = self._open_spans()
+        open_spans.append(attributes)
+        start = time.perf_counter()
+        try:
+            yield attributes
+        finally:
+            end = time.perf_counter()
+            open_spans.pop()
+            span = Span(
+                name=name,
+                start=start - self._origin,
+                duration=end - start,
+                thread_id=threading.get_native_id(),
+                attributes=attributes,
+            )
+            with self._lock:
+                self._spans.append(span)
+
+    def annotate(self, **attributes) -> None:
+        """Attach details to the innermost span open in the current thread.
+
+        This is how a function timed with the span decorator records details which are only known inside it.
+        Nothing is recorded when no span is open.
+        """
+        if open_spans := self._open_spans():
+            open_spans[-1].update(attributes)
+
+    def reset(self) -> None:
+        """Discard all recorded spans and restart the clock."""
+        with self._lock:
+            self._spans.clear()
+            self._origin = time.perf_counter()
+
+    def summary(self) -> dict:
+        """Aggregate the recorded spans by name.
+
+        Returns:
+            dict: The elapsed time since the tracer started and the number of spans and total seconds for
+                each phase, ordered by the first time each phase started.
+
+        """
+        phases: dict[str, dict] = {}
+        for span in sorted(self.spans, key=lambda span: span.start):
+            phase = phases.setdefault(span.name, {"count": 0, "duration": 0.0})
+            phase["count"] += 1
+            phase["duration"] += span.duration
+        for phase in phases.values():
+            phase["duration"] = round(phase["duration"], 6)
+        return {
+            "elapsed": round(time.perf_counter() - self._origin, 6),
+            "phases": phases,
+        }
+
+    def chrome_trace(self) -> dict:
+        """Format the recorded spans as a Chrome trace.
+
+        The result can be loaded in chrome://tracing or https://ui.perfetto.dev.
+
+        Returns:
+            dict: A trace in the Chrome Trace Event Format using complete ("X") events
+
+        """
+        pid = os.getpid()
+        events: list[dict] = [
+            {"name": "process_name", "ph": "M", "pid": pid, "tid": 0, "args": {"name": TRACE_PROCESS_NAME}}
+        ]
+        events.extend(
+            {
+                "name": span.name,
+                "cat": span.name.split(".", 1)[0],
+                "ph": "X",
+                "ts": round(span.start * 1_000_000, 3),
+                "dur": round(span.duration * 1_000_000, 3),
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": span.attributes,
+            }
+            for span in sorted(self.spans, key=lambda span: span.start)
+        )
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: Path) -> None:
+        """Write the recorded spans as a Chrome trace to path.
+
+        Args:
+            path (Path): The file to write the trace to
+
+        """
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("w") as file:
+            json.dump(self.chrome_trace(), file, default=str)
+
+
+tracer = Tracer()
@@ -1,12 +1,61 @@
+import contextlib
+import mmap
 import os
 import re
 import unicodedata
+from collections.abc import Iterator
 from pathlib import Path
+from typing import TYPE_CHECKING
 
-from ruamel.yaml import YAML
+if TYPE_CHECKING:
+    from ruamel.yaml import YAML
 
-yaml = YAML()
-yaml.indent(mapping=2, sequence=4, offset=2)
+
+def __getattr__(name: str) -> "YAML":
+    # The shared YAML instances are created on first use since ruamel.yaml is slow to import
+    if name == "yaml":
+        global yaml  # noqa: PLW0603
+        from ruamel.yaml import YAML
+
+        yaml = YAML()
+        yaml.indent(mapping=2, sequence=4, offset=2)
+        return yaml
+    if name == "safe_yaml":
+        # Loads plain Python objects without the round-trip bookkeeping and uses the C loader when
+        # ruamel.yaml.clib is installed
+        global safe_yaml  # noqa: PLW0603
+        from ruamel.yaml import YAML
+
+        safe_yaml = YAML(typ="safe")
+        return safe_yaml
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Files smaller than this are read into memory since mapping them costs more than copying them
+MMAP_THRESHOLD = 256 * 1024
+
+
+@contextlib.contextmanager
+def map_file(path: Path) -> Iterator[bytes | mmap.mmap]:
+    """Open a file as a read-only buffer without copying large files into memory.
+
+    Files of at least MMAP_THRESHOLD bytes are memory mapped. The buffer must not be used or referenced
+    after the context exits.
+
+    Args:
+        path (Path): The file to open
+
+    Yields:
+        bytes | mmap.mmap: The contents of the file
+
+    """
+    with path.open("rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size == 0 or size < MMAP_THRESHOLD:
+            yield file.read()
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
 
 
 def sanitize_filename(value: str) -> str:
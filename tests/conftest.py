@@ -1,4 +1,5 @@
 import contextlib
+import functools
 import getpass
 import json
 import os
@@ -14,6 +15,11 @@ from dotenv import load_dotenv
 
 from kst import git
 from kst.api import ApiConfig
+from kst.api.client import DEFAULT_VALIDATION_TTL
+from kst.cache import TtlCache
+from kst.repository import custom_script
+from kst.repository.content import blob_store
+from kst.repository.layout import read_layout
 
 
 # --- Pytest Modifications ---
@@ -47,13 +53,15 @@ def no_http_requests(monkeypatch, request, response_factory):
         def urlopen_mock(*args, **kwargs):
             raise RuntimeError("No HTTP requests allowed in unit tests.")
 
-        def fake_get_ping(url, *args, **kwargs) -> requests.Response:
+        session_get = requests.Session.get
+
+        def fake_get_ping(self, url, *args, **kwargs) -> requests.Response:
             if url.endswith("/app/v1/ping"):
                 return response_factory(200, b'"pong"')
-            return requests.get(url, *args, **kwargs)
+            return session_get(self, url, *args, **kwargs)
 
         monkeypatch.setattr("urllib3.connectionpool.HTTPConnectionPool.urlopen", urlopen_mock)
-        monkeypatch.setattr("requests.get", fake_get_ping)
+        monkeypatch.setattr("requests.Session.get", fake_get_ping)
     else:
 
         class TestSession(requests.sessions.Session):
@@ -69,6 +77,39 @@ def no_http_requests(monkeypatch, request, response_factory):
         monkeypatch.setattr("requests.Session", TestSession)
 
 
+@pytest.fixture(autouse=True)
+def isolated_validation_cache(monkeypatch, tmp_path_factory):
+    """Use an empty tenant validation cache for each test."""
+    path = tmp_path_factory.mktemp("config") / "validated_tenants.json"
+    cache = TtlCache(path, ttl=DEFAULT_VALIDATION_TTL)
+    monkeypatch.setattr("kst.api.client.validation_cache", functools.cache(lambda: cache))
+
+
+@pytest.fixture(autouse=True)
+def isolated_category_cache(monkeypatch, tmp_path_factory):
+    """Use an empty Self Service category cache for each test."""
+    path = tmp_path_factory.mktemp("cache") / "categories.json"
+    cache = TtlCache(path, ttl=custom_script.DEFAULT_CATEGORY_TTL)
+    monkeypatch.setattr(custom_script, "category_cache", functools.cache(lambda: cache))
+    monkeypatch.setattr(custom_script, "_category_indexes", {})
+    monkeypatch.setattr(custom_script, "_missing_categories", {})
+
+
+@pytest.fixture(autouse=True)
+def isolated_content_cache(monkeypatch, tmp_path_factory):
+    """Use an empty content cache with fresh stats for each test."""
+    monkeypatch.setattr(blob_store, "root", tmp_path_factory.mktemp("cache") / "content")
+    blob_store.reset_stats()
+
+
+@pytest.fixture(autouse=True)
+def isolated_report_store(monkeypatch, tmp_path_factory) -> Path:
+    """Save sync reports to a temporary directory instead of the user log directory."""
+    path = tmp_path_factory.mktemp("logs") / "kst_report.jsonl"
+    monkeypatch.setattr("kst.reports.DEFAULT_REPORT_PATH", path)
+    return path
+
+
 @pytest.fixture(autouse=True)
 def git_locate_git_cache_clear():
     """Clear the cache before each test."""
@@ -79,6 +120,8 @@ def git_locate_git_cache_clear():
 def git_locate_root_cache_clear():
     """Clear the cache before each test."""
     git.locate_root.cache_clear()
+    git.locate_git_dir.cache_clear()
+    read_layout.cache_clear()
 
 
 @pytest.fixture(autouse=True)
@@ -0,0 +1,68 @@
+import subprocess
+
+from typer.testing import CliRunner
+
+from kst import app
+from kst.repository import CustomProfile, Repository, RepositoryLayout
+from kst.repository.layout import read_layout
+
+runner = CliRunner(mix_stderr=False)
+
+
+def load_hashes(profiles_repo):
+    return {profile.id: profile.diff_hash for profile in Repository.load_path(CustomProfile, profiles_repo).values()}
+
+
+def test_migrate_round_trip(profiles_repo):
+    root = profiles_repo.parent
+    expected_hashes = load_hashes(profiles_repo)
+
+    # A member directory named like a shard must be moved out of the way before the shard is created
+    first = next(iter(Repository.load_path(CustomProfile, profiles_repo).values()))
+    first.info_path.parent.rename(profiles_repo / first.id[:2])
+
+    result = runner.invoke(app, ["migrate", "sharded", "--repo", str(root)])
+    assert result.exit_code == 0, result.stderr
+    assert read_layout(root) is RepositoryLayout.SHARDED
+    sharded_repo = Repository.load_path(CustomProfile, profiles_repo)
+    assert {profile.info_path.parent.parent for profile in sharded_repo.values()} == {
+        profiles_repo / profile_id[:2] for profile_id in expected_hashes
+    }
+    assert load_hashes(profiles_repo) == expected_hashes
+
+    result = runner.invoke(app, ["migrate", "sharded", "--repo", str(root)])
+    assert result.exit_code == 0
+    assert "already uses the sharded layout" in result.stdout
+
+    # Members left in a shard which no longer matches their IDs are still moved out of the shard
+    shard = next(iter(sharded_repo.values())).info_path.parent.parent
+    shard.rename(next(path for n in range(256) if not (path := profiles_repo / f"{n:02x}").exists()))
+
+    result = runner.invoke(app, ["migrate", "flat", "--repo", str(root), "--dry-run"])
+    assert result.exit_code == 0
+    assert result.stdout.count("Would have moved") == len(expected_hashes)
+    assert read_layout(root) is RepositoryLayout.SHARDED
+
+    result = runner.invoke(app, ["migrate", "flat", "--repo", str(root)])
+    assert result.exit_code == 0, result.stderr
+    assert read_layout(root) is RepositoryLayout.FLAT
+    flat_repo = Repository.load_path(CustomProfile, profiles_repo)
+    # The emptied shard directories are removed
+    assert {path.name for path in profiles_repo.iterdir()} == {
+        profile.info_path.parent.name for profile in flat_repo.values()
+    }
+    assert load_hashes(profiles_repo) == expected_hashes
+
+    log = subprocess.run(["git", "-C", root, "log", "--format=%s"], capture_output=True, text=True, check=True)
+    assert log.stdout.splitlines()[:3] == [
+        "Migrate to the flat layout",
+        "Before migrating to the flat layout",
+        "Migrate to the sharded layout",
+    ]
+
+
+def test_migrate_invalid_layout_setting(tmp_path_repo):
+    (tmp_path_repo / ".kst").write_text('layout = "nested"\n')
+    result = runner.invoke(app, ["migrate", "sharded", "--repo", str(tmp_path_repo)])
+    assert result.exit_code == 2
+    assert "has an invalid layout" in result.stderr
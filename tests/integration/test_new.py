@@ -1,6 +1,8 @@
 from typer.testing import CliRunner
 
 from kst import app
+from kst.repository import RepositoryLayout
+from kst.repository.layout import read_layout
 
 runner = CliRunner(mix_stderr=False)
 
@@ -22,6 +24,14 @@ def test_new(tmp_path):
     assert (repo / ".gitignore").is_file()
     assert (repo / "profiles").is_dir()
     assert (repo / ".git").is_dir()
+    assert read_layout(repo) is RepositoryLayout.FLAT
+
+
+def test_new_sharded(tmp_path):
+    repo = tmp_path / "test_repo"
+    result = runner.invoke(app, ["new", str(repo), "--layout", "sharded"])
+    assert result.exit_code == 0
+    assert read_layout(repo) is RepositoryLayout.SHARDED
 
 
 def test_new_existing(tmp_path):
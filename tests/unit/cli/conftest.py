@@ -0,0 +1,10 @@
+from tests.fixtures.profiles import (
+    mobileconfig_content_factory,
+    mobileconfig_data_factory,
+    profile_directory_factory,
+    profile_info_content_factory,
+    profile_info_data_factory,
+    profiles_repo,
+    profiles_repo_obj,
+)
+from tests.fixtures.scripts import script_content, script_info_data_factory
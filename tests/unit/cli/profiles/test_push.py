@@ -6,11 +6,13 @@ from uuid import uuid4
 
 import pytest
 
+import kst.cli.utility
 from kst.api import CustomProfilePayload
 from kst.cli.common import ActionResponse, ActionType
 from kst.cli.utility import do_pushes, prepare_push_actions, update_local_member
 from kst.diff import ChangeType
-from kst.repository import CustomProfile
+from kst.journal import ActionJournal
+from kst.repository import CustomProfile, Repository, RepositoryWriter
 
 
 class TestDoPush:
@@ -188,3 +190,95 @@ def test_update_local_profile(profiles_repo_obj, profile_sync_results):
         assert local_profile == loaded_profile
         assert loaded_profile.sync_hash is not None
         assert loaded_profile.sync_hash == loaded_profile.diff_hash
+
+
+@pytest.mark.usefixtures("patch_profiles_endpoints")
+def test_do_push_journal(monkeypatch, tmp_path, config, local_remote_changes, prepared_push_actions):
+    """A push which stops part way can be resumed from its journal."""
+    local, _, _ = local_remote_changes
+    stop_after = len(prepared_push_actions) // 2
+    original_do_push = kst.cli.utility.do_push
+    calls = []
+
+    def interrupted_do_push(**kwargs):
+        if len(calls) == stop_after:
+            raise KeyboardInterrupt
+        calls.append(kwargs["action"].member.id)
+        return original_do_push(**kwargs)
+
+    monkeypatch.setattr(kst.cli.utility, "do_push", interrupted_do_push)
+
+    journal = ActionJournal(tmp_path / "profile-push.jsonl")
+    with (
+        pytest.raises(KeyboardInterrupt),
+        journal.recording(command="profile-push", tenant=str(config.url), actions=prepared_push_actions),
+    ):
+        do_pushes(config=config, local_repo=local, actions=prepared_push_actions, journal=journal)
+
+    state = journal.load()
+    assert state is not None
+    assert {member_id for member_id, _ in state.completed} == set(calls)
+    assert state.pending_ids == {action.member.id for action in prepared_push_actions} - set(calls)
+    assert [action["id"] for action in state.in_flight] == [prepared_push_actions[stop_after].member.id]
+
+
+@pytest.mark.usefixtures("patch_profiles_endpoints")
+def test_do_push_journal_before_commit(monkeypatch, tmp_path, config, local_remote_changes, prepared_push_actions):
+    """An action killed after it is taken but before its files are on disk is redone on resume."""
+    local, _, _ = local_remote_changes
+    stop_after = len(prepared_push_actions) // 2
+    original_commit = RepositoryWriter.commit
+    commits = []
+
+    def killed_commit(self):
+        if len(commits) == stop_after:
+            raise KeyboardInterrupt
+        commits.append(self)
+        original_commit(self)
+
+    monkeypatch.setattr(RepositoryWriter, "commit", killed_commit)
+    # A killed process never reaches the final commit of the writer
+    monkeypatch.setattr(RepositoryWriter, "__exit__", lambda self, *_: self.rollback())
+
+    journal = ActionJournal(tmp_path / "profile-push.jsonl")
+    with (
+        pytest.raises(KeyboardInterrupt),
+        journal.recording(command="profile-push", tenant=str(config.url), actions=prepared_push_actions),
+    ):
+        do_pushes(config=config, local_repo=local, actions=prepared_push_actions, journal=journal)
+
+    state = journal.load()
+    assert state is not None
+    killed_id = prepared_push_actions[stop_after].member.id
+    assert len(state.completed) == stop_after
+    assert killed_id in state.pending_ids
+    assert [action["id"] for action in state.in_flight] == [killed_id]
+
+
+@pytest.mark.usefixtures("patch_profiles_endpoints")
+def test_do_pushes_writes_each_action(monkeypatch, config, local_remote_changes, prepared_push_actions):
+    """The local changes of each completed action are on disk even if the push never finishes."""
+    local, _, _ = local_remote_changes
+    stop_after = len(prepared_push_actions) // 2
+    original_do_push = kst.cli.utility.do_push
+    pushed_ids = []
+
+    def killed_do_push(**kwargs):
+        if len(pushed_ids) == stop_after:
+            raise KeyboardInterrupt
+        response = original_do_push(**kwargs)
+        if response.member is not None:
+            pushed_ids.append(response.member.id)
+        return response
+
+    monkeypatch.setattr(kst.cli.utility, "do_push", killed_do_push)
+    # A killed process never reaches the final commit of the writer
+    monkeypatch.setattr(RepositoryWriter, "__exit__", lambda self, *_: self.rollback())
+
+    with pytest.raises(KeyboardInterrupt):
+        do_pushes(config=config, local_repo=local, actions=prepared_push_actions)
+
+    on_disk = Repository.load_path(model=CustomProfile, path=local.root)
+    for member_id in pushed_ids:
+        assert member_id in on_disk
+        assert on_disk[member_id].sync_hash == on_disk[member_id].diff_hash
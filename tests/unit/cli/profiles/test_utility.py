@@ -1,5 +1,8 @@
 import itertools
 import json
+import shutil
+import threading
+import time
 from contextlib import nullcontext
 from pathlib import Path
 from uuid import uuid4
@@ -9,16 +12,24 @@ import requests
 import typer
 
 from kst.__about__ import APP_NAME
+from kst.cli.common import ActionType, OperationType, PreparedAction
 from kst.cli.utility import (
+    DELETE_CONCURRENCY_ENV_VAR,
+    SYNC_CONCURRENCY_ENV_VAR,
+    build_action_graph,
+    do_deletes,
+    do_sync,
     filter_changes,
     get_local_members,
     get_remote_members,
     load_members_by_id,
     load_members_by_path,
+    prepare_delete_actions,
+    run_action_graph,
     save_report,
 )
 from kst.diff import ChangeType
-from kst.repository import PROFILE_RUNS_ON_PARAMS, CustomProfile, Repository
+from kst.repository import PROFILE_RUNS_ON_PARAMS, CustomProfile, Mobileconfig, Repository
 
 
 @pytest.mark.parametrize(
@@ -255,21 +266,166 @@ def test_filter_changes(local_remote_changes):
 
 
 def test_save_report(profile_sync_results, tmp_path):
-    """Test saving the sync report to a file."""
-    report_path = tmp_path / f"{APP_NAME}_report.json"
+    """Test appending the sync report to the report store."""
+    report_path = tmp_path / f"{APP_NAME}_report.jsonl"
     save_report(results=profile_sync_results, report_path=report_path)
     assert report_path.exists()
-    original_size = report_path.stat().st_size
     with report_path.open("r") as f:
-        data = json.load(f)
+        data = [json.loads(line) for line in f]
         assert len(data) == 1
         assert "success" in data[0]
         assert "failure" in data[0]
         assert len(data[0]["success"]) == len(profile_sync_results.success)
         assert len(data[0]["failure"]) == len(profile_sync_results.failure)
+        assert data[0]["unchanged_files"] == profile_sync_results.unchanged_files
+        assert "phases" in data[0]["timings"]
 
+    first_line = report_path.read_text()
     save_report(results=profile_sync_results, report_path=report_path)
-    assert original_size != report_path.stat().st_size
+    # Earlier reports are never rewritten
+    assert report_path.read_text().startswith(first_line)
     with report_path.open("r") as f:
-        data = json.load(f)
+        data = [json.loads(line) for line in f]
         assert len(data) == 2
+        assert data[1]["tenant"] is None
+
+    tenant = {"name": "client1", "url": "https://client1.api.kandji.io"}
+    save_report(results=profile_sync_results, report_path=report_path, tenant=tenant)
+    assert json.loads(report_path.read_text().splitlines()[-1])["tenant"] == tenant
+
+
+@pytest.mark.parametrize("concurrency", ["1", "4"])
+def test_do_deletes(monkeypatch, config, profiles_repo_obj, concurrency):
+    """Remote deletes run concurrently, failures are isolated and results keep the order of the actions."""
+    monkeypatch.setenv(DELETE_CONCURRENCY_ENV_VAR, concurrency)
+    profiles = list(profiles_repo_obj.values())[:6]
+    failing_id = profiles[1].id
+    directories = [profile.info_path.parent for profile in profiles]
+
+    deleted_remote = set()
+    lock = threading.Lock()
+
+    def delete_remote(self, config):
+        if self.id == failing_id:
+            raise RuntimeError("Unexpected error")
+        with lock:
+            deleted_remote.add(self.id)
+
+    monkeypatch.setattr(CustomProfile, "delete_remote", delete_remote)
+
+    remote_repo = Repository([profile.model_copy(deep=True) for profile in profiles])
+    actions = prepare_delete_actions(
+        local_repo=profiles_repo_obj,
+        remote_repo=remote_repo,
+        member_ids=[profile.id for profile in profiles],
+        local_only=False,
+        remote_only=False,
+    )
+    results = do_deletes(config=config, local_repo=profiles_repo_obj, actions=actions)
+
+    assert [(r.id, r.operation) for r in results.failure] == [(failing_id, OperationType.PUSH)]
+    assert [(r.id, r.operation) for r in results.success] == [
+        (action.member.id, action.operation)
+        for action in actions
+        if not (action.member.id == failing_id and action.operation is OperationType.PUSH)
+    ]
+    assert deleted_remote == {profile.id for profile in profiles} - {failing_id}
+    assert not any(directory.exists() for directory in directories)
+    assert not any(profile.id in profiles_repo_obj for profile in profiles)
+
+
+def test_build_action_graph(profiles_repo_obj):
+    """Actions on the same directory wait for each other and deletions run before new directories are chosen."""
+    first, second, third = list(profiles_repo_obj.values())[:3]
+    new_profiles = [
+        CustomProfile.from_api_payload(
+            first.to_api_payload().model_copy(update={"id": str(uuid4()), "name": first.info_path.parent.name})
+        )
+        for _ in range(2)
+    ]
+
+    actions = [
+        PreparedAction(ActionType.CREATE, OperationType.PULL, ChangeType.CREATE_LOCAL, new_profiles[0]),
+        PreparedAction(ActionType.UPDATE, OperationType.PUSH, ChangeType.UPDATE_REMOTE, second),
+        PreparedAction(ActionType.UPDATE, OperationType.PUSH, ChangeType.UPDATE_REMOTE, third),
+        PreparedAction(ActionType.DELETE, OperationType.PULL, ChangeType.NONE, first),
+        PreparedAction(ActionType.UPDATE, OperationType.PULL, ChangeType.UPDATE_LOCAL, second),
+        PreparedAction(ActionType.CREATE, OperationType.PULL, ChangeType.CREATE_LOCAL, new_profiles[1]),
+    ]
+
+    # New members with the same name only wait for the deletion since their directories come from the index
+    assert build_action_graph(profiles_repo_obj, actions) == [{3}, set(), set(), set(), {1}, {3}]
+
+
+def test_run_action_graph():
+    """Each action runs after its dependencies and a cycle is reported."""
+    actions = list(range(4))
+    finished = []
+    lock = threading.Lock()
+
+    def run(action):
+        with lock:
+            finished.append(action)
+        return action * 10
+
+    results = list(run_action_graph(actions, [set(), {0}, {1}, {0}], run, max_workers=4))
+    assert sorted(results) == [(0, 0), (1, 10), (2, 20), (3, 30)]
+    assert finished.index(0) < finished.index(1) < finished.index(2)
+    assert finished.index(0) < finished.index(3)
+
+    with pytest.raises(ValueError, match="cycle"):
+        list(run_action_graph(actions[:2], [{1}, {0}], run, max_workers=2))
+
+
+def test_do_sync_concurrent(monkeypatch, config, profiles_repo_obj):
+    """Independent pushes run at the same time and the results keep the order of the actions."""
+    monkeypatch.setenv(SYNC_CONCURRENCY_ENV_VAR, "2")
+    profiles = list(profiles_repo_obj.values())[:2]
+    # Both updates must be in flight at once to get past the barrier
+    barrier = threading.Barrier(2, timeout=5)
+
+    def update_remote(self, config):
+        barrier.wait()
+        return self.to_api_payload()
+
+    monkeypatch.setattr(CustomProfile, "update_remote", update_remote)
+
+    actions = [
+        PreparedAction(ActionType.UPDATE, OperationType.PUSH, ChangeType.UPDATE_REMOTE, profile) for profile in profiles
+    ]
+    results = do_sync(config=config, local_repo=profiles_repo_obj, actions=actions)
+
+    assert not results.failure
+    assert [result.id for result in results.success] == [profile.id for profile in profiles]
+
+
+def test_do_sync_commits_each_action(monkeypatch, config, profiles_repo_obj):
+    """A concurrent action never moves the files another action is still staging to disk."""
+    monkeypatch.setenv(SYNC_CONCURRENCY_ENV_VAR, "2")
+    slow, fast = (profiles_repo_obj.pop(profile_id) for profile_id in list(profiles_repo_obj)[:2])
+    for profile in (slow, fast):
+        shutil.rmtree(profile.info_path.parent)
+    original_write = Mobileconfig.write
+    slow_info_on_disk = []
+
+    def write(self, writer=None):
+        if self is slow.profile:
+            # The info file of the slow member is staged, so wait until the fast member is committed
+            deadline = time.monotonic() + 5
+            while not fast.info_path.exists() and time.monotonic() < deadline:
+                time.sleep(0.01)
+            slow_info_on_disk.append(slow.info_path.exists())
+        original_write(self, writer=writer)
+
+    monkeypatch.setattr(Mobileconfig, "write", write)
+
+    actions = [
+        PreparedAction(ActionType.CREATE, OperationType.PULL, ChangeType.CREATE_REMOTE, profile)
+        for profile in (slow, fast)
+    ]
+    results = do_sync(config=config, local_repo=profiles_repo_obj, actions=actions)
+
+    assert not results.failure
+    assert slow_info_on_disk == [False]
+    assert slow.info_path.exists()
+    assert slow.profile_path.exists()
@@ -0,0 +1,175 @@
+from uuid import uuid4
+
+import pytest
+import requests
+
+from kst.api import ApiConfig, CustomProfilePayload
+from kst.cli.baseline import (
+    TenantPlan,
+    category_names,
+    name_baseline_categories,
+    plan_tenant,
+    plan_tenant_actions,
+    push_baseline,
+)
+from kst.cli.common import ActionType, OperationType
+from kst.diff import ChangeType
+from kst.exceptions import ApiClientError
+from kst.repository import CustomProfile, CustomScript, Repository, Script, ScriptInfoFile, custom_script
+from kst.tenant_manager import TenantConfig
+
+
+def profile_payload(profile: CustomProfile, **updates) -> CustomProfilePayload:
+    return CustomProfilePayload.model_validate(
+        profile.info.model_dump(mode="json", exclude={"sync_hash"}) | {"profile": profile.profile.content} | updates
+    )
+
+
+def tenant_copy(profile: CustomProfile, **updates) -> CustomProfile:
+    """Create the member a tenant would hold for a baseline profile, which has an ID of its own."""
+    return CustomProfile.from_api_payload(profile_payload(profile, **{"id": str(uuid4())} | updates))
+
+
+def tenant_plan(name: str) -> TenantPlan:
+    tenant = TenantConfig(
+        name=name, tenant_url=f"https://{name}.api.kandji.io", api_token=str(uuid4()), repo_path="/unused"
+    )
+    return TenantPlan(tenant=tenant, config=ApiConfig(tenant_url=tenant.tenant_url, api_token=tenant.api_token))
+
+
+@pytest.mark.profile_count(8)
+def test_plan_tenant_actions(profiles_repo_obj: Repository[CustomProfile]):
+    baseline = list(profiles_repo_obj.values())
+    baseline_ids = {profile.id for profile in baseline}
+    unchanged, updated, duplicated = baseline[:3], baseline[3:5], baseline[5]
+    remote_repo = Repository(
+        [tenant_copy(profile) for profile in unchanged]
+        + [tenant_copy(profile, active=not profile.info.active) for profile in updated]
+        + [tenant_copy(duplicated), tenant_copy(duplicated)]
+        + [tenant_copy(baseline[0], name="Only In Tenant")]
+        # A member already pushed from the baseline keeps its ID even after it is renamed in the tenant
+        + [tenant_copy(baseline[6], id=baseline[6].id, name="Renamed In Tenant")]
+    )
+
+    actions, unchanged_count = plan_tenant_actions(profiles_repo_obj, remote_repo)
+
+    assert unchanged_count == 3
+    by_type = {action_type: [a for a in actions if a.action is action_type] for action_type in ActionType}
+    assert {a.member.name for a in by_type[ActionType.CREATE]} == {baseline[7].name}
+    assert all(a.member.id in baseline_ids for a in by_type[ActionType.CREATE])
+    assert all(a.change is ChangeType.CREATE_LOCAL for a in by_type[ActionType.CREATE])
+
+    # Updates carry the ID of the member in the tenant
+    remote_ids_by_name = {member.name: member.id for member in remote_repo.values()}
+    assert {a.member.name for a in by_type[ActionType.UPDATE]} == {profile.name for profile in [*updated, baseline[6]]}
+    assert all(a.member.id == remote_ids_by_name.get(a.member.name, baseline[6].id) for a in by_type[ActionType.UPDATE])
+
+    assert [a.member.name for a in by_type[ActionType.SKIP]] == [duplicated.name]
+    assert by_type[ActionType.SKIP][0].operation is OperationType.SKIP
+    assert by_type[ActionType.SKIP][0].change is ChangeType.CONFLICT
+    assert by_type[ActionType.DELETE] == []
+
+    # The baseline is shared by every tenant so it is never changed
+    assert {profile.id for profile in profiles_repo_obj.values()} == baseline_ids
+
+
+@pytest.mark.profile_count(4)
+def test_push_baseline(monkeypatch, profiles_repo_obj: Repository[CustomProfile]):
+    profiles = list(profiles_repo_obj.values())
+    remote_repo = Repository([tenant_copy(profile, active=not profile.info.active) for profile in profiles[:2]])
+    failing_id = next(member.id for member in remote_repo.values() if member.name == profiles[1].name)
+    created, updated = [], []
+
+    def fake_create_remote(self, config):
+        created.append(config.url)
+        return profile_payload(self, id=str(uuid4()))
+
+    def fake_update_remote(self, config):
+        if self.id == failing_id:
+            raise ValueError("Update failed")
+        updated.append((config.url, self.id))
+        return profile_payload(self)
+
+    monkeypatch.setattr(CustomProfile, "create_remote", fake_create_remote)
+    monkeypatch.setattr(CustomProfile, "update_remote", fake_update_remote)
+
+    first, second = tenant_plan("first"), tenant_plan("second")
+    first.actions, _ = plan_tenant_actions(profiles_repo_obj, Repository())
+    second.actions, _ = plan_tenant_actions(profiles_repo_obj, remote_repo)
+    baseline_files = {path: path.read_bytes() for path in profiles_repo_obj.root.rglob("*") if path.is_file()}
+
+    results = push_baseline([first, second], max_workers=4)
+
+    assert list(results) == ["first", "second"]
+    assert [response.id for response in results["first"].success] == [a.member.id for a in first.actions]
+    assert not results["first"].failure
+    assert len(results["second"].success) == 3
+    assert [response.id for response in results["second"].failure] == [failing_id]
+
+    assert sorted(created) == sorted([first.config.url] * 4 + [second.config.url] * 2)
+    updated_id = next(member.id for member in remote_repo.values() if member.name == profiles[0].name)
+    assert updated == [(second.config.url, updated_id)]
+
+    # Nothing is written to the baseline repository
+    assert {path: path.read_bytes() for path in profiles_repo_obj.root.rglob("*") if path.is_file()} == baseline_files
+
+
+def test_plan_tenant_script_categories(script_info_data_factory, script_content):
+    first, second = tenant_plan("first"), tenant_plan("second")
+    # Each tenant assigns its own IDs to categories with the same names
+    for plan in (first, second):
+        custom_script._category_indexes[plan.config.cache_key] = {"apps": str(uuid4()), "utilities": str(uuid4())}
+    first_ids = custom_script.get_category_index(first.config)
+    second_ids = custom_script.get_category_index(second.config)
+
+    # The baseline was pulled from the first tenant
+    pulled = Repository(
+        CustomScript(
+            info=ScriptInfoFile.model_validate(
+                script_info_data_factory(
+                    name=f"Script {i}", show_in_self_service=True, self_service_category_id=first_ids["apps"]
+                )
+            ),
+            audit=Script(content=script_content),
+        )
+        for i in range(3)
+    )
+    baseline = name_baseline_categories(pulled, [first.config, second.config], max_workers=2)
+    assert {script.info.self_service_category_id for script in baseline.values()} == {"apps"}
+
+    def tenant_script(script: CustomScript, category_id: str) -> CustomScript:
+        info = script.info.model_copy(update={"id": str(uuid4()), "self_service_category_id": category_id})
+        return script.model_copy(update={"info": info})
+
+    scripts = list(pulled.values())
+    remote_repo = Repository(
+        [tenant_script(scripts[0], second_ids["apps"]), tenant_script(scripts[1], second_ids["utilities"])]
+    )
+
+    actions, unchanged_count = plan_tenant_actions(baseline, remote_repo, category_names(second.config))
+
+    assert unchanged_count == 1
+    assert {(a.action, a.member.name) for a in actions} == {
+        (ActionType.UPDATE, scripts[1].name),
+        (ActionType.CREATE, scripts[2].name),
+    }
+    # Pushes resolve the category name to the ID the second tenant assigned
+    assert {custom_script.get_category_id(second.config, a.member.info.self_service_category_id) for a in actions} == {
+        second_ids["apps"]
+    }
+
+
+@pytest.mark.profile_count(2)
+@pytest.mark.parametrize(
+    "error", [requests.ReadTimeout("Read timed out"), ApiClientError("Unauthorized")], ids=["timeout", "api_error"]
+)
+def test_plan_tenant_error(monkeypatch, profiles_repo_obj: Repository[CustomProfile], error: Exception):
+    def fake_list_remote(config):
+        raise error
+
+    monkeypatch.setattr(CustomProfile, "list_remote", fake_list_remote)
+
+    plan = plan_tenant(tenant_plan("failing").tenant, [profiles_repo_obj])
+
+    assert plan.error == str(error)
+    assert plan.actions == []
@@ -0,0 +1,42 @@
+import click
+import pytest
+import typer.main
+
+from kst.cli import app
+from kst.cli.lazy_group import SUBCOMMAND_ARGS_KEY, LazyCommand
+
+
+def test_load_group():
+    command = LazyCommand(
+        name="tenant", import_path="kst.cli.tenant:app", help="Manage tenants", epilog="Epilog", no_args_is_help=True
+    ).load()
+    assert isinstance(command, click.Group)
+    assert (command.name, command.help, command.epilog, command.no_args_is_help) == (
+        "tenant",
+        "Manage tenants",
+        "Epilog",
+        True,
+    )
+    assert {"add", "list", "switch"} <= set(command.commands)
+    # Only the main app offers shell completion options
+    assert not {"install_completion", "show_completion"} & {param.name for param in command.params}
+
+
+def test_load_command():
+    command = LazyCommand(name="new", import_path="kst.cli.new:app", group=False).load()
+    assert not isinstance(command, click.Group)
+    assert command.name == "new"
+
+
+def test_load_missing_command():
+    with pytest.raises(LookupError, match="No command named missing"):
+        LazyCommand(name="missing", import_path="kst.cli.new:app", group=False).load()
+
+
+def test_subcommand_args():
+    group = typer.main.get_command(app)
+    with group.make_context("kst", ["--debug"]) as ctx:
+        name, command, args = group.resolve_command(ctx, ["tenant", "list"])
+    assert (name, args) == ("tenant", ["list"])
+    assert isinstance(command, click.Group)
+    assert ctx.meta[SUBCOMMAND_ARGS_KEY] == ["tenant", "list"]
@@ -5,10 +5,13 @@ from contextlib import chdir, nullcontext
 import pytest
 import typer
 
+from kst.api import ApiConfig
+from kst.api.client import is_validated, mark_validated
 from kst.cli.utility import api_config_prompt, validate_output_path, validate_repo_path
 from kst.repository import RepositoryDirectory
 
 repo_dir_name = "repo"
+API_TOKEN = "00000000-0000-0000-0000-000000000000"
 
 
 @pytest.mark.parametrize(
@@ -130,13 +133,13 @@ def test_api_config_prompt(
         else:
             pytest.fail("Unexpected prompt")
 
-    def fake_requests_get(url, *args, **kwargs):
+    def fake_requests_get(self, url, *args, **kwargs):
         if url == "https://test.api.kandji.io/app/v1/ping":
             return response_factory(200, b'"ping"')
         return response_factory(404, {"error": "tenantNotFound"})
 
     monkeypatch.setattr("typer.prompt", fake_prompt)
-    monkeypatch.setattr("requests.get", fake_requests_get)
+    monkeypatch.setattr("requests.Session.get", fake_requests_get)
     with expectation as values:
         config = api_config_prompt(tenant_url, api_token, interactive=interactive)
         assert config.url == values[0]
@@ -227,3 +230,34 @@ def test_validate_output_path(caplog, tmp_path, cd_path, override_path, expectat
             )
             assert output_path == tmp_path / expected_path
     assert re.search(log_msg, caplog.text)
+
+
+@pytest.mark.parametrize(
+    ("cached", "deferred", "pinged"),
+    [
+        pytest.param(False, False, True, id="uncached"),
+        pytest.param(True, False, False, id="cached"),
+        pytest.param(False, True, False, id="deferred"),
+    ],
+)
+def test_api_config_prompt_validation(monkeypatch, response_factory, cached, deferred, pinged):
+    ping_count = 0
+
+    def fake_requests_get(self, url, *args, **kwargs):
+        nonlocal ping_count
+        ping_count += 1
+        return response_factory(200, b'"pong"')
+
+    monkeypatch.setattr("requests.Session.get", fake_requests_get)
+    if deferred:
+        monkeypatch.setenv("KST_DEFER_VALIDATION", "1")
+    if cached:
+        mark_validated(ApiConfig(tenant_url="https://test.api.kandji.io", api_token=API_TOKEN))
+
+    config = api_config_prompt("https://test.api.kandji.io", API_TOKEN, interactive=False)
+    assert ping_count == int(pinged)
+    assert is_validated(config) is not deferred
+
+    # A successful ping is remembered for the next command
+    api_config_prompt("https://test.api.kandji.io", API_TOKEN, interactive=False)
+    assert ping_count == int(pinged)
@@ -1,11 +1,42 @@
+import hashlib
 import plistlib
 from contextlib import nullcontext
 from pathlib import Path
 
 import pytest
 
+from kst.console import OutputFormat
 from kst.exceptions import InvalidProfileError
-from kst.repository import File, Mobileconfig
+from kst.repository import File, Mobileconfig, Script
+from kst.repository import content as content_module
+from kst.repository.content import blob_store
+
+
+def der(tag: int, *children: bytes, indefinite: bool = False) -> bytes:
+    """Encode a BER/DER element, using an indefinite length like Apple's signing tools when asked."""
+    contents = b"".join(children)
+    if indefinite:
+        return bytes([tag, 0x80]) + contents + b"\0\0"
+    if len(contents) < 0x80:
+        return bytes([tag, len(contents)]) + contents
+    size = (len(contents).bit_length() + 7) // 8
+    return bytes([tag, 0x80 | size]) + len(contents).to_bytes(size) + contents
+
+
+def sign_profile(content: bytes, indefinite: bool = False) -> bytes:
+    """Wrap content in a CMS signed envelope with no signers, which is enough to test extracting it."""
+    if indefinite:
+        octets = der(0x24, der(0x04, content[:100]), der(0x04, content[100:]), indefinite=True)
+    else:
+        octets = der(0x04, content)
+    encapsulated = der(0x30, der(0x06, bytes.fromhex("2a864886f70d010701")), der(0xA0, octets, indefinite=indefinite))
+    signed_data = der(0x30, der(0x02, b"\x01"), der(0x31), encapsulated, der(0x31), indefinite=indefinite)
+    return der(
+        0x30,
+        bytes.fromhex("06092a864886f70d010702"),
+        der(0xA0, signed_data, indefinite=indefinite),
+        indefinite=indefinite,
+    )
 
 
 @pytest.fixture
@@ -38,6 +69,34 @@ class TestFile:
         mobileconfig_obj_with_path.write()
         assert mobileconfig_obj_with_path.path.exists()
 
+    @pytest.mark.parametrize("threshold", [0, 1 << 30], ids=["mapped", "read"])
+    def test_load(self, tmp_path, monkeypatch, threshold):
+        monkeypatch.setattr("kst.utils.MMAP_THRESHOLD", threshold)
+        script_path = tmp_path / "script.zsh"
+        script_path.write_bytes("#!/bin/zsh\necho 'héllo'\n".encode() * 1000)
+
+        script = Script.load(script_path)
+        assert script.content == script_path.read_text()
+        assert script.diff_hash == hashlib.sha256(script_path.read_bytes()).hexdigest()
+
+        # The digest of the loaded bytes is only reused while the content is unchanged
+        script.content = "echo changed"
+        assert script.diff_hash == hashlib.sha256(b"echo changed").hexdigest()
+
+    def test_load_normalizes_newlines(self, tmp_path):
+        script_path = tmp_path / "script.zsh"
+        script_path.write_bytes(b"#!/bin/zsh\r\necho hello\r\n")
+
+        script = Script.load(script_path)
+        assert script.content == "#!/bin/zsh\necho hello\n"
+        assert script.diff_hash == hashlib.sha256(script.content.encode()).hexdigest()
+
+    def test_load_empty(self, tmp_path, monkeypatch):
+        monkeypatch.setattr("kst.utils.MMAP_THRESHOLD", 0)
+        script_path = tmp_path / "script.zsh"
+        script_path.touch()
+        assert Script.load(script_path).content == ""
+
     def test_diff_hash(self, mobileconfig_obj):
         """Test that the diff_hash property is correctly calculated."""
         original_hash = mobileconfig_obj.diff_hash
@@ -101,6 +160,163 @@ class TestMobileconfig:
             file_content = mobileconfig_file.read_text()
             assert file.content == file_content
 
+    def test_load_mapped(self, mobileconfig_file, monkeypatch):
+        expected = Mobileconfig.load(mobileconfig_file)
+        monkeypatch.setattr(blob_store, "enabled", False)
+        monkeypatch.setattr("kst.utils.MMAP_THRESHOLD", 0)
+        loaded = Mobileconfig.load(mobileconfig_file)
+        assert loaded.content == expected.content
+        assert loaded.diff_hash == hashlib.sha256(loaded.content.encode()).hexdigest()
+
+    def test_load_cached(self, mobileconfig_file, monkeypatch):
+        """Contents which were validated before should be loaded from the content cache without parsing."""
+        first = Mobileconfig.load(mobileconfig_file)
+        assert blob_store.stats() == {"hits": 0, "misses": 1}
+
+        def fail_parse(content):
+            raise AssertionError("The mobileconfig should not be parsed again")
+
+        monkeypatch.setattr(Mobileconfig, "_data", staticmethod(fail_parse))
+        second = Mobileconfig.load(mobileconfig_file)
+        assert second.content == first.content
+        assert blob_store.stats() == {"hits": 1, "misses": 1}
+
+    def test_load_xml_is_not_parsed(self, mobileconfig_obj, tmp_path, monkeypatch):
+        """XML profiles should only be scanned on load and parsed once when their data is needed."""
+        profile_path = tmp_path / "profile.mobileconfig"
+        profile_path.write_text(mobileconfig_obj.content)
+        parsed = []
+
+        def counting_parse(content):
+            parsed.append(content)
+            return plistlib.loads(content)
+
+        monkeypatch.setattr(Mobileconfig, "_data", staticmethod(counting_parse))
+        monkeypatch.setattr("kst.repository.content._parsed_plists", type(content_module._parsed_plists)())
+        loaded = Mobileconfig.load(profile_path)
+        assert loaded.content == mobileconfig_obj.content
+        assert parsed == []
+
+        assert loaded.data == mobileconfig_obj.data
+        assert Mobileconfig.load(profile_path).data == loaded.data
+        assert loaded.format_plain_text(OutputFormat.JSON)
+        assert len(parsed) == 1
+
+    def test_load_binary_keeps_data(self, mobileconfig_obj, tmp_path, monkeypatch):
+        """Binary profiles are parsed on load, so their data should be reused instead of parsed again."""
+        profile_path = tmp_path / "profile.mobileconfig"
+        expected = plistlib.loads(mobileconfig_obj.content)
+        profile_path.write_bytes(plistlib.dumps(expected, fmt=plistlib.FMT_BINARY))
+        loaded = Mobileconfig.load(profile_path)
+
+        def fail_parse(content):
+            raise AssertionError("The mobileconfig should not be parsed again")
+
+        monkeypatch.setattr(Mobileconfig, "_data", staticmethod(fail_parse))
+        assert loaded.data == expected
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            pytest.param('<?xml version="1.0"?>\n<plist version="1.0">\n<dict>\n<key>a</key>\n', id="truncated"),
+            pytest.param("<plist><dict><key>a</key><string>b</dict></plist>", id="mismatched"),
+        ],
+    )
+    def test_load_malformed_xml(self, tmp_path, content):
+        profile_path = tmp_path / "profile.mobileconfig"
+        profile_path.write_text(content)
+        with pytest.raises(InvalidProfileError, match="is in an invalid format"):
+            Mobileconfig.load(profile_path)
+
+    @pytest.mark.parametrize(
+        "content",
+        [
+            pytest.param('<?xml version="1.0"?>\n<foo/>\n', id="not_plist"),
+            pytest.param("<plist><array><string>a</string></array></plist>", id="array_root"),
+            pytest.param("<plist><dict/><dict/></plist>", id="two_roots"),
+            pytest.param("<plist><dict><key>a</key></dict></plist>", id="missing_value"),
+            pytest.param("<plist><dict><key>a</key><key>b</key><true/></dict></plist>", id="unpaired_keys"),
+            pytest.param("<plist><dict><string>a</string></dict></plist>", id="value_without_key"),
+            pytest.param("<plist><dict><key>a</key><foo/></dict></plist>", id="unknown_element"),
+            pytest.param("<plist><dict><key>a<true/></key><true/></dict></plist>", id="element_in_key"),
+        ],
+    )
+    def test_load_not_plist(self, tmp_path, content):
+        """Well-formed XML which is not structured like a plist is rejected."""
+        profile_path = tmp_path / "profile.mobileconfig"
+        profile_path.write_text(content)
+        with pytest.raises(InvalidProfileError, match="is in an invalid format"):
+            Mobileconfig.load(profile_path)
+
+    @pytest.mark.parametrize(
+        ("value", "valid"),
+        [
+            pytest.param("<integer>abc</integer>", False, id="integer"),
+            pytest.param("<integer>0xZZ</integer>", False, id="hex_integer"),
+            pytest.param("<real>1.2.3</real>", False, id="real"),
+            pytest.param("<date>yesterday</date>", False, id="date"),
+            pytest.param("<date>2024-13-01T00:00:00Z</date>", False, id="date_out_of_range"),
+            pytest.param("<date>2024Z</date>", False, id="date_without_day"),
+            pytest.param("<integer> -0x1F</integer>", False, id="signed_hex_integer"),
+            pytest.param("<integer>0x1F</integer>", True, id="valid_hex_integer"),
+            pytest.param("<integer> -12 </integer>", True, id="valid_integer"),
+            pytest.param("<real>1e-3</real>", True, id="valid_real"),
+            pytest.param("<date>2024-02-29T12Z</date>", True, id="valid_partial_date"),
+        ],
+    )
+    def test_load_scalars(self, tmp_path, value, valid):
+        """Scalars are checked on load like plistlib converts them, so a profile which loads can be parsed."""
+        profile_path = tmp_path / "profile.mobileconfig"
+        profile_path.write_text(f"<plist><dict><key>a</key>{value}</dict></plist>")
+        with nullcontext() if valid else pytest.raises(InvalidProfileError, match="is in an invalid format"):
+            assert Mobileconfig.load(profile_path).data["a"] is not None
+
+    def test_data_invalid_value(self):
+        """Values which only fail once the plist is parsed raise the same error as an invalid file."""
+        mobileconfig = Mobileconfig(content="<plist><dict><key>a</key><integer>x</integer></dict></plist>")
+        with pytest.raises(InvalidProfileError, match="invalid format"):
+            _ = mobileconfig.data
+
+    @pytest.mark.parametrize("indefinite", [pytest.param(False, id="der"), pytest.param(True, id="ber")])
+    def test_load_signed(self, mobileconfig_obj, tmp_path, monkeypatch, indefinite):
+        """Signed profiles should be kept as their raw bytes and only parsed when their data is needed."""
+        signed_bytes = sign_profile(mobileconfig_obj.content.encode(), indefinite=indefinite)
+        profile_path = tmp_path / "profile.mobileconfig"
+        profile_path.write_bytes(signed_bytes)
+
+        def fail_parse(content):
+            raise AssertionError("The signed mobileconfig should not be parsed on load")
+
+        with monkeypatch.context() as context:
+            context.setattr(Mobileconfig, "_data", staticmethod(fail_parse))
+            loaded = Mobileconfig.load(profile_path)
+            cached = Mobileconfig.load(profile_path)
+        assert loaded.signed
+        assert cached.content == loaded.content
+        assert loaded.diff_hash == hashlib.sha256(signed_bytes).hexdigest()
+        assert Mobileconfig(content=loaded.content).diff_hash == loaded.diff_hash
+        assert loaded.serialize() == signed_bytes
+        assert loaded.plist_content == mobileconfig_obj.content
+        assert loaded.data == mobileconfig_obj.data
+
+        loaded.write()
+        assert profile_path.read_bytes() == signed_bytes
+
+    def test_load_signed_invalid(self, tmp_path):
+        profile_path = tmp_path / "profile.mobileconfig"
+        profile_path.write_bytes(sign_profile(b"<plist><dict><key>a</key></plist>"))
+        with pytest.raises(InvalidProfileError, match="signed mobileconfig"):
+            Mobileconfig.load(profile_path)
+        profile_path.write_bytes(sign_profile(b"")[:20])
+        with pytest.raises(InvalidProfileError, match="signed mobileconfig"):
+            Mobileconfig.load(profile_path)
+
+    def test_format_yaml(self, mobileconfig_obj):
+        """Parsed data is kept as OrderedDicts but should still be dumped as plain YAML mappings."""
+        output = mobileconfig_obj.format_plain_text(OutputFormat.YAML)
+        assert "!!omap" not in output
+        assert "PayloadUUID:" in output
+
     def test_load_invalid_profile(self, tmp_path):
         """Test that the load method raises an error when the profile is invalid."""
         profile_path = tmp_path / "profile.mobileconfig"
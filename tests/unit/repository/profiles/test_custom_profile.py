@@ -1,17 +1,30 @@
 import plistlib
+import re
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import pytest
 
 from kst.api import CustomProfilePayload
+from kst.console import OutputFormat
 from kst.exceptions import (
     DuplicateInfoFileError,
     DuplicateProfileError,
     InvalidProfileError,
     MissingInfoFileError,
 )
-from kst.repository import ACCEPTED_INFO_EXTENSIONS, PROFILE_RUNS_ON_PARAMS, CustomProfile
+from kst.repository import (
+    ACCEPTED_INFO_EXTENSIONS,
+    PROFILE_RUNS_ON_PARAMS,
+    CustomProfile,
+    MemberDirectoryIndex,
+    Mobileconfig,
+    ProfileInfoFile,
+    RepositoryLayout,
+    RepositoryWriter,
+)
+from kst.repository.layout import write_layout
 
 
 @pytest.fixture
@@ -154,6 +167,45 @@ class TestCustomProfile:
         assert custom_profile_obj.info_path == expected_info_path
         assert custom_profile_obj.profile_path == expected_profile_path
 
+    def test_ensure_paths_with_directory_index(self, custom_profile_obj, profiles_repo):
+        """Members allocated from the same index get unique directories even from several threads."""
+        (profiles_repo / custom_profile_obj.name).mkdir()
+        directory_index = MemberDirectoryIndex()
+        profiles = [custom_profile_obj.model_copy(deep=True) for _ in range(20)]
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda profile: profile.ensure_paths(profiles_repo, directory_index), profiles))
+
+        assert {profile.info_path.parent.name for profile in profiles} == {
+            f"{custom_profile_obj.name} ({count})" for count in range(1, 21)
+        }
+
+        # A removed directory can be allocated again
+        directory_index.release(profiles_repo / f"{custom_profile_obj.name} (3)")
+        assert directory_index.allocate(profiles_repo, custom_profile_obj.name).name == f"{custom_profile_obj.name} (3)"
+        assert (
+            directory_index.allocate(profiles_repo, custom_profile_obj.name).name == f"{custom_profile_obj.name} (21)"
+        )
+
+    def test_ensure_paths_moves_to_new_shard(self, custom_profile_obj, profiles_repo):
+        """In the sharded layout, a member whose ID changed is moved to the shard of its new ID."""
+        write_layout(profiles_repo.parent, RepositoryLayout.SHARDED)
+        custom_profile_obj.ensure_paths(profiles_repo)
+        custom_profile_obj.write()
+        old_directory = custom_profile_obj.info_path.parent
+        assert old_directory.parent == profiles_repo / custom_profile_obj.id[:2]
+
+        # Kandji assigns a new ID when a member is created
+        new_id = ("11" if custom_profile_obj.id.startswith("00") else "00") + custom_profile_obj.id[2:]
+        custom_profile_obj.id = new_id
+        custom_profile_obj.ensure_paths(profiles_repo)
+        assert custom_profile_obj.info_path.parent == profiles_repo / new_id[:2] / custom_profile_obj.name
+        assert custom_profile_obj.profile_path.parent == custom_profile_obj.info_path.parent
+
+        custom_profile_obj.write()
+        assert CustomProfile.from_path(custom_profile_obj.info_path).id == new_id
+        # The old member directory and its emptied shard are removed
+        assert not old_directory.parent.exists()
+
     def test_write_to_path(self, profiles_repo, custom_profile_obj):
         """Writing to disk should create a file both the info and profile files."""
         custom_profile_obj.ensure_paths(profiles_repo)
@@ -168,6 +220,18 @@ class TestCustomProfile:
         assert custom_profile_obj.info_path.exists()
         assert custom_profile_obj.profile_path.exists()
 
+    def test_write_skips_unchanged_files(self, custom_profile_obj_with_paths: CustomProfile):
+        """Rewriting a profile should only write the files whose content changed."""
+        with RepositoryWriter() as writer:
+            custom_profile_obj_with_paths.write(writer=writer)
+        assert writer.unchanged == 2
+
+        custom_profile_obj_with_paths.sync_hash = "changed"
+        with RepositoryWriter() as writer:
+            custom_profile_obj_with_paths.write(writer=writer)
+        assert writer.unchanged == 1
+        assert CustomProfile.from_path(custom_profile_obj_with_paths.info_path.parent).sync_hash == "changed"
+
     def test_write_to_path_without_paths(self, custom_profile_obj: CustomProfile):
         """Writing to disk with no info_path or profile_path should raise a InvalidProfileError."""
         assert custom_profile_obj.info.path is None
@@ -192,6 +256,12 @@ class TestCustomProfile:
         profile = CustomProfile.from_api_payload(profile_payload)
         assert isinstance(profile, CustomProfile)
 
+        # Members built from a payload without validation match the fully validated models
+        info = ProfileInfoFile.model_validate(profile_payload.model_dump(exclude={"profile"}))
+        assert profile.info == info
+        assert profile.info.model_fields_set == info.model_fields_set
+        assert profile == CustomProfile(info=info, profile=Mobileconfig(content=mobileconfig_content))
+
         # Check that all false patch works
         for param in PROFILE_RUNS_ON_PARAMS:
             setattr(profile_payload, param, False)
@@ -260,3 +330,10 @@ class TestCustomProfile:
         assert custom_profile_obj.diff_hash != original_hash
         custom_profile_obj.profile.content = original_content
         assert custom_profile_obj.diff_hash == original_hash
+
+    def test_format_plist_invalid_value(self, custom_profile_obj_with_paths):
+        """A value plistlib can't convert is reported as an invalid profile with its path."""
+        profile = custom_profile_obj_with_paths
+        profile.profile.content = "<plist><dict><key>a</key><integer>abc</integer></dict></plist>"
+        with pytest.raises(InvalidProfileError, match=re.escape(f"mobileconfig at {profile.profile_path}")):
+            profile.format_plain_text(OutputFormat.PLIST)
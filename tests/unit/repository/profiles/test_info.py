@@ -13,6 +13,8 @@ from kst.repository import (
     InfoFormat,
     ProfileInfoFile,
 )
+from kst.repository.info import parse_flat_yaml
+from kst.utils import safe_yaml
 
 VALID_INFO_SUFFIXES = list(SUFFIX_MAP.keys())
 
@@ -179,3 +181,32 @@ class TestProfileInfoFile:
         # Hash should be reverted when the value is set back to the original
         setattr(profile_info_file_obj, key, original_value)
         assert profile_info_file_obj.diff_hash == original_hash
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        pytest.param("id: 0f5e0cd8-5a0a-4a38-a0a5-4a8b4c1a1b9e\nname: Profile (1)\nactive: true\n", id="plain"),
+        pytest.param("name: 'It''s: #1'\nsync_hash:\nupdated_at: null\n", id="quoted"),
+        pytest.param('# comment\n\nname: "Profile"\ncount: 10\n', id="comment"),
+        pytest.param("created_at: 2024-01-01\n", id="timestamp"),
+        pytest.param("name: 1e5\n", id="float"),
+        pytest.param("name: Profile # comment\n", id="trailing-comment"),
+        pytest.param("name: >\n  Folded\n", id="block"),
+        pytest.param('name: "Tab\\tEscape"\n', id="escape"),
+    ],
+)
+def test_parse_flat_yaml(text):
+    parsed = parse_flat_yaml(text)
+    # Anything outside of the subset is left to the full parser
+    assert parsed is None or parsed == safe_yaml.load(text)
+
+
+def test_load_yaml_fallback(tmp_path, profile_info_data_factory):
+    info_data = profile_info_data_factory()
+    info_path = tmp_path / "info.yaml"
+    info_path.write_text(f"# A hand written info file\nid: {info_data['id']}\nname: >-\n  Folded\n  Name\n")
+    assert parse_flat_yaml(info_path.read_text()) is None
+    info = ProfileInfoFile.load(info_path)
+    assert info.id == info_data["id"]
+    assert info.name == "Folded Name"
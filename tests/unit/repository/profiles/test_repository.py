@@ -5,7 +5,7 @@ from pathlib import Path
 import pytest
 
 from kst.exceptions import InvalidRepositoryError
-from kst.repository import CustomProfile, Repository
+from kst.repository import CustomProfile, MemberCache, Repository
 
 
 def test_init(profiles_list):
@@ -42,6 +42,22 @@ class TestLoadPath:
         with pytest.raises(InvalidRepositoryError, match=r"Duplicate member ID"):
             Repository.load_path(model=CustomProfile, path=profiles_repo)
 
+    def test_member_cache(self, profiles_repo: Path, monkeypatch):
+        """Members should be reused from the member cache until their files change."""
+        monkeypatch.setattr(Repository, "member_cache", MemberCache())
+        first = Repository.load_path(model=CustomProfile, path=profiles_repo)
+        second = Repository.load_path(model=CustomProfile, path=profiles_repo)
+        assert first.keys() == second.keys()
+        for member_id, profile in first.items():
+            assert second[member_id] == profile
+            assert second[member_id] is not profile
+
+        profile = next(iter(second.values()))
+        profile.name = "Changed Name"
+        profile.write()
+        third = Repository.load_path(model=CustomProfile, path=profiles_repo)
+        assert third[profile.id].name == "Changed Name"
+
 
 class TestMapping:
     """Test cases for MutableMapping functionality."""
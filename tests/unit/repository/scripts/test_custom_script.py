@@ -10,7 +10,11 @@ from kst.exceptions import (
     InvalidScriptError,
     MissingInfoFileError,
 )
-from kst.repository import ACCEPTED_INFO_EXTENSIONS, CustomScript
+from kst.repository import ACCEPTED_INFO_EXTENSIONS, CustomScript, Script, ScriptInfoFile, custom_script
+from kst.repository.custom_script import forget_missing_categories, get_category_id
+
+# The category cache is replaced for each test, so the original is kept to test how it is created
+category_cache = custom_script.category_cache
 
 
 @pytest.fixture
@@ -184,6 +188,20 @@ class TestCustomScript:
         else:
             assert script.remediation is None
 
+    @pytest.mark.parametrize("execution_frequency", ["once", "no_enforcement"])
+    def test_from_api_payload_matches_validation(self, script_info_data_factory, script_content, execution_frequency):
+        """Members built from a payload without validation match the fully validated models."""
+        response_data = script_info_data_factory() | {"execution_frequency": execution_frequency}
+        response_data["id"] = response_data["id"].upper()
+        script_response = CustomScriptPayload.model_validate(
+            response_data | {"script": script_content, "remediation_script": ""}
+        )
+        script = CustomScript.from_api_payload(script_response)
+        info = ScriptInfoFile.model_validate(script_response.model_dump(exclude={"script", "remediation_script"}))
+        assert script.info == info
+        assert script.info.model_fields_set == info.model_fields_set
+        assert script == CustomScript(info=info, audit=Script(content=script_content))
+
     def test_to_api_payload(self, custom_script_obj):
         """Ensure the to_api_payload method returns a valid API payload."""
         custom_script_obj.to_api_payload()
@@ -258,3 +276,78 @@ class TestCustomScript:
             assert custom_script_obj.diff_hash != original_hash
             custom_script_obj.remediation.content = original_content
             assert custom_script_obj.diff_hash == original_hash
+
+
+class TestCategoryIndex:
+    @pytest.fixture
+    def categories_endpoint(self, monkeypatch, response_factory) -> dict[str, int]:
+        remote_data = [
+            {"id": "19837db4-21a2-4b17-b9b5-ebb69678110b", "name": "Apps"},
+            {"id": "dfc22bac-192a-4a67-846d-b2a689a95c10", "name": "Productivity"},
+            {"id": "32442c29-688e-4eb3-beb6-5a1394234c75", "name": "Utilities"},
+        ]
+        called_counter = {"list": 0}
+
+        def fake_list(self, path):
+            called_counter["list"] += 1
+            return response_factory(200, remote_data)
+
+        monkeypatch.setattr("kst.api.client.ApiClient.get", fake_list)
+        return called_counter
+
+    def test_fetched_once(self, config, categories_endpoint):
+        assert get_category_id(config, "Apps") == "19837db4-21a2-4b17-b9b5-ebb69678110b"
+        assert get_category_id(config, "productivity") == "dfc22bac-192a-4a67-846d-b2a689a95c10"
+        assert get_category_id(config, "UTILITIES") == "32442c29-688e-4eb3-beb6-5a1394234c75"
+        assert categories_endpoint["list"] == 1
+
+    def test_cached_between_runs(self, monkeypatch, config, categories_endpoint):
+        get_category_id(config, "Apps")
+        # A new process starts without any indexes in memory
+        monkeypatch.setattr(custom_script, "_category_indexes", {})
+        assert get_category_id(config, "Productivity") == "dfc22bac-192a-4a67-846d-b2a689a95c10"
+        assert categories_endpoint["list"] == 1
+
+    def test_refreshed_on_miss(self, config, categories_endpoint):
+        get_category_id(config, "Apps")
+        with pytest.raises(ValueError, match="Unable to get ID for category 'Missing'"):
+            get_category_id(config, "Missing")
+        assert categories_endpoint["list"] == 2
+
+    def test_refreshed_once_per_missing_name(self, config, categories_endpoint):
+        for _ in range(3):
+            with pytest.raises(ValueError, match="Unable to get ID for category 'Missing'"):
+                get_category_id(config, "Missing")
+        assert categories_endpoint["list"] == 2
+
+        # A new run looks the category up again in case it was created
+        forget_missing_categories()
+        with pytest.raises(ValueError, match="Unable to get ID for category 'Missing'"):
+            get_category_id(config, "Missing")
+        assert categories_endpoint["list"] == 3
+
+    def test_ttl_read_when_used(self, monkeypatch):
+        category_cache.cache_clear()
+        monkeypatch.setenv(custom_script.CATEGORY_TTL_ENV_VAR, "5")
+        try:
+            assert category_cache().ttl == 5
+        finally:
+            category_cache.cache_clear()
+
+    def test_uuid_passthrough(self, config, categories_endpoint):
+        category_id = "348a25e9-49e8-4bf4-8eb9-e9d18de641cf"
+        assert get_category_id(config, category_id) == category_id
+        assert categories_endpoint["list"] == 0
+
+    def test_prepare_remote(self, config, categories_endpoint, custom_script_obj):
+        members = []
+        for name in ["Apps", "Productivity", "Missing"]:
+            member = custom_script_obj.model_copy(deep=True)
+            member.info.self_service_category_id = name
+            member.info.show_in_self_service = True
+            members.append(member)
+
+        # Missing categories are reported when the script is pushed instead
+        CustomScript.prepare_remote(config, members)
+        assert categories_endpoint["list"] == 2
+        assert set(custom_script._category_indexes[config.cache_key]) == {"apps", "productivity", "utilities"}
@@ -0,0 +1,42 @@
+import pytest
+
+from kst.exceptions import InvalidRepositoryError
+from kst.repository import RepositoryLayout
+from kst.repository.layout import member_parent, read_layout, write_layout
+
+
+def test_read_default(tmp_path_repo):
+    assert read_layout(tmp_path_repo) is RepositoryLayout.FLAT
+
+
+def test_write_keeps_other_settings(tmp_path_repo):
+    marker = tmp_path_repo / ".kst"
+    marker.write_text('other = "value"\n')
+
+    write_layout(tmp_path_repo, RepositoryLayout.SHARDED)
+    assert read_layout(tmp_path_repo) is RepositoryLayout.SHARDED
+    assert marker.read_text() == 'layout = "sharded"\nother = "value"\n'
+
+    write_layout(tmp_path_repo, RepositoryLayout.FLAT)
+    assert read_layout(tmp_path_repo) is RepositoryLayout.FLAT
+    assert marker.read_text() == 'other = "value"\n'
+
+
+@pytest.mark.parametrize("content", ['layout = "nested"', "layout = sharded"])
+def test_read_invalid(tmp_path_repo, content):
+    (tmp_path_repo / ".kst").write_text(content)
+    with pytest.raises(InvalidRepositoryError, match="invalid layout"):
+        read_layout(tmp_path_repo)
+
+
+def test_member_parent(tmp_path_repo):
+    member_id = "AB12cd34-0000-4000-8000-000000000000"
+    group = tmp_path_repo / "profiles" / "group"
+    group.mkdir()
+    assert member_parent(group, "profiles", member_id) == group
+    assert member_parent(tmp_path_repo, "profiles", member_id) == tmp_path_repo / "profiles"
+
+    # Sharded repositories always place new members in the shard of their ID
+    write_layout(tmp_path_repo, RepositoryLayout.SHARDED)
+    assert member_parent(group, "profiles", member_id) == tmp_path_repo / "profiles" / "ab"
+    assert member_parent(tmp_path_repo, "scripts", member_id) == tmp_path_repo / "scripts" / "ab"
@@ -0,0 +1,139 @@
+import os
+import stat
+
+import pytest
+
+from kst.repository import RepositoryWriter, Script
+
+
+def temp_files(directory):
+    return [path for path in directory.iterdir() if path.name.endswith(".tmp")]
+
+
+class TestRepositoryWriter:
+    def test_files_written_on_commit(self, tmp_path):
+        path = tmp_path / "member" / "info.plist"
+        writer = RepositoryWriter()
+        writer.write_bytes(path, b"content")
+
+        # The directory is created immediately but the file is only staged
+        assert path.parent.is_dir()
+        assert not path.exists()
+        assert len(temp_files(path.parent)) == 1
+
+        writer.commit()
+        assert path.read_bytes() == b"content"
+        assert temp_files(path.parent) == []
+
+    def test_context_manager_commits(self, tmp_path):
+        path = tmp_path / "info.json"
+        path.write_bytes(b"old")
+        with RepositoryWriter() as writer:
+            writer.write_bytes(path, b"new")
+            assert path.read_bytes() == b"old"
+        assert path.read_bytes() == b"new"
+
+    def test_commit_many_times(self, tmp_path):
+        first, second = tmp_path / "first" / "info.json", tmp_path / "second" / "info.json"
+        writer = RepositoryWriter()
+        writer.write_bytes(first, b"first")
+        writer.commit()
+        assert first.read_bytes() == b"first"
+
+        # Files staged after a commit are only written by the next one
+        writer.write_bytes(second, b"second")
+        assert not second.exists()
+        writer.commit()
+        assert second.read_bytes() == b"second"
+        assert temp_files(first.parent) == temp_files(second.parent) == []
+
+    def test_batches_commit_their_own_files(self, tmp_path):
+        first, second = tmp_path / "first" / "info.json", tmp_path / "second" / "info.json"
+        second.parent.mkdir()
+        second.write_bytes(b"second")
+        writer = RepositoryWriter()
+        first_batch, second_batch = writer.batch(), writer.batch()
+        first_batch.write_bytes(first, b"first")
+        second_batch.write_bytes(second.with_name("audit"), b"audit")
+        second_batch.write_bytes(second, b"second")
+
+        # Committing one batch leaves the files staged by another batch alone
+        first_batch.commit()
+        assert first.read_bytes() == b"first"
+        assert not second.with_name("audit").exists()
+        second_batch.commit()
+        assert second.with_name("audit").read_bytes() == b"audit"
+        assert writer.unchanged == 1
+
+    def test_rmdir_only_empty_directories(self, tmp_path):
+        shard, kept = tmp_path / "ab" / "Profile", tmp_path / "cd" / "Profile"
+        for directory in (shard, kept):
+            directory.mkdir(parents=True)
+            (directory / "info.plist").write_bytes(b"info")
+        (kept / "notes.txt").write_bytes(b"notes")
+
+        with RepositoryWriter() as writer:
+            for directory in (shard, kept):
+                writer.unlink(directory / "info.plist")
+                writer.rmdir(directory)
+                writer.rmdir(directory.parent)
+
+        # Directories are removed deepest first, and only once nothing is left in them
+        assert not shard.parent.exists()
+        assert (kept / "notes.txt").exists()
+        assert not (kept / "info.plist").exists()
+
+    def test_rollback(self, tmp_path):
+        path = tmp_path / "info.json"
+        writer = RepositoryWriter()
+        writer.write_bytes(path, b"content")
+        writer.rollback()
+        writer.commit()
+        assert not path.exists()
+        assert temp_files(tmp_path) == []
+
+    def test_latest_write_wins(self, tmp_path):
+        path = tmp_path / "info.json"
+        with RepositoryWriter() as writer:
+            writer.write_bytes(path, b"first")
+            writer.write_bytes(path, b"second")
+        assert path.read_bytes() == b"second"
+        assert temp_files(tmp_path) == []
+
+    def test_unlink(self, tmp_path):
+        path = tmp_path / "remediation.sh"
+        path.write_text("echo")
+        with RepositoryWriter() as writer:
+            writer.unlink(path)
+            assert path.exists()
+        assert not path.exists()
+
+    @pytest.mark.skipif(os.name == "nt", reason="POSIX permissions are not available on Windows")
+    def test_permissions(self, tmp_path):
+        existing_path = tmp_path / "existing.json"
+        existing_path.write_bytes(b"old")
+        existing_path.chmod(0o600)
+        script = Script(content="echo 'Hello, World!'", path=tmp_path / "audit.sh")
+
+        with RepositoryWriter(fsync=True) as writer:
+            writer.write_bytes(existing_path, b"new")
+            script.write(writer=writer)
+
+        assert stat.S_IMODE(existing_path.stat().st_mode) == 0o600
+        assert script.path.stat().st_mode & 0o111 == 0o111
+
+    def test_identical_files_not_rewritten(self, tmp_path):
+        path = tmp_path / "info.json"
+        path.write_bytes(b"content")
+        os.utime(path, ns=(0, 0))
+
+        with RepositoryWriter() as writer:
+            writer.write_bytes(path, b"content")
+            writer.write_bytes(tmp_path / "new.json", b"content")
+        assert writer.unchanged == 1
+        assert path.stat().st_mtime_ns == 0
+
+        with RepositoryWriter() as writer:
+            writer.write_bytes(path, b"changed")
+        assert writer.unchanged == 0
+        assert path.read_bytes() == b"changed"
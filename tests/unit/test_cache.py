@@ -0,0 +1,107 @@
+import hashlib
+import json
+import time
+
+from kst.cache import BlobStore, TtlCache
+
+
+class TestTtlCache:
+    def test_set_and_get(self, tmp_path):
+        path = tmp_path / "cache.json"
+        cache = TtlCache(path, ttl=60)
+        assert cache.get("key") is None
+
+        cache.set("key", {"value": 1})
+        assert cache.get("key") == {"value": 1}
+
+        # Entries are shared with other instances using the same file
+        assert TtlCache(path, ttl=60).get("key") == {"value": 1}
+
+    def test_expired_entries(self, tmp_path, monkeypatch):
+        cache = TtlCache(tmp_path / "cache.json", ttl=60)
+        cache.set("key", "value")
+
+        now = time.time()
+        monkeypatch.setattr("time.time", lambda: now + 61)
+        assert cache.get("key") is None
+
+        # Expired entries are pruned on the next write
+        cache.set("other", "value")
+        assert set(json.loads(cache.path.read_text())) == {"other"}
+
+    def test_disabled(self, tmp_path):
+        cache = TtlCache(tmp_path / "cache.json", ttl=0)
+        cache.set("key", "value")
+        assert cache.get("key") is None
+        assert not cache.path.exists()
+
+    def test_merges_concurrent_updates(self, tmp_path):
+        path = tmp_path / "cache.json"
+        first = TtlCache(path, ttl=60)
+        second = TtlCache(path, ttl=60)
+        assert first.get("a") is None
+
+        second.set("b", 2)
+        first.set("a", 1)
+        assert first.get("b") == 2
+        assert TtlCache(path, ttl=60).get("a") == 1
+
+    def test_delete_and_clear(self, tmp_path):
+        cache = TtlCache(tmp_path / "cache.json", ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+
+        cache.delete("a")
+        assert cache.get("a") is None
+        assert cache.get("b") == 2
+
+        cache.clear()
+        assert cache.get("b") is None
+
+    def test_invalid_file(self, tmp_path):
+        path = tmp_path / "cache.json"
+        path.write_text("not json")
+        cache = TtlCache(path, ttl=60)
+        assert cache.get("key") is None
+        cache.set("key", "value")
+        assert cache.get("key") == "value"
+
+
+class TestBlobStore:
+    def test_put_and_get(self, tmp_path):
+        store = BlobStore(tmp_path)
+        digest = store.put(b"content")
+        assert digest == hashlib.sha256(b"content").hexdigest()
+        assert store.get(digest) == b"content"
+        assert store.get(BlobStore.digest(b"missing")) is None
+
+    def test_refs(self, tmp_path):
+        store = BlobStore(tmp_path)
+        source, target = store.digest(b"binary"), store.put(b"normalized")
+
+        assert store.get_ref("mobileconfig", source) is None
+        store.set_ref("mobileconfig", source, target)
+        assert store.get_ref("mobileconfig", source) == target
+        assert store.get_ref("script", source) is None
+        assert store.stats() == {"hits": 1, "misses": 2}
+
+        store.reset_stats()
+        assert store.stats() == {"hits": 0, "misses": 0}
+
+    def test_shared_between_instances(self, tmp_path):
+        digest = BlobStore(tmp_path).put(b"content")
+        assert BlobStore(tmp_path).get(digest) == b"content"
+
+    def test_corrupt_blob(self, tmp_path):
+        store = BlobStore(tmp_path)
+        digest = store.put(b"content")
+        next(path for path in tmp_path.rglob(digest)).write_bytes(b"corrupt")
+        assert store.get(digest) is None
+
+    def test_disabled(self, tmp_path):
+        store = BlobStore(tmp_path, enabled=False)
+        digest = store.put(b"content")
+        store.set_ref("mobileconfig", digest, digest)
+        assert store.get(digest) is None
+        assert store.get_ref("mobileconfig", digest) is None
+        assert not any(tmp_path.iterdir())
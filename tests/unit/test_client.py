@@ -1,10 +1,15 @@
+import os
 from collections.abc import Generator
 from urllib.parse import urlparse
 
 import pytest
+import requests
 from pydantic import ValidationError
+from requests.models import RequestEncodingMixin
 
 from kst.api import ApiClient, ApiConfig
+from kst.api.client import close_sessions, is_validated
+from kst.api.multipart import MultipartEncoder
 from kst.exceptions import ApiClientError
 
 
@@ -78,6 +83,43 @@ class TestApiClient:
         with pytest.raises(ApiClientError):
             fake_client.session
 
+    def test_shared_session(self, config):
+        """Test that clients for the same configuration reuse one session."""
+        first = ApiClient(config=config)
+        second = ApiClient(config=config)
+        other = ApiClient(config=ApiConfig(tenant_url="other.api.kandji.io", api_token=config.api_token))
+        assert first.session is second.session
+        assert first.session is not other.session
+
+        # Closing a client does not close the session used by other clients
+        first.close()
+        assert second.session.adapters
+
+    def test_close_sessions(self, config, monkeypatch):
+        """Shared sessions are closed on shutdown and replaced for clients created afterwards."""
+        session = ApiClient(config=config).session
+        closed = []
+        monkeypatch.setattr(session, "close", lambda: closed.append(session))
+        close_sessions()
+        assert closed == [session]
+        assert ApiClient(config=config).session is not session
+
+    def test_ping(self, fake_client, monkeypatch, response_factory):
+        monkeypatch.setattr("requests.Session.get", lambda *_args, **_kwargs: response_factory(404, b""))
+        assert fake_client.ping() is False
+        assert not is_validated(fake_client._config)
+
+        monkeypatch.setattr("requests.Session.get", lambda *_args, **_kwargs: response_factory(200, b'"pong"'))
+        assert fake_client.ping() is True
+        assert is_validated(fake_client._config)
+
+    @pytest.mark.usefixtures("patch_requests")
+    def test_request_marks_validated(self, fake_client):
+        """Test that a successful API request validates the tenant."""
+        assert not is_validated(fake_client._config)
+        fake_client.get("/get")
+        assert is_validated(fake_client._config)
+
     def test_source_param(self, fake_client, patch_requests):
         """Test that the source parameter is added to all requests."""
         fake_client.get("/get")
@@ -91,3 +133,67 @@ class TestApiClient:
         # Ensure that other parameters are not overwritten
         fake_client.request("GET", "https://example.com", params={"page": 3, "source": r"¯\_(ツ)_/¯"})
         assert patch_requests[-1][1]["params"] == {"page": 3, "source": "kst"}
+
+    def test_files_are_streamed(self, fake_client, patch_requests, tmp_path):
+        """Test that requests with files send a streamed multipart body instead of files."""
+        profile_path = tmp_path / "profile.mobileconfig"
+        profile_path.write_bytes(b"<plist></plist>")
+        with profile_path.open("rb") as file_obj:
+            fake_client.post(
+                "/post",
+                data={"name": "Test Profile"},
+                files=[("file", (profile_path.name, file_obj, "application/octet-stream"))],
+            )
+
+        kwargs = patch_requests[-1][1]
+        assert "files" not in kwargs
+        assert isinstance(kwargs["data"], MultipartEncoder)
+        assert kwargs["headers"]["Content-Type"] == kwargs["data"].content_type
+
+
+class TestMultipartEncoder:
+    @pytest.fixture
+    def fixed_boundary(self, monkeypatch) -> str:
+        boundary = "00000000000000000000000000000000"
+        monkeypatch.setattr("urllib3.filepost.choose_boundary", lambda: boundary)
+        return boundary
+
+    def test_matches_requests_encoding(self, tmp_path, fixed_boundary):
+        """Test that the streamed body is identical to the one requests would build in memory."""
+        profile_path = tmp_path / 'Test "Profile".mobileconfig'
+        profile_path.write_bytes(os.urandom(200_000))
+        data = {"name": "Tést Profile", "active": True, "runs_on_mac": False, "skipped": None}
+
+        with profile_path.open("rb") as file_obj:
+            files = [("file", (profile_path.name, file_obj, "application/octet-stream"))]
+            expected, expected_content_type = RequestEncodingMixin._encode_files(files, data)
+        with profile_path.open("rb") as file_obj:
+            files = [("file", (profile_path.name, file_obj, "application/octet-stream"))]
+            encoder = MultipartEncoder(data=data, files=files, boundary=fixed_boundary)
+            assert len(encoder) == len(expected)
+            assert b"".join(encoder) == expected
+        assert encoder.content_type == expected_content_type
+
+    def test_read_sizes(self, tmp_path):
+        """Test that reading in arbitrary sizes returns the full body exactly once."""
+        file_path = tmp_path / "script.sh"
+        file_path.write_bytes(b"x" * 150_000)
+        with file_path.open("rb") as file_obj:
+            body = MultipartEncoder(files=[("file", (file_path.name, file_obj, "text/plain"))], boundary="kst").read()
+        with file_path.open("rb") as file_obj:
+            encoder = MultipartEncoder(files=[("file", (file_path.name, file_obj, "text/plain"))], boundary="kst")
+            chunks = []
+            while chunk := encoder.read(1000):
+                chunks.append(chunk)
+        assert b"".join(chunks) == body
+        assert len(body) == len(encoder)
+
+    def test_prepared_request_content_length(self, tmp_path):
+        """Test that requests sends the precomputed Content-Length instead of chunked encoding."""
+        file_path = tmp_path / "profile.mobileconfig"
+        file_path.write_bytes(b"<plist></plist>")
+        with file_path.open("rb") as file_obj:
+            encoder = MultipartEncoder(data={"name": "Test"}, files=[("file", (file_path.name, file_obj, "text/xml"))])
+            prepared = requests.Request("POST", "https://example.com", data=encoder).prepare()
+        assert prepared.headers["Content-Length"] == str(len(encoder))
+        assert "Transfer-Encoding" not in prepared.headers
@@ -1,4 +1,7 @@
-from kst.console import OutputConsole
+import pytest
+from rich.table import Table
+
+from kst.console import OutputConsole, buffered_output, render_plain_text
 
 
 def test_long_str(capsys):
@@ -8,3 +11,46 @@ def test_long_str(capsys):
     captured = capsys.readouterr()
     assert long_string == "".join(captured.out.splitlines())
     assert len(captured.out) > 0
+
+
+@pytest.mark.parametrize(
+    ("message", "expected"),
+    [
+        pytest.param("no markup", "no markup", id="plain"),
+        pytest.param("[bold]Profile[/bold] created", "Profile created", id="markup"),
+        pytest.param(r"Profile \[beta] [green]ok[/]", "Profile [beta] ok", id="escaped"),
+        pytest.param("Made with :heart: by [yellow]Kandji[/yellow]", "Made with ❤ by Kandji", id="emoji"),
+        pytest.param("a\t[b]b[/b]", "a       b", id="tabs"),
+    ],
+)
+def test_render_plain_text(message, expected):
+    assert render_plain_text(message) == expected
+
+
+def test_render_plain_text_table():
+    table = Table("ID", "Name")
+    table.add_row("1234", "Profile")
+    rendered = render_plain_text(table, new_line_start=True)
+    assert rendered.startswith("\n")
+    assert "Profile" in rendered
+    assert "\x1b" not in rendered
+
+
+def test_print_plain(capsys):
+    OutputConsole().print(r"[green]Profile \[beta][/green] pushed")
+    assert capsys.readouterr().out == "Profile [beta] pushed\n"
+
+
+def test_buffered_output(capsys):
+    console = OutputConsole()
+    with buffered_output(max_lines=2):
+        console.print("one")
+        assert capsys.readouterr().out == ""
+        console.print("two")
+        assert capsys.readouterr().out == "one\ntwo\n"
+        console.print("three")
+        console.print_error("error")
+        captured = capsys.readouterr()
+        assert captured.out == "three\n"
+        assert captured.err == ""
+    assert capsys.readouterr().err == "error\n"
@@ -0,0 +1,153 @@
+import io
+import os
+import socket
+import stat
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from kst import console
+from kst.__about__ import __version__
+from kst.daemon import NO_DAEMON_ENV_VAR, forward, request
+from kst.daemon.client import connect, receive_message, send_message, terminal
+from kst.daemon.server import DaemonServer, _Cancellation, _command_context
+from kst.repository.content import CONTENT_CACHE_ENV_VAR, blob_store
+
+pytestmark = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="Requires Unix domain sockets")
+
+
+@pytest.fixture
+def daemon_path():
+    # Unix socket paths are limited to around 100 characters so avoid the long pytest tmp_path
+    with tempfile.TemporaryDirectory(prefix="kst-") as directory:
+        path = Path(directory) / "daemon.sock"
+        server = DaemonServer(path)
+        thread = threading.Thread(target=server.serve, daemon=True)
+        thread.start()
+        yield path
+        server.shutdown()
+        thread.join(timeout=5)
+
+
+def run(path: Path, argv: list[str], cwd: Path) -> tuple[int, str, str]:
+    """Send a command to the daemon using the wire protocol and collect its output."""
+    client = connect(path, timeout=10)
+    assert client is not None
+    stdout, stderr = [], []
+    with client, client.makefile("rwb") as stream:
+        send_message(stream, {"argv": argv, "cwd": str(cwd), "env": dict(os.environ)})
+        while (message := receive_message(stream)) is not None:
+            if "exit_code" in message:
+                return message["exit_code"], "".join(stdout), "".join(stderr)
+            stdout.append(message.get("stdout", ""))
+            stderr.append(message.get("stderr", ""))
+    pytest.fail("The daemon closed the connection without an exit code")
+
+
+def test_status_and_stop(daemon_path):
+    status = request({"control": "status"}, path=daemon_path)
+    assert status is not None
+    assert status["pid"] == os.getpid()
+    assert status["served"] == 0
+
+    assert request({"control": "stop"}, path=daemon_path) is not None
+
+
+def test_already_running(daemon_path):
+    with pytest.raises(FileExistsError):
+        DaemonServer(daemon_path)
+
+
+def test_run_command(daemon_path, tmp_path_repo):
+    cwd = os.getcwd()
+    exit_code, stdout, _ = run(daemon_path, ["--version"], tmp_path_repo)
+    assert exit_code == 0
+    assert __version__ in stdout
+
+    exit_code, stdout, _ = run(daemon_path, ["profile", "new", "--name", "Daemon Profile"], tmp_path_repo)
+    assert exit_code == 0
+    assert (tmp_path_repo / "profiles" / "Daemon Profile").is_dir()
+
+    exit_code, _, stderr = run(daemon_path, ["bogus"], tmp_path_repo)
+    assert exit_code == 2
+    assert "No such command" in stderr
+
+    # The daemon restores its own working directory after each command
+    assert os.getcwd() == cwd
+    assert request({"control": "status"}, path=daemon_path)["served"] == 3
+
+
+def test_forward_without_daemon(tmp_path, monkeypatch):
+    assert forward(["--version"], path=tmp_path / "missing.sock") is None
+    monkeypatch.setenv(NO_DAEMON_ENV_VAR, "1")
+    assert forward(["--version"]) is None
+
+
+def test_socket_is_private(daemon_path):
+    assert stat.S_IMODE(daemon_path.stat().st_mode) == 0o600
+
+
+def test_command_environment(tmp_path):
+    """Settings read from the environment follow the environment of each command."""
+    enabled = blob_store.enabled
+    with _command_context(str(tmp_path), dict(os.environ) | {CONTENT_CACHE_ENV_VAR: "0"}, io.BytesIO()):
+        assert not blob_store.enabled
+    assert blob_store.enabled == enabled
+
+
+@pytest.mark.parametrize(("columns", "width"), [(None, 132), ("100", 100)], ids=["client_size", "env_columns"])
+def test_command_terminal(tmp_path, columns, width):
+    """Commands see the terminal of the client, so their output keeps its colors and fits the client's width."""
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if key not in {"COLUMNS", "LINES", "FORCE_COLOR", "NO_COLOR", "TTY_COMPATIBLE"}
+    } | {"TERM": "xterm-256color"}
+    if columns is not None:
+        env["COLUMNS"] = columns
+    client_terminal = {"isatty": {"stdout": True, "stderr": False}, "size": [132, 40]}
+
+    with _command_context(str(tmp_path), env, io.BytesIO(), terminal=client_terminal):
+        assert sys.stdout.isatty()
+        assert not sys.stderr.isatty()
+        assert console.stdout.is_terminal
+        assert console.stdout.color_system is not None
+        assert not console.stderr.is_terminal
+        assert console.stdout.size == (width, 40)
+
+    # The consoles follow the streams of the daemon again once the command is done
+    assert console.stdout.is_terminal is sys.stdout.isatty()
+
+
+def test_client_terminal(monkeypatch):
+    monkeypatch.setattr(sys, "stdout", io.StringIO())
+    monkeypatch.setattr(sys, "stderr", io.StringIO())
+    monkeypatch.setattr(sys, "stdin", io.StringIO())
+    assert terminal() == {"isatty": {"stdout": False, "stderr": False}, "size": None}
+
+
+def test_cancel_on_disconnect():
+    connection, client = socket.socketpair()
+    cancellation = _Cancellation(connection)
+    cancellation.watch()
+    client.close()
+    with pytest.raises(KeyboardInterrupt):  # noqa: PT012
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            time.sleep(0.01)
+    cancellation.stop()
+    connection.close()
+
+
+def test_no_cancel_after_stop():
+    connection, client = socket.socketpair()
+    cancellation = _Cancellation(connection)
+    cancellation.watch()
+    cancellation.stop()
+    client.close()
+    time.sleep(1)
+    connection.close()
@@ -0,0 +1,84 @@
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+import kst
+
+# Heavy dependencies which should only be imported by the subcommands which need them
+HEAVY_MODULES = {"requests", "pydantic", "ruamel.yaml", "kst.repository", "kst.api", "kst.git"}
+
+# Generous upper bound for the cumulative import time of kst.cli to catch large regressions on slow machines
+IMPORT_BUDGET_US = 1_500_000
+
+
+def run_python(code: str) -> tuple[dict[str, int], set[str]]:
+    """Run code in a fresh interpreter with -X importtime.
+
+    Returns:
+        tuple: The cumulative import time in microseconds of each module reported by -X importtime and the
+            names of all modules loaded once the code completes.
+
+    """
+    # Make sure the child interpreter imports the same kst package as the tests
+    python_path = os.pathsep.join(filter(None, [str(Path(kst.__file__).parents[1]), os.environ.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"{code}\nimport sys\nprint(*sorted(sys.modules))"],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=os.environ | {"PYTHONPATH": python_path},
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if match := re.fullmatch(r"import time:\s+\d+ \|\s+(\d+) \|\s*(\S+)", line):
+            times[match.group(2)] = int(match.group(1))
+    return times, set(result.stdout.split())
+
+
+def test_package_import_is_lazy():
+    # Forwarding a command to the daemon must not import the CLI
+    _, modules = run_python("import kst.__main__, kst.daemon")
+    assert not {"kst.cli", "typer", "rich", *HEAVY_MODULES} & modules
+
+
+def test_cli_import_is_lazy():
+    times, modules = run_python("import kst.cli")
+    assert "kst.cli" in modules
+    assert not HEAVY_MODULES & modules
+    assert times["kst.cli"] < IMPORT_BUDGET_US
+
+
+@pytest.mark.parametrize("module", ["kst.repository", "kst.git", "kst.api", "kst.diff", "kst.cli.utility"])
+def test_module_imports_on_its_own(module):
+    # Importing kst no longer imports every module, so each one must import cleanly in a fresh interpreter
+    _, modules = run_python(f"import {module}")
+    assert module in modules
+
+
+def test_version_is_lazy():
+    _, modules = run_python("from kst import app\ntry:\n    app(['--version'])\nexcept SystemExit:\n    pass")
+    assert not HEAVY_MODULES & modules
+
+
+@pytest.mark.parametrize(
+    ("command", "loaded", "not_loaded"),
+    [
+        pytest.param("tenant", "kst.cli.tenant", {"kst.cli.profile", "kst.cli.script", *HEAVY_MODULES}, id="tenant"),
+        pytest.param("profile", "kst.cli.profile", {"kst.cli.script", "kst.cli.tenant"}, id="profile"),
+        pytest.param("script", "kst.cli.script", {"kst.cli.profile", "kst.cli.tenant"}, id="script"),
+    ],
+)
+def test_subcommands_load_on_demand(command, loaded, not_loaded):
+    code = (
+        "import click, typer.main\n"
+        "from kst import app\n"
+        "group = typer.main.get_command(app)\n"
+        f"group.get_command(click.Context(group), {command!r})"
+    )
+    _, modules = run_python(code)
+    assert loaded in modules
+    assert not not_loaded & modules
@@ -33,8 +33,12 @@ def test_model_imports():
         "InfoFile",
         "InfoFormat",
         "MemberBase",
+        "MemberCache",
+        "MemberDirectoryIndex",
         "Repository",
         "RepositoryDirectory",
+        "RepositoryLayout",
+        "RepositoryWriter",
         "SUFFIX_MAP",
     }
 
@@ -0,0 +1,73 @@
+from types import SimpleNamespace
+
+import pytest
+
+from kst.cli.common import ActionResponse, ActionType, OperationType, PreparedAction, ResultType
+from kst.diff import ChangeType
+from kst.journal import ActionJournal
+
+
+def make_action(member_id: str, action: ActionType = ActionType.UPDATE) -> PreparedAction:
+    return PreparedAction(action, OperationType.PUSH, ChangeType.UPDATE_REMOTE, SimpleNamespace(id=member_id))
+
+
+def make_response(action: PreparedAction, result: ResultType = ResultType.SUCCESS) -> ActionResponse:
+    return ActionResponse(action.member.id, action.action, action.operation, result, None)
+
+
+@pytest.fixture
+def journal(tmp_path) -> ActionJournal:
+    return ActionJournal(tmp_path / "kst" / "journal" / "profile-push.jsonl")
+
+
+def test_discarded_on_success(journal):
+    actions = [make_action("a"), make_action("b")]
+    with journal.recording(command="profile-push", tenant="https://example.kandji.io", actions=actions):
+        for action in actions:
+            journal.begin(action)
+            journal.end(make_response(action))
+    assert not journal.path.exists()
+    assert journal.load() is None
+
+
+def test_kept_on_failure(journal):
+    actions = [make_action("a"), make_action("b")]
+    with journal.recording(
+        command="profile-push", tenant="https://example.kandji.io", actions=actions, options={"force": True}
+    ):
+        journal.begin(actions[0])
+        journal.end(make_response(actions[0]))
+        journal.begin(actions[1])
+        journal.end(make_response(actions[1], ResultType.FAILURE))
+
+    state = journal.load()
+    assert state is not None
+    assert state.command == "profile-push"
+    assert state.tenant == "https://example.kandji.io"
+    assert state.options == {"force": True}
+    assert state.completed == {("a", "push")}
+    assert state.in_flight == []
+    assert state.pending_ids == {"b"}
+
+
+def test_interrupted(journal):
+    actions = [make_action("a", ActionType.CREATE), make_action("b"), make_action("c")]
+
+    def interrupted_push():
+        with journal.recording(command="profile-push", tenant="https://example.kandji.io", actions=actions):
+            journal.begin(actions[0])
+            journal.begin(actions[1])
+            journal.end(make_response(actions[1]))
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        interrupted_push()
+
+    # A record which was only partially written is ignored
+    with journal.path.open("a") as file:
+        file.write('{"event": "end", "id": "a"')
+
+    state = journal.load()
+    assert state is not None
+    assert state.pending_ids == {"a", "c"}
+    assert [(action["id"], action["action"]) for action in state.in_flight] == [("a", "create")]
@@ -0,0 +1,106 @@
+import pytest
+from typer.testing import CliRunner
+
+from kst import app
+from kst.metrics import format_metrics, metrics_path, write_metrics
+from kst.tracing import Span
+
+
+def span(name: str, duration: float = 0.02, **attributes) -> Span:
+    return Span(name=name, start=0, duration=duration, thread_id=1, attributes=attributes)
+
+
+@pytest.fixture
+def spans() -> list[Span]:
+    tenant = "example.api.kandji.io"
+    return [
+        span("api.request", method="GET", tenant=tenant, status=200, request_bytes=0, response_bytes=100),
+        span("api.request", 0.3, method="POST", tenant=tenant, status=201, request_bytes=50, response_bytes=20),
+        span("api.request", 0.4, method="POST", tenant=tenant),
+        span("action.push", member_type="CustomProfile", action="create", result="success"),
+        span("action.push", member_type="CustomProfile", action="create", result="success"),
+        span("action.pull", member_type="CustomScript", action="update", result="failure"),
+        span("git.command", subcommand="commit", exit_code=0),
+        span("command", 1.5),
+    ]
+
+
+def samples(text: str) -> dict[str, str]:
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+
+
+def test_format_metrics(spans):
+    text = format_metrics(spans, {"command": "profile sync"})
+    values = samples(text)
+
+    assert "# TYPE kst_api_requests_total counter" in text
+    assert "# TYPE kst_phase_duration_seconds histogram" in text
+    assert values['kst_command_duration_seconds{command="profile sync"}'] == "1.5"
+
+    request_labels = 'command="profile sync",tenant="example.api.kandji.io"'
+    assert values[f'kst_api_requests_total{{{request_labels},method="GET",status="200"}}'] == "1"
+    assert values[f'kst_api_requests_total{{{request_labels},method="POST",status="201"}}'] == "1"
+    assert values[f'kst_api_requests_total{{{request_labels},method="POST",status="error"}}'] == "1"
+    assert values[f"kst_api_request_bytes_total{{{request_labels}}}"] == "50"
+    assert values[f"kst_api_response_bytes_total{{{request_labels}}}"] == "120"
+    assert values[f'kst_api_request_duration_seconds_bucket{{{request_labels},method="POST",le="0.25"}}'] == "0"
+    assert values[f'kst_api_request_duration_seconds_bucket{{{request_labels},method="POST",le="0.5"}}'] == "2"
+    assert values[f'kst_api_request_duration_seconds_bucket{{{request_labels},method="POST",le="+Inf"}}'] == "2"
+    assert values[f'kst_api_request_duration_seconds_count{{{request_labels},method="POST"}}'] == "2"
+    assert float(values[f'kst_api_request_duration_seconds_sum{{{request_labels},method="POST"}}']) == pytest.approx(
+        0.7
+    )
+
+    push_labels = 'command="profile sync",operation="push",member_type="CustomProfile",action="create"'
+    assert values[f'kst_actions_total{{{push_labels},result="success"}}'] == "2"
+    pull_labels = 'command="profile sync",operation="pull",member_type="CustomScript",action="update"'
+    assert values[f'kst_actions_total{{{pull_labels},result="failure"}}'] == "1"
+    assert values['kst_git_commands_total{command="profile sync",subcommand="commit",exit_code="0"}'] == "1"
+    assert values['kst_phase_duration_seconds_count{command="profile sync",phase="action.push"}'] == "2"
+    assert 'phase="command"' not in text
+
+
+def test_format_metrics_escapes_labels():
+    text = format_metrics([span("git.command", subcommand='say "hi"\\\n')])
+    assert 'subcommand="say \\"hi\\"\\\\\\n"' in text
+
+
+def test_format_metrics_skips_empty_families():
+    text = format_metrics([])
+    assert "kst_api_requests_total" not in text
+    assert "kst_command_completed_timestamp_seconds " in text
+
+
+def test_write_metrics(spans, tmp_path):
+    path = write_metrics(tmp_path / "metrics", spans, command="profile sync")
+
+    assert path == metrics_path(tmp_path / "metrics", "profile sync", "example.api.kandji.io")
+    assert path.name == "kst_profile_sync_example.api.kandji.io.prom"
+    assert list(path.parent.iterdir()) == [path]
+    assert (
+        samples(path.read_text())['kst_command_duration_seconds{command="profile sync",tenant="example.api.kandji.io"}']
+        == "1.5"
+    )
+
+
+def test_write_metrics_many_tenants(tmp_path):
+    spans = [span("api.request", tenant="first.api.kandji.io"), span("api.request", tenant="second.api.kandji.io")]
+    path = write_metrics(tmp_path, spans, command="baseline push")
+
+    assert path.name == "kst_baseline_push.prom"
+    assert 'tenant="first.api.kandji.io"' in path.read_text()
+    assert 'tenant="second.api.kandji.io"' in path.read_text()
+
+
+def test_metrics_dir_option(tmp_path_repo_cd, tmp_path):
+    metrics_dir = tmp_path / "metrics"
+    result = CliRunner(mix_stderr=False).invoke(
+        app, ["--metrics-dir", str(metrics_dir), "profile", "new", "--name", "Measured Profile"]
+    )
+    assert result.exit_code == 0
+
+    text = (metrics_dir / "kst_profile_new.prom").read_text()
+    values = samples(text)
+    assert 'kst_command_duration_seconds{command="profile new"}' in values
+    assert values['kst_phase_duration_seconds_count{command="profile new",phase="repository.write"}'] == "2"
+    assert any(key.startswith('kst_git_commands_total{command="profile new",subcommand="rev-parse"') for key in values)
@@ -0,0 +1,134 @@
+import json
+from uuid import uuid4
+
+import pytest
+from typer.testing import CliRunner
+
+from kst import app
+from kst.reports import ReportStore
+
+
+def make_report(status: str = "success", **kwargs) -> dict:
+    return {
+        "id": str(uuid4()),
+        "timestamp": "2024-01-01T00:00:00+00:00",
+        "summary": "",
+        "status": status,
+        "success": [],
+        "failure": [],
+        "skipped": [],
+    } | kwargs
+
+
+class TestReportStore:
+    def test_append_and_iterate(self, tmp_path):
+        store = ReportStore(tmp_path / "kst_report.jsonl")
+        reports = [make_report() for _ in range(3)]
+        for report in reports:
+            store.append(report)
+
+        assert len(store.path.read_text().splitlines()) == 3
+        # Reports are returned newest first
+        assert list(store.iter_reports()) == reports[::-1]
+
+    def test_get(self, tmp_path):
+        store = ReportStore(tmp_path / "kst_report.jsonl")
+        report = make_report()
+        store.append(report)
+        store.append(make_report())
+
+        assert store.get(report["id"]) == report
+        assert store.get(report["id"][:8]) == report
+        assert store.get("missing") is None
+
+    def test_rotation(self, tmp_path):
+        report_size = len(json.dumps(make_report())) + 1
+        store = ReportStore(tmp_path / "kst_report.jsonl", max_bytes=report_size * 2, backups=2)
+        reports = [make_report() for _ in range(8)]
+        for report in reports:
+            store.append(report)
+
+        assert [path.name for path in sorted(tmp_path.iterdir())] == [
+            "kst_report.jsonl",
+            "kst_report.jsonl.1",
+            "kst_report.jsonl.2",
+        ]
+        # Only the newest reports which fit in the current file and backups are kept
+        assert list(store.iter_reports()) == reports[:1:-1]
+
+    def test_skips_invalid_lines(self, tmp_path):
+        store = ReportStore(tmp_path / "kst_report.jsonl")
+        report = make_report()
+        store.append(report)
+        with store.path.open("a") as file:
+            file.write("{not json\n")
+
+        assert list(store.iter_reports()) == [report]
+
+    def test_migrate_legacy(self, tmp_path):
+        reports = [make_report() for _ in range(3)]
+        legacy_path = tmp_path / "kst_report.json"
+        legacy_path.write_text(json.dumps(reports, indent=2))
+
+        store = ReportStore(tmp_path / "kst_report.jsonl")
+        new_report = make_report()
+        store.append(new_report)
+
+        assert not legacy_path.exists()
+        assert len(list(tmp_path.glob("kst_report.json.bkp_*"))) == 1
+        assert list(store.iter_reports()) == [new_report, *reports]
+
+    def test_invalid_legacy(self, tmp_path):
+        legacy_path = tmp_path / "kst_report.json"
+        legacy_path.write_text("{not json")
+
+        store = ReportStore(tmp_path / "kst_report.jsonl")
+        store.append(make_report())
+
+        assert not legacy_path.exists()
+        assert len(list(tmp_path.glob("kst_report.json.bkp_*"))) == 1
+        assert len(list(store.iter_reports())) == 1
+
+
+class TestReportCommand:
+    @pytest.fixture
+    def reports(self, isolated_report_store):
+        store = ReportStore(isolated_report_store)
+        reports = [make_report(), make_report("failure"), make_report("warning")]
+        for report in reports:
+            store.append(report)
+        return reports
+
+    def test_list(self, reports):
+        result = CliRunner(mix_stderr=False).invoke(app, ["report", "list", "--format", "json"])
+        assert result.exit_code == 0
+        assert [summary["id"] for summary in json.loads(result.stdout)] == [report["id"] for report in reports[::-1]]
+
+    def test_list_filtered(self, reports):
+        result = CliRunner(mix_stderr=False).invoke(
+            app, ["report", "list", "--format", "json", "--status", "failure", "--limit", "1"]
+        )
+        assert result.exit_code == 0
+        assert [summary["id"] for summary in json.loads(result.stdout)] == [reports[1]["id"]]
+
+    @pytest.mark.usefixtures("reports")
+    def test_list_table(self):
+        result = CliRunner(mix_stderr=False).invoke(app, ["report", "list"])
+        assert result.exit_code == 0
+        assert "failure" in result.stdout
+
+    def test_list_empty(self):
+        result = CliRunner(mix_stderr=False).invoke(app, ["report", "list"])
+        assert result.exit_code == 0
+        assert "No sync reports found." in result.stdout
+
+    def test_show(self, reports):
+        result = CliRunner(mix_stderr=False).invoke(app, ["report", "show", reports[0]["id"][:8]])
+        assert result.exit_code == 0
+        assert json.loads(result.stdout) == reports[0]
+
+    @pytest.mark.usefixtures("reports")
+    def test_show_missing(self):
+        result = CliRunner(mix_stderr=False).invoke(app, ["report", "show", "missing"])
+        assert result.exit_code == 1
+        assert "No sync report found" in result.stderr
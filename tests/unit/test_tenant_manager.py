@@ -0,0 +1,98 @@
+import json
+import stat
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+import pytest
+
+from kst.tenant_manager import TenantManager
+
+
+def add(manager: TenantManager, name: str, tmp_path) -> None:
+    manager.add_tenant(name, f"https://{name}.api.kandji.io", str(uuid4()), str(tmp_path / name))
+
+
+class TestTenantManager:
+    def test_round_trip(self, tmp_path):
+        manager = TenantManager(config_dir=tmp_path)
+        add(manager, "first", tmp_path)
+        add(manager, "second", tmp_path)
+        manager.switch_tenant("second")
+        manager.update_tenant("first", tenant_url="https://updated.api.kandji.io")
+
+        reloaded = TenantManager(config_dir=tmp_path)
+        assert [tenant.name for tenant in reloaded.list_tenants()] == ["first", "second"]
+        assert reloaded.get_active_tenant().name == "second"
+        assert reloaded.get_tenant("first").tenant_url == "https://updated.api.kandji.io"
+
+        reloaded.remove_tenant("second")
+        assert manager.get_active_tenant().name == "first"
+        assert manager.get_tenant("second") is None
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="POSIX file permissions")
+    def test_file_is_private(self, tmp_path):
+        manager = TenantManager(config_dir=tmp_path)
+        add(manager, "first", tmp_path)
+        assert stat.S_IMODE(manager.config_file.stat().st_mode) == 0o600
+        assert not list(tmp_path.glob(".tenants.json.*.tmp"))
+
+    def test_keeps_changes_from_other_managers(self, tmp_path):
+        first, second = TenantManager(config_dir=tmp_path), TenantManager(config_dir=tmp_path)
+        add(first, "first", tmp_path)
+        add(second, "second", tmp_path)
+        first.switch_tenant("second")
+
+        data = json.loads((tmp_path / "tenants.json").read_text())
+        assert set(data["tenants"]) == {"first", "second"}
+        assert data["active_tenant"] == "second"
+        assert second.get_active_tenant().name == "second"
+
+        with pytest.raises(ValueError, match="already exists"):
+            second.add_tenant("first", "https://first.api.kandji.io", str(uuid4()), str(tmp_path))
+
+    def test_concurrent_updates(self, tmp_path):
+        names = [f"tenant{index}" for index in range(40)]
+        # Each manager stands in for a separate kst process sharing the same file
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(lambda name: add(TenantManager(config_dir=tmp_path), name, tmp_path), names))
+
+        assert {tenant.name for tenant in TenantManager(config_dir=tmp_path).list_tenants()} == set(names)
+
+    def test_parses_only_after_changes(self, tmp_path, monkeypatch):
+        manager = TenantManager(config_dir=tmp_path)
+        assert not manager.config_file.exists()
+        add(TenantManager(config_dir=tmp_path), "first", tmp_path)
+
+        loads = 0
+        original_load = json.load
+
+        def counting_load(file):
+            nonlocal loads
+            loads += 1
+            return original_load(file)
+
+        monkeypatch.setattr("kst.tenant_manager.json.load", counting_load)
+        assert manager.get_tenant("first") is manager.get_tenant("first")
+        assert loads == 1
+
+        # Changes made elsewhere are picked up
+        add(TenantManager(config_dir=tmp_path), "second", tmp_path)
+        assert manager.get_tenant("second") is not None
+
+    def test_invalid_tenant(self, tmp_path):
+        (tmp_path / "tenants.json").write_text(
+            json.dumps(
+                {
+                    "active_tenant": "valid",
+                    "tenants": {
+                        "valid": {"tenant_url": "https://valid.api.kandji.io", "api_token": "token", "repo_path": "/"},
+                        "invalid": {"tenant_url": "https://invalid.api.kandji.io"},
+                    },
+                }
+            )
+        )
+        manager = TenantManager(config_dir=tmp_path)
+        assert manager.get_active_tenant().name == "valid"
+        assert manager.get_tenant("invalid") is None
+        assert [tenant.name for tenant in manager.list_tenants()] == ["valid"]
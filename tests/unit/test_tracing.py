@@ -0,0 +1,104 @@
+import json
+import threading
+
+import pytest
+from typer.testing import CliRunner
+
+from kst import app
+from kst.tracing import Tracer
+
+
+@pytest.fixture
+def tracer() -> Tracer:
+    return Tracer()
+
+
+class TestTracer:
+    def test_span_records_attributes(self, tracer):
+        with tracer.span("api.request", method="GET") as span:
+            span["status"] = 200
+
+        (recorded,) = tracer.spans
+        assert recorded.name == "api.request"
+        assert recorded.attributes == {"method": "GET", "status": 200}
+        assert recorded.duration >= 0
+        assert recorded.start >= 0
+        assert recorded.thread_id == threading.get_native_id()
+
+    def test_span_recorded_on_error(self, tracer):
+        with pytest.raises(RuntimeError), tracer.span("failing"):
+            raise RuntimeError
+
+        assert [span.name for span in tracer.spans] == ["failing"]
+
+    def test_span_as_decorator(self, tracer):
+        @tracer.span("work")
+        def work(value: int) -> int:
+            return value * 2
+
+        assert work(1) == 2
+        assert work(2) == 4
+        assert [span.name for span in tracer.spans] == ["work", "work"]
+
+    def test_annotate(self, tracer):
+        @tracer.span("work")
+        def work(value: int) -> int:
+            with tracer.span("inner"):
+                tracer.annotate(inner=True)
+            tracer.annotate(result=value * 2)
+            return value * 2
+
+        tracer.annotate(ignored=True)
+        work(1)
+
+        assert [(span.name, span.attributes) for span in tracer.spans] == [
+            ("inner", {"inner": True}),
+            ("work", {"result": 2}),
+        ]
+
+    def test_summary(self, tracer):
+        for _ in range(3):
+            with tracer.span("repository.write"):
+                pass
+        with tracer.span("git.commit"):
+            pass
+
+        summary = tracer.summary()
+        assert list(summary["phases"]) == ["repository.write", "git.commit"]
+        assert summary["phases"]["repository.write"]["count"] == 3
+        assert summary["phases"]["git.commit"]["count"] == 1
+        assert summary["elapsed"] >= summary["phases"]["git.commit"]["duration"]
+
+    def test_reset(self, tracer):
+        with tracer.span("work"):
+            pass
+        tracer.reset()
+        assert tracer.spans == []
+        assert tracer.summary()["phases"] == {}
+
+    def test_chrome_trace(self, tracer, tmp_path):
+        with tracer.span("command"), tracer.span("api.request", path="/api/v1/library/custom-profiles"):
+            pass
+
+        trace_path = tmp_path / "trace.json"
+        tracer.write_chrome_trace(trace_path)
+        events = json.loads(trace_path.read_text())["traceEvents"]
+
+        assert events[0]["ph"] == "M"
+        complete = [event for event in events if event["ph"] == "X"]
+        assert [event["name"] for event in complete] == ["command", "api.request"]
+        assert complete[1]["cat"] == "api"
+        assert complete[1]["args"] == {"path": "/api/v1/library/custom-profiles"}
+        assert complete[0]["ts"] <= complete[1]["ts"]
+        assert complete[0]["dur"] >= complete[1]["dur"]
+
+
+def test_trace_option(tmp_path_repo_cd, tmp_path):
+    trace_path = tmp_path / "trace.json"
+    result = CliRunner(mix_stderr=False).invoke(
+        app, ["--trace", str(trace_path), "profile", "new", "--name", "Traced Profile"]
+    )
+    assert result.exit_code == 0
+
+    names = {event["name"] for event in json.loads(trace_path.read_text())["traceEvents"]}
+    assert {"command", "repository.write", "repository.commit"} <= names